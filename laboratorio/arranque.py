@@ -0,0 +1,59 @@
+import argparse
+import statistics
+import sys
+import time
+
+from laboratorio.carga import iniciar_servidor, puerto_libre
+from laboratorio.cliente_ws import ClienteStreamlit
+
+# Páginas que se visitan, en orden, después de la primera pintura
+PAGINAS = ["Conceptos", "Ejercicios", "Práctica", "Cheat-sheet", "Recursos"]
+
+def medir_arranque(timeout_s=120):
+    # Un proceso nuevo por medición: Streamlit recién importa el script y sus
+    # módulos cuando se conecta el primer navegador, así que ese costo cae en
+    # la primera pintura y no en el arranque del servidor
+    puerto = puerto_libre()
+    inicio = time.perf_counter()
+    servidor = iniciar_servidor(puerto, timeout_s)
+    mediciones = {'servidor listo': time.perf_counter() - inicio}
+    url = f"ws://127.0.0.1:{puerto}/_stcore/stream"
+    cliente = ClienteStreamlit(url, timeout_s)
+    try:
+        mediciones['primera pintura'] = cliente.conectar().segundos
+        for pagina in PAGINAS:
+            mediciones[f"primera visita a {pagina}"] = cliente.abrir(pagina).segundos
+        cliente.cerrar()
+
+        # Una segunda sesión sobre el proceso ya caliente, como referencia
+        cliente = ClienteStreamlit(url, timeout_s)
+        mediciones['segunda sesión'] = cliente.conectar().segundos
+    finally:
+        cliente.cerrar()
+        servidor.terminate()
+        servidor.wait(timeout=30)
+    return mediciones
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m laboratorio.arranque",
+        description="Mide el arranque en frío del servidor y la primera pintura de cada página."
+    )
+    parser.add_argument("--repeticiones", type=int, default=5, help="procesos nuevos a medir (por defecto 5)")
+    parser.add_argument("--timeout", type=float, default=120, help="segundos máximos por medición")
+    args = parser.parse_args(argumentos)
+
+    muestras = {}
+    for _ in range(args.repeticiones):
+        for nombre, segundos in medir_arranque(args.timeout).items():
+            muestras.setdefault(nombre, []).append(segundos)
+
+    ancho = max(len(nombre) for nombre in muestras)
+    print(f"{'Medición':<{ancho}}  {'mínimo':>9}  {'mediana':>9}  {'máximo':>9}")
+    for nombre, valores in muestras.items():
+        print(f"{nombre:<{ancho}}  {min(valores) * 1000:7.0f}ms  "
+              f"{statistics.median(valores) * 1000:7.0f}ms  {max(valores) * 1000:7.0f}ms")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
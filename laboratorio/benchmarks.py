@@ -0,0 +1,184 @@
+import multiprocessing
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from laboratorio.motor import construir_base_sqlite, dividir_sentencias
+
+# Consulta representativa que cada índice de VIEWS_INDEXES_SQL debería acelerar
+CONSULTAS_INDICES = {
+    'idx_students_email':
+        "SELECT student_id, nombre FROM students WHERE email = ?",
+    'idx_enrollments_student_course':
+        "SELECT enrollment_id, fecha_inscripcion FROM enrollments "
+        "WHERE student_id = ? AND course_id = ?",
+    'idx_active_students':
+        "SELECT student_id, nombre FROM students WHERE ciudad = ? AND activo = true"
+}
+
+# VIEWS_INDEXES_SQL solo define un índice sobre enrollments; los otros dos
+# cubren las columnas que usan v_estadisticas_cursos (course_id) y
+# mv_reporte_mensual (fecha_inscripcion).
+INDICES_ADICIONALES_ENROLLMENTS = {
+    'idx_enrollments_course': "CREATE INDEX idx_enrollments_course ON enrollments(course_id)",
+    'idx_enrollments_fecha': "CREATE INDEX idx_enrollments_fecha ON enrollments(fecha_inscripcion)"
+}
+
+def extraer_indices(script):
+    indices = {}
+    for sentencia in dividir_sentencias(script):
+        coincidencia = re.search(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)', sentencia, re.IGNORECASE)
+        if coincidencia:
+            indices[coincidencia.group(1)] = sentencia
+    return indices
+
+class CopiaBase:
+    # Copia desechable de la base de una escala: los benchmarks crean y borran
+    # índices sin tocar el archivo compartido.
+    def __init__(self, escala):
+        self._directorio = tempfile.TemporaryDirectory(prefix='cbd_bench_')
+        ruta = Path(self._directorio.name) / 'bench.sqlite'
+        shutil.copyfile(construir_base_sqlite(escala), ruta)
+        self.conn = sqlite3.connect(ruta, isolation_level=None)
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+        self._directorio.cleanup()
+
+def ejecutar_en_proceso(funcion, *argumentos):
+    # Un benchmark construye y copia la base de la escala (varios GB a 1M×):
+    # corre en un proceso propio, fuera del servidor de Streamlit
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as ejecutor:
+        return ejecutor.submit(funcion, *argumentos).result()
+
+def _filas_aleatorias(conn, tabla, columnas, n, rng):
+    maximo = conn.execute(f"SELECT MAX(rowid) FROM {tabla}").fetchone()[0]
+    consulta = f"SELECT {columnas} FROM {tabla} WHERE rowid = ?"
+    return [conn.execute(consulta, (int(i),)).fetchone() for i in rng.integers(1, maximo + 1, n)]
+
+def _parametros(conn, indice, n, rng):
+    if indice == 'idx_students_email':
+        return _filas_aleatorias(conn, 'students', 'email', n, rng)
+    if indice == 'idx_enrollments_student_course':
+        return _filas_aleatorias(conn, 'enrollments', 'student_id, course_id', n, rng)
+    ciudades = [fila[0] for fila in conn.execute("SELECT DISTINCT ciudad FROM students")]
+    return [(ciudades[i],) for i in rng.integers(0, len(ciudades), n)]
+
+def plan_consulta(conn, consulta, parametros):
+    filas = conn.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros).fetchall()
+    return "; ".join(fila[3] for fila in filas)
+
+def medir_consulta(conn, consulta, parametros):
+    conn.execute(consulta, parametros[0]).fetchall()
+    tiempos = []
+    for valores in parametros:
+        inicio = time.perf_counter()
+        conn.execute(consulta, valores).fetchall()
+        tiempos.append(time.perf_counter() - inicio)
+    return np.array(tiempos) * 1000
+
+def benchmark_indices(escala, script_indices, repeticiones=50, semilla=0):
+    definiciones = extraer_indices(script_indices)
+    rng = np.random.default_rng(semilla)
+    filas = []
+
+    with CopiaBase(escala) as conn:
+        for indice, consulta in CONSULTAS_INDICES.items():
+            parametros = _parametros(conn, indice, repeticiones, rng)
+
+            sin_indice = medir_consulta(conn, consulta, parametros)
+            plan_sin = plan_consulta(conn, consulta, parametros[0])
+
+            conn.execute(definiciones[indice])
+            con_indice = medir_consulta(conn, consulta, parametros)
+            plan_con = plan_consulta(conn, consulta, parametros[0])
+            conn.execute(f"DROP INDEX {indice}")
+
+            mediana_sin = np.median(sin_indice)
+            mediana_con = np.median(con_indice)
+            filas.append({
+                'Índice': indice,
+                'Mediana sin índice (ms)': mediana_sin,
+                'p95 sin índice (ms)': np.percentile(sin_indice, 95),
+                'Mediana con índice (ms)': mediana_con,
+                'p95 con índice (ms)': np.percentile(con_indice, 95),
+                'Aceleración (×)': mediana_sin / mediana_con if mediana_con > 0 else np.nan,
+                'Plan sin índice': plan_sin,
+                'Plan con índice': plan_con
+            })
+
+    return pd.DataFrame(filas)
+
+def _filas_nuevas(conn, n, rng):
+    primer_id = conn.execute("SELECT MAX(enrollment_id) FROM enrollments").fetchone()[0] + 1
+    max_estudiante = conn.execute("SELECT MAX(student_id) FROM students").fetchone()[0]
+    cursos = [fila[0] for fila in conn.execute("SELECT course_id FROM courses")]
+    fechas = [fila[0] for fila in conn.execute("SELECT DISTINCT fecha_inscripcion FROM enrollments")]
+
+    estudiantes = rng.integers(1, max_estudiante + 1, n).tolist()
+    cursos_elegidos = [cursos[i] for i in rng.integers(0, len(cursos), n)]
+    fechas_elegidas = [fechas[i] for i in rng.integers(0, len(fechas), n)]
+    nuevas = list(zip(range(primer_id, primer_id + n), estudiantes, cursos_elegidos, fechas_elegidas))
+    cambios = [(cursos[i], fila[0]) for i, fila in zip(rng.integers(0, len(cursos), n), nuevas)]
+    return primer_id, nuevas, cambios
+
+def _medir_lotes(conn, sentencia, filas, tamano_lote):
+    inicio = time.perf_counter()
+    for i in range(0, len(filas), tamano_lote):
+        conn.execute("BEGIN")
+        conn.executemany(sentencia, filas[i:i + tamano_lote])
+        conn.execute("COMMIT")
+    return time.perf_counter() - inicio
+
+def benchmark_escrituras(escala, script_indices, filas=10_000, tamano_lote=1_000, semilla=0):
+    definiciones = extraer_indices(script_indices)
+    indices = {'idx_enrollments_student_course': definiciones['idx_enrollments_student_course']}
+    indices.update(INDICES_ADICIONALES_ENROLLMENTS)
+    rng = np.random.default_rng(semilla)
+    resultados = []
+
+    with CopiaBase(escala) as conn:
+        # Sin fsync por lote: se mide el costo de mantener los índices, no el del disco
+        conn.execute("PRAGMA synchronous = OFF")
+        primer_id, nuevas, cambios = _filas_nuevas(conn, filas, rng)
+        creados = []
+
+        for cantidad in range(len(indices) + 1):
+            if cantidad > 0:
+                nombre, definicion = list(indices.items())[cantidad - 1]
+                conn.execute(definicion)
+                creados.append(nombre)
+
+            tiempo_insert = _medir_lotes(
+                conn,
+                "INSERT INTO enrollments (enrollment_id, student_id, course_id, fecha_inscripcion) "
+                "VALUES (?, ?, ?, ?)",
+                nuevas, tamano_lote
+            )
+            tiempo_update = _medir_lotes(
+                conn, "UPDATE enrollments SET course_id = ? WHERE enrollment_id = ?",
+                cambios, tamano_lote
+            )
+            conn.execute("DELETE FROM enrollments WHERE enrollment_id >= ?", (primer_id,))
+
+            resultados.append({
+                'Índices secundarios': cantidad,
+                'Índices': ", ".join(creados) or "(ninguno)",
+                'INSERT filas/s': filas / tiempo_insert,
+                'INSERT tiempo total (s)': tiempo_insert,
+                'UPDATE filas/s': filas / tiempo_update,
+                'UPDATE tiempo total (s)': tiempo_update
+            })
+
+    return pd.DataFrame(resultados)
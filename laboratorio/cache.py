@@ -0,0 +1,123 @@
+import re
+import threading
+from collections import OrderedDict
+
+PALABRAS_ESCRITURA = {'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER',
+                      'ATTACH', 'DETACH', 'VACUUM', 'REINDEX', 'ANALYZE', 'PRAGMA',
+                      'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'REFRESH'}
+PALABRAS_LECTURA = {'SELECT', 'WITH', 'VALUES'}
+
+def fragmentos_sql(codigo):
+    # Separa el código en literales ('...', "...") y el resto, descartando comentarios
+    i = 0
+    while i < len(codigo):
+        if codigo.startswith('--', i):
+            fin = codigo.find('\n', i)
+            i = len(codigo) if fin == -1 else fin
+            yield False, ' '
+        elif codigo.startswith('/*', i):
+            fin = codigo.find('*/', i + 2)
+            i = len(codigo) if fin == -1 else fin + 2
+            yield False, ' '
+        elif codigo[i] in '\'"':
+            comilla = codigo[i]
+            fin = i + 1
+            while fin < len(codigo):
+                if codigo[fin] == comilla:
+                    if codigo.startswith(comilla * 2, fin):
+                        fin += 2
+                        continue
+                    break
+                fin += 1
+            yield True, codigo[i:fin + 1]
+            i = fin + 1
+        else:
+            fin = i
+            while fin < len(codigo) and codigo[fin] not in '\'"' \
+                    and not codigo.startswith('--', fin) and not codigo.startswith('/*', fin):
+                fin += 1
+            yield False, codigo[i:fin]
+            i = fin
+
+def _normalizar_codigo(texto):
+    texto = re.sub(r'\s+', ' ', texto.upper())
+    return re.sub(r' ?([(),;=<>+*/-]) ?', r'\1', texto)
+
+def normalizar_sql(codigo):
+    partes = []
+    pendiente = ""
+    for es_literal, texto in fragmentos_sql(codigo):
+        if es_literal:
+            partes.append(_normalizar_codigo(pendiente))
+            partes.append(texto)
+            pendiente = ""
+        else:
+            pendiente += texto
+    partes.append(_normalizar_codigo(pendiente))
+    return re.sub(r';+$', '', ''.join(partes).strip())
+
+def es_solo_lectura(codigo):
+    palabras = []
+    for es_literal, texto in fragmentos_sql(codigo):
+        if not es_literal:
+            palabras.extend(re.findall(r'[A-Za-z_]+', texto.upper()))
+    if not palabras or palabras[0] not in PALABRAS_LECTURA:
+        return False
+    return not PALABRAS_ESCRITURA.intersection(palabras)
+
+def tamano_resultados(resultados):
+    total = 0
+    for resultado in resultados:
+        total += len(resultado['sentencia']) + len(resultado['mensaje'])
+        if resultado['datos'] is not None:
+            total += int(resultado['datos'].memory_usage(deep=True).sum())
+    return total
+
+class CacheResultados:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave][0]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor, tamano):
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            if clave in self._entradas:
+                self._bytes -= self._entradas.pop(clave)[1]
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            while self._bytes > self.max_bytes:
+                _, (_, tamano_expulsado) = self._entradas.popitem(last=False)
+                self._bytes -= tamano_expulsado
+                self.expulsiones += 1
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+            }
+
+def clave_cache(cache, version, codigo, admite_cache=True):
+    if cache is None or not admite_cache or not es_solo_lectura(codigo):
+        return None
+    return (version, normalizar_sql(codigo))
@@ -0,0 +1,159 @@
+import hashlib
+import math
+from collections import namedtuple
+from decimal import Decimal
+
+from laboratorio.sintaxis import claves_de_orden
+
+# Las columnas float se comparan redondeadas a esta cantidad de decimales. Es
+# una tolerancia por cubetas: dos valores a ambos lados de un borde de
+# redondeo (0.4999999 y 0.5000001) no coinciden, algo aceptable para los
+# promedios y sumas de los ejercicios.
+DECIMALES = 6
+
+FILAS_POR_LOTE = 1000
+
+MODULO = 2 ** 128
+
+Huella = namedtuple('Huella', ['columnas', 'filas', 'conjunto', 'orden', 'claves'])
+
+def _canonico(valor):
+    if isinstance(valor, Decimal):
+        # PostgreSQL devuelve NUMERIC como Decimal
+        valor = float(valor)
+    if isinstance(valor, float):
+        if math.isnan(valor):
+            return 'nan'
+        valor = round(valor, DECIMALES) + 0.0
+        # 3.0 y 3 son el mismo resultado aunque un motor devuelva REAL y otro INTEGER
+        if valor.is_integer() and abs(valor) < 2 ** 53:
+            return int(valor)
+    return valor
+
+def _hash(canonico):
+    resumen = hashlib.blake2b(repr(canonico).encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(resumen, 'big')
+
+def _resolver_claves(claves, nombres):
+    if claves is None:
+        return None
+    posiciones = []
+    for clave in claves:
+        if isinstance(clave, str):
+            clave = nombres.index(clave) if clave in nombres else None
+        if clave is None or not 0 <= clave < len(nombres):
+            # Ordena por algo que no está en el resultado: se exige el mismo
+            # orden fila por fila
+            return ()
+        posiciones.append(clave)
+    return tuple(posiciones)
+
+def huella_de_cursor(cursor, claves=None):
+    # Huella del resultado en una sola pasada y memoria constante.
+    # conjunto: suma módulo 2^128 de los hashes de cada fila, independiente
+    # del orden y sensible a las repeticiones (compara multiconjuntos).
+    # orden: solo si hay claves; encadena los tramos consecutivos con la
+    # misma clave, de modo que el orden entre empates no cuenta.
+    nombres = [col[0].lower() for col in cursor.description]
+    claves = _resolver_claves(claves, nombres)
+
+    filas = 0
+    conjunto = 0
+    orden = hashlib.blake2b(digest_size=16) if claves is not None else None
+    clave_tramo = None
+    tramo = 0
+    filas_tramo = 0
+
+    while True:
+        lote = cursor.fetchmany(FILAS_POR_LOTE)
+        if not lote:
+            break
+        for fila in lote:
+            canonica = tuple(map(_canonico, fila))
+            valor_hash = _hash(canonica)
+            filas += 1
+            conjunto = (conjunto + valor_hash) % MODULO
+            if orden is None:
+                continue
+
+            clave = tuple(canonica[i] for i in claves) if claves else canonica
+            if filas_tramo and clave != clave_tramo:
+                orden.update(f"{tramo}:{filas_tramo};".encode('ascii'))
+                tramo = 0
+                filas_tramo = 0
+            clave_tramo = clave
+            tramo = (tramo + valor_hash) % MODULO
+            filas_tramo += 1
+
+    if orden is not None:
+        orden.update(f"{tramo}:{filas_tramo};".encode('ascii'))
+        orden = orden.hexdigest()
+    return Huella(len(nombres), filas, conjunto, orden, claves)
+
+def comparar_huellas(esperada, obtenida):
+    if obtenida.columnas != esperada.columnas:
+        return False, f"Tu consulta devuelve {obtenida.columnas} columnas y se esperaban {esperada.columnas}"
+    if obtenida.filas != esperada.filas:
+        return False, f"Tu consulta devuelve {obtenida.filas} filas y se esperaban {esperada.filas}"
+    if obtenida.conjunto != esperada.conjunto:
+        return False, "Las filas no coinciden con el resultado esperado"
+    if esperada.orden is not None and obtenida.orden != esperada.orden:
+        return False, "Las filas son correctas pero no están en el orden que pide el ORDER BY"
+    return True, f"Resultado correcto ({obtenida.filas} filas)"
+
+def consulta_a_comparar(sentencia):
+    # El resultado de un ejercicio es la última sentencia; si crea una vista,
+    # se compara su contenido (el orden de una vista no está garantizado)
+    from laboratorio.dialecto import traducir
+    from laboratorio.sesiones import PATRON_NOMBRE_VISTA
+
+    vista = PATRON_NOMBRE_VISTA.match(traducir(sentencia))
+    if vista and vista.group(1).upper() == 'CREATE':
+        return f"SELECT * FROM {vista.group(2)}", None
+    return None, claves_de_orden(sentencia)
+
+def huella_esperada(sesion, solucion):
+    consulta, claves = consulta_a_comparar(_ultima_sentencia(solucion))
+    exito, esperada = sesion.huella(solucion, claves, consulta)
+    if not exito:
+        return False, f"No se pudo ejecutar la solución del ejercicio: {esperada}"
+    if esperada is None:
+        return False, "La solución de este ejercicio no produce un resultado que se pueda comparar"
+    return True, esperada
+
+def calificar_contra(sesion, codigo, solucion, esperada):
+    # Cada huella corre en una transacción que se descarta: la misma sesión
+    # sirve para la solución y para cualquier cantidad de entregas
+    consulta, _ = consulta_a_comparar(_ultima_sentencia(solucion))
+    exito, obtenida = sesion.huella(codigo, esperada.claves, consulta)
+    if not exito:
+        return False, obtenida
+    if obtenida is None:
+        return True, {'correcto': False, 'mensaje': "Tu código no devuelve filas para comparar"}
+
+    correcto, mensaje = comparar_huellas(esperada, obtenida)
+    return True, {'correcto': correcto, 'mensaje': mensaje}
+
+def _ultima_sentencia(codigo):
+    from laboratorio.motor import dividir_sentencias
+
+    return dividir_sentencias(codigo)[-1]
+
+def calificar(escala, codigo, solucion, timeout_s=None, memoria_mb=None):
+    from laboratorio.esperados import huella_guardada
+    from laboratorio.sesiones import SesionSQL
+
+    # Sesión propia en memoria sobre los mismos datos: el sandbox del
+    # estudiante no influye en la calificación
+    sesion = SesionSQL(escala)
+    sesion.establecer_limites(timeout_s, memoria_mb=memoria_mb)
+    try:
+        # Con la huella ya guardada, la solución no se vuelve a ejecutar
+        esperada = huella_guardada(escala, solucion)
+        if esperada is None:
+            exito, esperada = huella_esperada(sesion, solucion)
+            if not exito:
+                return False, esperada
+        return calificar_contra(sesion, codigo, solucion, esperada)
+    finally:
+        sesion.cerrar()
@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from laboratorio.cliente_ws import ClienteStreamlit
+from laboratorio.contenido import ejercicios, retos
+from laboratorio.metricas import percentil
+
+RUTA_APP = Path(__file__).resolve().parent.parent / 'CBD_S4.py'
+
+# Pausa entre interacciones de un estudiante simulado (lee, piensa, escribe)
+PAUSA_S = 1.0
+
+def recorrido(cliente, numero, generador):
+    # Una clase típica: entra, lee la teoría, resuelve un ejercicio y practica
+    # en el sandbox con uno de los retos
+    ejercicio = generador.randrange(len(ejercicios()))
+    reto = generador.randrange(len(retos()))
+    yield "entrar", cliente.conectar
+    yield "código de estudiante", lambda: cliente.fijar("estudiante", string_value=f"carga-{numero}")
+    yield "Conceptos", lambda: cliente.abrir("Conceptos")
+    yield "Ejercicios", lambda: cliente.abrir("Ejercicios")
+    yield "ver resultado", lambda: cliente.disparar(
+        f"editor_ej_{ejercicio}", "accion", {'modo': 'ejecutar', 'codigo': ejercicios()[ejercicio]['solucion']})
+    yield "calificar", lambda: cliente.disparar(
+        f"editor_ej_{ejercicio}", "accion", {'modo': 'calificar', 'codigo': ejercicios()[ejercicio]['solucion']})
+    yield "Práctica", lambda: cliente.abrir("Práctica")
+    yield "cargar reto", lambda: cliente.pulsar(f"reto_{reto}")
+    yield "ejecutar en sandbox", lambda: cliente.disparar(
+        "editor_sandbox", "accion", {'modo': 'ejecutar', 'codigo': retos()[reto]['codigo']})
+    yield "marcar reto", lambda: cliente.fijar(f"prac_{reto}", bool_value=True)
+
+def simular_sesion(url, numero, pausa_s, timeout_s, semilla):
+    generador = random.Random(semilla)
+    cliente = ClienteStreamlit(url, timeout_s)
+    mediciones = []
+    # Los estudiantes no llegan todos en el mismo instante
+    time.sleep(generador.uniform(0, pausa_s))
+    try:
+        for paso, accion in recorrido(cliente, numero, generador):
+            interaccion = accion()
+            mediciones.append((paso, interaccion.segundos))
+            time.sleep(generador.uniform(0.5, 1.5) * pausa_s)
+    except Exception as error:
+        return mediciones, f"sesión {numero}: {type(error).__name__}: {error}"
+    finally:
+        cliente.cerrar()
+    return mediciones, None
+
+def medir_concurrencia(url, sesiones, pausa_s=PAUSA_S, timeout_s=120, semilla=0):
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sesiones) as pool:
+        resultados = list(pool.map(
+            lambda numero: simular_sesion(url, numero, pausa_s, timeout_s, semilla + numero),
+            range(sesiones)
+        ))
+    duracion = time.perf_counter() - inicio
+
+    latencias = sorted(segundos for mediciones, _ in resultados for _, segundos in mediciones)
+    por_paso = {}
+    for mediciones, _ in resultados:
+        for paso, segundos in mediciones:
+            por_paso.setdefault(paso, []).append(segundos)
+    return {
+        'sesiones': sesiones,
+        'interacciones': len(latencias),
+        'errores': [error for _, error in resultados if error],
+        'duracion_s': duracion,
+        'por_segundo': len(latencias) / duracion,
+        'p50_s': percentil(latencias, 0.5),
+        'p99_s': percentil(latencias, 0.99),
+        'pasos': {paso: percentil(sorted(muestras), 0.5) for paso, muestras in por_paso.items()}
+    }
+
+def puerto_libre():
+    with socket.socket() as conexion:
+        conexion.bind(('127.0.0.1', 0))
+        return conexion.getsockname()[1]
+
+def iniciar_servidor(puerto, timeout_s=60):
+    entorno = dict(os.environ)
+    # Los estudiantes simulados no escriben en el progreso real
+    entorno.setdefault('CBD_PROGRESO_DB', str(Path(tempfile.mkdtemp()) / 'progreso.sqlite'))
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(RUTA_APP),
+         '--server.port', str(puerto), '--server.headless', 'true',
+         '--browser.gatherUsageStats', 'false'],
+        env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = time.monotonic() + timeout_s
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al iniciar (código {proceso.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=1):
+                return proceso
+        except OSError:
+            time.sleep(0.25)
+    proceso.terminate()
+    raise RuntimeError(f"El servidor no respondió en {timeout_s:.0f} s")
+
+ENCABEZADO_REPORTE = f"{'sesiones':>8}  {'interacciones':>13}  {'errores':>7}  {'por segundo':>11}  {'p50':>9}  {'p99':>9}"
+
+def fila_reporte(resultado):
+    return (f"{resultado['sesiones']:>8}  {resultado['interacciones']:>13}  "
+            f"{len(resultado['errores']):>7}  {resultado['por_segundo']:>11.1f}  "
+            f"{resultado['p50_s'] * 1000:>7.0f}ms  {resultado['p99_s'] * 1000:>7.0f}ms")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m laboratorio.carga",
+        description="Simula estudiantes concurrentes contra un servidor del laboratorio y mide la latencia."
+    )
+    parser.add_argument("--sesiones", type=int, nargs='+', default=[1, 5, 10, 20],
+                        help="cantidades de sesiones simultáneas a probar (por defecto 1 5 10 20)")
+    parser.add_argument("--url", default=None,
+                        help="servidor ya iniciado (ws://host:puerto/_stcore/stream); por defecto se inicia uno local")
+    parser.add_argument("--pausa", type=float, default=PAUSA_S,
+                        help=f"segundos promedio entre interacciones de un estudiante (por defecto {PAUSA_S})")
+    parser.add_argument("--timeout", type=float, default=120, help="segundos máximos por interacción")
+    parser.add_argument("--salida", default=None, help="guarda los resultados en un .json")
+    args = parser.parse_args(argumentos)
+
+    servidor = None
+    url = args.url
+    if url is None:
+        puerto = puerto_libre()
+        servidor = iniciar_servidor(puerto)
+        url = f"ws://127.0.0.1:{puerto}/_stcore/stream"
+
+    resultados = []
+    print(ENCABEZADO_REPORTE)
+    try:
+        for sesiones in args.sesiones:
+            resultado = medir_concurrencia(url, sesiones, args.pausa, args.timeout)
+            resultados.append(resultado)
+            print(fila_reporte(resultado), flush=True)
+            for error in resultado['errores']:
+                print(f"  {error}", flush=True)
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=30)
+
+    ultimo = resultados[-1]
+    print(f"\nMediana por paso con {ultimo['sesiones']} sesiones:")
+    for paso, segundos in ultimo['pasos'].items():
+        print(f"  {paso:<22} {segundos * 1000:7.0f}ms")
+
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 1 if any(resultado['errores'] for resultado in resultados) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
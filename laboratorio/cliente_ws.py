@@ -0,0 +1,145 @@
+import json
+import time
+from collections import namedtuple
+
+from websockets.sync.client import connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+# Cliente mínimo del protocolo del navegador de Streamlit: abre una sesión por
+# websocket, envía reruns con el estado de los widgets y cuenta los mensajes
+# que el servidor devuelve. Sirve para medir el costo real de cada interacción
+# de un estudiante sin levantar un navegador.
+
+Interaccion = namedtuple('Interaccion', ['enviados', 'recibidos', 'bytes', 'segundos'])
+
+FINALES = (
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_FRAGMENT_RUN_SUCCESSFULLY
+)
+
+PREFIJO_DISPARO = "$$STREAMLIT_INTERNAL_KEY_"
+
+class ClienteStreamlit:
+    def __init__(self, url="ws://localhost:8501/_stcore/stream", timeout_s=120):
+        self.url = url
+        self.timeout_s = timeout_s
+        self.widgets = {}
+        self.paginas = {}
+        self.pagina = ""
+        self._estados = {}
+        self._autoreruns = {}
+        self._cacheados = set()
+        self._ws = None
+
+    def conectar(self):
+        self._ws = connect(self.url, subprotocols=["streamlit"], max_size=None,
+                           open_timeout=self.timeout_s)
+        return self.rerun()
+
+    def cerrar(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    def abrir(self, titulo):
+        # Como un enlace de st.navigation: las ejecuciones siguientes también
+        # declaran la página abierta
+        self.pagina = self.paginas[titulo]
+        return self.rerun()
+
+    def buscar(self, texto):
+        # Por key (sufijo del id) o por etiqueta visible
+        for id_widget, (tipo, etiqueta, fragmento) in self.widgets.items():
+            if id_widget.endswith(f"-{texto}") or etiqueta == texto:
+                return id_widget
+        raise KeyError(f"No hay ningún widget '{texto}' en la página")
+
+    def fragmento(self, texto):
+        return self.widgets[self.buscar(texto)][2]
+
+    # Como el navegador, un widget dentro de un fragmento solo vuelve a
+    # ejecutar ese fragmento
+    def fijar(self, texto, **valor):
+        estado = WidgetState(id=self.buscar(texto), **valor)
+        self._estados[estado.id] = estado
+        return self.rerun(fragmento=self.fragmento(texto))
+
+    def pulsar(self, texto):
+        return self.rerun([WidgetState(id=self.buscar(texto), trigger_value=True)],
+                          fragmento=self.fragmento(texto))
+
+    def disparar(self, texto, evento, valor):
+        # Evento de un componente v2, tal como lo envía setTriggerValue
+        id_disparo = f"{PREFIJO_DISPARO}{self.buscar(texto)}__events"
+        carga = json.dumps([{'event': evento, 'value': valor}])
+        return self.rerun([WidgetState(id=id_disparo, json_trigger_value=carga)],
+                          fragmento=self.fragmento(texto))
+
+    def rerun(self, disparos=(), fragmento="", automatico=False):
+        inicio = time.perf_counter()
+        mensaje = BackMsg()
+        estado = mensaje.rerun_script
+        estado.widget_states.widgets.extend(self._estados.values())
+        estado.widget_states.widgets.extend(disparos)
+        estado.fragment_id = fragmento
+        estado.page_script_hash = self.pagina
+        estado.is_auto_rerun = automatico
+        # Como el navegador, declara los elementos grandes que ya tiene para que
+        # el servidor los envíe solo como referencia
+        estado.cached_message_hashes.extend(self._cacheados)
+        self._ws.send(mensaje.SerializeToString())
+
+        recibidos, total_bytes = self._recibir_hasta_fin()
+        enviados = 1
+
+        # El navegador repite los fragmentos con run_every mientras sigan
+        # activos; cada repetición es un mensaje más de la interacción
+        while self._autoreruns and not automatico:
+            id_fragmento, intervalo = next(iter(self._autoreruns.items()))
+            time.sleep(intervalo)
+            parcial = self.rerun(fragmento=id_fragmento, automatico=True)
+            enviados += parcial.enviados
+            recibidos += parcial.recibidos
+            total_bytes += parcial.bytes
+
+        return Interaccion(enviados, recibidos, total_bytes, time.perf_counter() - inicio)
+
+    def _recibir_hasta_fin(self):
+        recibidos = total_bytes = 0
+        while True:
+            datos = self._ws.recv(timeout=self.timeout_s)
+            recibidos += 1
+            total_bytes += len(datos)
+            mensaje = ForwardMsg()
+            mensaje.ParseFromString(datos)
+            tipo = mensaje.WhichOneof('type')
+            if mensaje.metadata.cacheable:
+                self._cacheados.add(mensaje.hash)
+
+            if tipo == 'new_session':
+                # Cada ejecución completa vuelve a registrar sus fragmentos
+                self._autoreruns.clear()
+            elif tipo == 'delta' and mensaje.delta.WhichOneof('type') == 'new_element':
+                self._registrar_widget(mensaje.delta.new_element, mensaje.delta.fragment_id)
+            elif tipo == 'navigation':
+                self.paginas = {pagina.page_name: pagina.page_script_hash
+                                for pagina in mensaje.navigation.app_pages}
+                self.pagina = mensaje.navigation.page_script_hash
+            elif tipo == 'auto_rerun':
+                self._autoreruns[mensaje.auto_rerun.fragment_id] = mensaje.auto_rerun.interval
+            elif tipo == 'stop_auto_rerun':
+                for id_fragmento in mensaje.stop_auto_rerun.fragment_ids:
+                    self._autoreruns.pop(id_fragmento, None)
+            elif tipo == 'script_finished' and mensaje.script_finished in FINALES:
+                return recibidos, total_bytes
+
+    def _registrar_widget(self, elemento, fragmento=""):
+        tipo = elemento.WhichOneof('type')
+        widget = getattr(elemento, tipo)
+        id_widget = getattr(widget, 'id', '')
+        if id_widget.startswith('$$ID-'):
+            self.widgets[id_widget] = (tipo, getattr(widget, 'label', ''), fragmento)
@@ -0,0 +1,49 @@
+import functools
+import hashlib
+import json
+from pathlib import Path
+
+DIRECTORIO_CONTENIDO = Path(__file__).resolve().parent
+
+# En los .json el código SQL se guarda como lista de líneas para que se pueda
+# leer y comparar en un diff; al cargarlo se vuelve a unir
+CAMPOS_CODIGO = {'plantilla', 'solucion', 'codigo'}
+
+def _unir_codigo(objeto):
+    for campo in CAMPOS_CODIGO & objeto.keys():
+        if isinstance(objeto[campo], list):
+            objeto[campo] = "\n".join(objeto[campo])
+    return objeto
+
+@functools.lru_cache(maxsize=None)
+def cargar(nombre):
+    # Cada archivo se lee una sola vez por proceso, cuando una página lo pide
+    # por primera vez. Lo devuelto se comparte: no modificarlo.
+    ruta = DIRECTORIO_CONTENIDO / nombre
+    texto = ruta.read_text(encoding='utf-8')
+    if ruta.suffix == '.json':
+        return json.loads(texto, object_hook=_unir_codigo)
+    return texto
+
+@functools.lru_cache(maxsize=None)
+def tabla(nombre, clave):
+    import pandas as pd
+
+    return pd.DataFrame(cargar(nombre)[clave])
+
+def ejercicios():
+    return cargar('ejercicios.json')
+
+def retos():
+    return cargar('retos.json')
+
+@functools.lru_cache(maxsize=None)
+def version_contenido():
+    # Cambia con cualquier edición del contenido: sirve de clave para lo que
+    # se calcule a partir de él
+    huella = hashlib.blake2b(digest_size=8)
+    for ruta in sorted(DIRECTORIO_CONTENIDO.iterdir()):
+        if ruta.suffix in ('.json', '.sql'):
+            huella.update(ruta.name.encode('utf-8'))
+            huella.update(ruta.read_bytes())
+    return huella.hexdigest()
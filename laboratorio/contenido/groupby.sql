@@ -0,0 +1,49 @@
+-- groupby.sql - Ejemplos de GROUP BY y funciones de agregación
+-- Base de Datos I - Semana 4
+
+-- COUNT: Contar estudiantes por ciudad
+SELECT 
+    ciudad,
+    COUNT(*) AS total_estudiantes
+FROM students
+GROUP BY ciudad
+ORDER BY total_estudiantes DESC;
+
+-- AVG: Promedio de créditos por departamento
+SELECT 
+    departamento,
+    AVG(creditos) AS promedio_creditos,
+    COUNT(*) AS total_cursos
+FROM courses
+GROUP BY departamento;
+
+-- SUM: Total de créditos por estudiante
+SELECT 
+    s.nombre,
+    SUM(c.creditos) AS creditos_totales
+FROM students s
+INNER JOIN enrollments e ON s.student_id = e.student_id
+INNER JOIN courses c ON e.course_id = c.course_id
+GROUP BY s.student_id, s.nombre
+HAVING SUM(c.creditos) >= 12;
+
+-- MAX y MIN: Curso con más y menos créditos
+SELECT 
+    departamento,
+    MAX(creditos) AS max_creditos,
+    MIN(creditos) AS min_creditos,
+    AVG(creditos)::NUMERIC(3,1) AS avg_creditos
+FROM courses
+GROUP BY departamento
+HAVING COUNT(*) > 2;
+
+-- Agregación con múltiples condiciones
+SELECT 
+    EXTRACT(YEAR FROM fecha_inscripcion) AS año,
+    EXTRACT(MONTH FROM fecha_inscripcion) AS mes,
+    COUNT(*) AS inscripciones,
+    COUNT(DISTINCT student_id) AS estudiantes_unicos
+FROM enrollments
+GROUP BY año, mes
+HAVING COUNT(*) > 5
+ORDER BY año DESC, mes DESC;
\ No newline at end of file
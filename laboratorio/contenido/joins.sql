@@ -0,0 +1,43 @@
+-- joins.sql - Ejemplos de JOIN en PostgreSQL
+-- Base de Datos I - Semana 4
+
+-- INNER JOIN: Solo registros que coinciden en ambas tablas
+SELECT 
+    s.nombre AS estudiante,
+    c.nombre AS curso,
+    e.fecha_inscripcion
+FROM students s
+INNER JOIN enrollments e ON s.student_id = e.student_id
+INNER JOIN courses c ON e.course_id = c.course_id;
+
+-- LEFT JOIN: Todos los estudiantes, incluso sin inscripciones
+SELECT 
+    s.nombre,
+    s.ciudad,
+    COUNT(e.enrollment_id) AS cursos_inscritos
+FROM students s
+LEFT JOIN enrollments e ON s.student_id = e.student_id
+GROUP BY s.student_id, s.nombre, s.ciudad;
+
+-- RIGHT JOIN: Todos los cursos, incluso sin estudiantes
+SELECT 
+    c.nombre AS curso,
+    c.creditos,
+    COUNT(e.student_id) AS estudiantes_inscritos
+FROM enrollments e
+RIGHT JOIN courses c ON c.course_id = e.course_id
+GROUP BY c.course_id, c.nombre, c.creditos;
+
+-- JOIN múltiple con filtros
+SELECT 
+    s.nombre AS estudiante,
+    s.email,
+    c.nombre AS curso,
+    p.nombre AS profesor
+FROM students s
+INNER JOIN enrollments e ON s.student_id = e.student_id
+INNER JOIN courses c ON e.course_id = c.course_id
+INNER JOIN professors p ON c.professor_id = p.professor_id
+WHERE s.ciudad = 'Medellín' 
+  AND c.creditos >= 3
+ORDER BY s.nombre, c.nombre;
\ No newline at end of file
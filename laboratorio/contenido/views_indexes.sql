@@ -0,0 +1,69 @@
+-- views_indexes.sql - Ejemplos de vistas e índices
+-- Base de Datos I - Semana 4
+
+-- ÍNDICES: Mejoran el rendimiento de consultas
+
+-- Índice simple en columna única
+CREATE INDEX idx_students_email 
+ON students(email);
+
+-- Índice compuesto
+CREATE INDEX idx_enrollments_student_course 
+ON enrollments(student_id, course_id);
+
+-- Índice único (garantiza unicidad)
+CREATE UNIQUE INDEX idx_students_documento 
+ON students(documento);
+
+-- Índice parcial (solo para ciertos registros)
+CREATE INDEX idx_active_students 
+ON students(ciudad) 
+WHERE activo = true;
+
+-- VISTAS: Consultas predefinidas reutilizables
+
+-- Vista simple
+CREATE VIEW v_estudiantes_activos AS
+SELECT student_id, nombre, email, ciudad
+FROM students
+WHERE activo = true;
+
+-- Vista con JOIN
+CREATE VIEW v_resumen_inscripciones AS
+SELECT 
+    s.nombre AS estudiante,
+    c.nombre AS curso,
+    c.creditos,
+    e.fecha_inscripcion,
+    p.nombre AS profesor
+FROM students s
+INNER JOIN enrollments e ON s.student_id = e.student_id
+INNER JOIN courses c ON e.course_id = c.course_id
+INNER JOIN professors p ON c.professor_id = p.professor_id;
+
+-- Vista con agregación
+CREATE VIEW v_estadisticas_cursos AS
+SELECT 
+    c.course_id,
+    c.nombre AS curso,
+    c.creditos,
+    COUNT(e.student_id) AS total_estudiantes,
+    p.nombre AS profesor
+FROM courses c
+LEFT JOIN enrollments e ON c.course_id = e.course_id
+LEFT JOIN professors p ON c.professor_id = p.professor_id
+GROUP BY c.course_id, c.nombre, c.creditos, p.nombre;
+
+-- Vista materializada (PostgreSQL específico)
+CREATE MATERIALIZED VIEW mv_reporte_mensual AS
+SELECT 
+    DATE_TRUNC('month', fecha_inscripcion) AS mes,
+    COUNT(*) AS inscripciones,
+    COUNT(DISTINCT student_id) AS estudiantes_unicos,
+    COUNT(DISTINCT course_id) AS cursos_diferentes
+FROM enrollments
+GROUP BY mes
+WITH DATA;
+
+-- Refrescar vista materializada
+REFRESH MATERIALIZED VIEW mv_reporte_mensual;
\ No newline at end of file
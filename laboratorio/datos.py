@@ -0,0 +1,36 @@
+import pandas as pd
+
+def obtener_datos_ejemplo():
+    students = pd.DataFrame({
+        'student_id': [1, 2, 3, 4, 5],
+        'nombre': ['Ana García', 'Luis Pérez', 'María López', 'Carlos Ruiz', 'Laura Torres'],
+        'email': ['ana@uni.edu', 'luis@uni.edu', 'maria@uni.edu', 'carlos@uni.edu', 'laura@uni.edu'],
+        'ciudad': ['Medellín', 'Bogotá', 'Medellín', 'Cali', 'Medellín'],
+        'documento': ['1001', '1002', '1003', '1004', '1005'],
+        'activo': [True, True, True, False, True]
+    })
+
+    courses = pd.DataFrame({
+        'course_id': [101, 102, 103, 104],
+        'nombre': ['Base de Datos I', 'Programación II', 'Cálculo I', 'Física I'],
+        'creditos': [4, 3, 4, 3],
+        'departamento': ['Sistemas', 'Sistemas', 'Matemáticas', 'Física'],
+        'professor_id': [1, 1, 2, 3]
+    })
+
+    enrollments = pd.DataFrame({
+        'enrollment_id': [1, 2, 3, 4, 5, 6, 7],
+        'student_id': [1, 1, 2, 2, 3, 4, 5],
+        'course_id': [101, 102, 101, 103, 102, 101, 104],
+        'fecha_inscripcion': ['2025-01-15', '2025-01-15', '2025-01-16',
+                              '2025-01-16', '2025-01-17', '2025-01-17', '2025-01-18']
+    })
+
+    return students, courses, enrollments
+
+def obtener_profesores():
+    return pd.DataFrame({
+        'professor_id': [1, 2, 3],
+        'nombre': ['Jorge Ramírez', 'Patricia Gómez', 'Andrés Castro'],
+        'departamento': ['Sistemas', 'Matemáticas', 'Física']
+    })
@@ -0,0 +1,220 @@
+import datetime
+import functools
+import re
+
+from laboratorio.cache import fragmentos_sql
+
+# El material del curso está escrito para PostgreSQL. La sintaxis que SQLite
+# no entiende se reescribe sentencia por sentencia; las funciones que no
+# tiene se registran en cada conexión (preparar_conexion).
+
+CAMPOS_EXTRACT = {
+    'YEAR': "CAST(strftime('%Y', {}) AS INTEGER)",
+    'MONTH': "CAST(strftime('%m', {}) AS INTEGER)",
+    'DAY': "CAST(strftime('%d', {}) AS INTEGER)",
+    'HOUR': "CAST(strftime('%H', {}) AS INTEGER)",
+    'MINUTE': "CAST(strftime('%M', {}) AS INTEGER)",
+    'SECOND': "CAST(strftime('%f', {}) AS REAL)",
+    'DOW': "CAST(strftime('%w', {}) AS INTEGER)",
+    'DOY': "CAST(strftime('%j', {}) AS INTEGER)",
+    'QUARTER': "((CAST(strftime('%m', {}) AS INTEGER) + 2) / 3)",
+    'EPOCH': "CAST(strftime('%s', {}) AS INTEGER)"
+}
+
+TIPOS_ENTEROS = {'INT', 'INTEGER', 'INT2', 'INT4', 'INT8', 'SMALLINT', 'BIGINT', 'SERIAL', 'BIGSERIAL'}
+TIPOS_REALES = {'REAL', 'FLOAT', 'FLOAT4', 'FLOAT8', 'DOUBLE PRECISION'}
+TIPOS_TEXTO = {'TEXT', 'VARCHAR', 'CHAR', 'CHARACTER', 'CHARACTER VARYING', 'BPCHAR'}
+
+# Palabras que pueden ir antes de un paréntesis sin ser el nombre de una función
+PALABRAS_ANTES_DE_PARENTESIS = {'SELECT', 'WHERE', 'AND', 'OR', 'NOT', 'ON', 'IN', 'AS', 'BY', 'FROM',
+                                'HAVING', 'WHEN', 'THEN', 'ELSE', 'CASE', 'IS', 'LIKE', 'BETWEEN',
+                                'DISTINCT', 'ALL', 'VALUES', 'SET', 'RETURNING'}
+
+PATRON_TIPO = re.compile(
+    r'\s*(DOUBLE\s+PRECISION|CHARACTER\s+VARYING|[A-Za-z_]\w*)'
+    r'(?:\s*\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?'
+    r'(?:\s+WITH(?:OUT)?\s+TIME\s+ZONE)?',
+    re.IGNORECASE
+)
+PATRON_OPERANDO = re.compile(r'[\w.\x00]+$')
+PATRON_EXTRACT = re.compile(r'\bEXTRACT\s*\(\s*(\w+)\s+FROM\b', re.IGNORECASE)
+PATRON_VISTA_MATERIALIZADA = re.compile(r'\b(CREATE|DROP)\s+MATERIALIZED\s+VIEW\b', re.IGNORECASE)
+PATRON_CON_DATOS = re.compile(r'\s+WITH\s+(?:NO\s+)?DATA\s*(;?)\s*$', re.IGNORECASE)
+PATRON_REFRESH = re.compile(r'^\s*REFRESH\s+MATERIALIZED\s+VIEW\b', re.IGNORECASE)
+PATRON_CATALOGO = re.compile(r'\bpg_catalog\s*\.\s*', re.IGNORECASE)
+
+# Una vista de SQLite siempre lee los datos actuales: refrescarla no tiene
+# nada que hacer. Un PRAGMA desconocido no hace nada y no devuelve filas.
+SENTENCIA_VACIA = "PRAGMA cbd_refresh"
+
+VISTA_PG_INDEXES = """
+CREATE TEMP VIEW IF NOT EXISTS pg_indexes AS
+SELECT 'public' AS schemaname, tbl_name AS tablename, name AS indexname,
+       NULL AS tablespace, sql AS indexdef
+FROM main.sqlite_master WHERE type = 'index' AND sql IS NOT NULL
+UNION ALL
+SELECT 'pg_temp', tbl_name, name, NULL, sql
+FROM temp.sqlite_master WHERE type = 'index' AND sql IS NOT NULL
+"""
+
+def _split_part(texto, separador, posicion):
+    if texto is None or separador is None or posicion is None:
+        return None
+    partes = str(texto).split(str(separador)) if separador != '' else [str(texto)]
+    if posicion < 0:
+        posicion += len(partes) + 1
+    return partes[posicion - 1] if 1 <= posicion <= len(partes) else ''
+
+def _date_trunc(campo, valor):
+    if campo is None or valor is None:
+        return None
+    try:
+        fecha = datetime.datetime.fromisoformat(str(valor))
+    except ValueError:
+        return None
+    campo = campo.lower()
+    if campo == 'year':
+        fecha = fecha.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif campo == 'quarter':
+        fecha = fecha.replace(month=(fecha.month - 1) // 3 * 3 + 1, day=1,
+                              hour=0, minute=0, second=0, microsecond=0)
+    elif campo == 'month':
+        fecha = fecha.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif campo == 'week':
+        fecha = (fecha - datetime.timedelta(days=fecha.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+    elif campo == 'day':
+        fecha = fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif campo == 'hour':
+        fecha = fecha.replace(minute=0, second=0, microsecond=0)
+    elif campo == 'minute':
+        fecha = fecha.replace(second=0, microsecond=0)
+    else:
+        return None
+    return fecha.strftime('%Y-%m-%d %H:%M:%S')
+
+def preparar_conexion(conn):
+    conn.create_function('split_part', 3, _split_part, deterministic=True)
+    conn.create_function('date_trunc', 2, _date_trunc, deterministic=True)
+    conn.execute(VISTA_PG_INDEXES)
+
+def _enmascarar(sentencia):
+    # Los literales no se reescriben: se reemplazan por marcas que no
+    # coinciden con ningún patrón y se restauran al final. Los comentarios
+    # se descartan.
+    literales = []
+    partes = []
+    for es_literal, texto in fragmentos_sql(sentencia):
+        if es_literal:
+            partes.append(f"\x00{len(literales)}\x00")
+            literales.append(texto)
+        else:
+            partes.append(texto)
+    return ''.join(partes), literales
+
+def _restaurar(texto, literales):
+    return re.sub(r'\x00(\d+)\x00', lambda marca: literales[int(marca.group(1))], texto)
+
+def _cierre(texto, apertura):
+    nivel = 0
+    for i in range(apertura, len(texto)):
+        if texto[i] == '(':
+            nivel += 1
+        elif texto[i] == ')':
+            nivel -= 1
+            if nivel == 0:
+                return i
+    return None
+
+def _inicio_operando(texto, fin):
+    # Inicio de la expresión a la izquierda de un :: (una columna, un literal,
+    # una llamada a función o un paréntesis)
+    while fin > 0 and texto[fin - 1].isspace():
+        fin -= 1
+    if fin > 0 and texto[fin - 1] == ')':
+        nivel = 0
+        for i in range(fin - 1, -1, -1):
+            if texto[i] == ')':
+                nivel += 1
+            elif texto[i] == '(':
+                nivel -= 1
+                if nivel == 0:
+                    nombre = re.search(r'\w+\s*$', texto[:i])
+                    if nombre and nombre.group().strip().upper() not in PALABRAS_ANTES_DE_PARENTESIS:
+                        return nombre.start()
+                    return i
+        return None
+    operando = PATRON_OPERANDO.search(texto[:fin])
+    return operando.start() if operando else None
+
+def _conversion(operando, tipo, precision, escala):
+    tipo = re.sub(r'\s+', ' ', tipo.upper())
+    if tipo in ('NUMERIC', 'DECIMAL'):
+        if precision is None:
+            # NUMERIC sin precisión guarda el valor exacto: 7::numeric / 2 es
+            # 3.5, no la división entera de SQLite
+            return f"CAST({operando} AS REAL)"
+        # NUMERIC(p, s) redondea a s decimales; NUMERIC(p) equivale a NUMERIC(p, 0)
+        if escala is None or escala == '0':
+            return f"CAST(ROUND({operando}) AS INTEGER)"
+        return f"ROUND({operando}, {escala})"
+    if tipo in TIPOS_ENTEROS:
+        # PostgreSQL redondea al convertir a entero; CAST de SQLite trunca
+        return f"CAST(ROUND({operando}) AS INTEGER)"
+    if tipo in TIPOS_REALES:
+        return f"CAST({operando} AS REAL)"
+    if tipo in TIPOS_TEXTO:
+        return f"CAST({operando} AS TEXT)"
+    if tipo == 'DATE':
+        return f"date({operando})"
+    if tipo in ('TIMESTAMP', 'TIMESTAMPTZ'):
+        return f"datetime({operando})"
+    return f"CAST({operando} AS {tipo})"
+
+def _traducir_conversiones(texto):
+    while True:
+        posicion = texto.find('::')
+        if posicion == -1:
+            return texto
+        inicio = _inicio_operando(texto, posicion)
+        tipo = PATRON_TIPO.match(texto, posicion + 2)
+        if inicio is None or tipo is None:
+            return texto
+        operando = texto[inicio:posicion].strip()
+        texto = texto[:inicio] + _conversion(operando, tipo.group(1), tipo.group(2), tipo.group(3)) + texto[tipo.end():]
+
+def _traducir_extract(texto):
+    inicio = 0
+    while True:
+        coincidencia = PATRON_EXTRACT.search(texto, inicio)
+        if coincidencia is None:
+            return texto
+        plantilla = CAMPOS_EXTRACT.get(coincidencia.group(1).upper())
+        cierre = _cierre(texto, texto.index('(', coincidencia.start()))
+        if plantilla is None or cierre is None:
+            inicio = coincidencia.end()
+            continue
+        expresion = texto[coincidencia.end():cierre].strip()
+        texto = texto[:coincidencia.start()] + plantilla.format(expresion) + texto[cierre + 1:]
+        inicio = coincidencia.start()
+
+@functools.lru_cache(maxsize=4096)
+def traducir(sentencia):
+    # Se llama con cada sentencia que llega al motor; las de los ejercicios y
+    # los retos se repiten en todas las sesiones
+    texto, literales = _enmascarar(sentencia)
+    if PATRON_REFRESH.match(texto):
+        return SENTENCIA_VACIA
+
+    traducido = texto
+    if PATRON_VISTA_MATERIALIZADA.search(traducido):
+        traducido = PATRON_VISTA_MATERIALIZADA.sub(r'\1 VIEW', traducido, count=1)
+        traducido = PATRON_CON_DATOS.sub(r'\1', traducido)
+    traducido = PATRON_CATALOGO.sub('', traducido)
+    traducido = _traducir_extract(traducido)
+    traducido = _traducir_conversiones(traducido)
+
+    if traducido == texto:
+        # Sin cambios se conserva la sentencia original, comentarios incluidos
+        return sentencia
+    return _restaurar(traducido, literales)
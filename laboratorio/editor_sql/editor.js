@@ -0,0 +1,319 @@
+// Editor SQL con resaltado y validación en el navegador. Escribir, validar,
+// limpiar o copiar no genera tráfico con el servidor: el código solo viaja
+// cuando el estudiante pide una acción del servidor (Ejecutar, EXPLAIN...).
+
+const COMANDOS = new Set([
+  'SELECT', 'WITH', 'VALUES', 'CREATE', 'INSERT', 'UPDATE', 'DELETE', 'ALTER', 'DROP',
+  'REFRESH', 'EXPLAIN', 'BEGIN', 'COMMIT', 'ROLLBACK'
+]);
+
+const PALABRAS_CLAVE = new Set([
+  ...COMANDOS, 'ALL', 'AND', 'AS', 'ASC', 'BETWEEN', 'BY', 'CASCADE', 'CASE', 'CROSS', 'DATA',
+  'DEFAULT', 'DESC', 'DISTINCT', 'ELSE', 'END', 'EXCEPT', 'EXISTS', 'FALSE', 'FROM', 'FULL',
+  'GROUP', 'HAVING', 'IF', 'ILIKE', 'IN', 'INDEX', 'INNER', 'INTERSECT', 'INTO', 'IS', 'JOIN',
+  'LEFT', 'LIKE', 'LIMIT', 'MATERIALIZED', 'NATURAL', 'NOT', 'NULL', 'OFFSET', 'ON', 'OR',
+  'ORDER', 'OUTER', 'OVER', 'PARTITION', 'REPLACE', 'RETURNING', 'RIGHT', 'SET', 'TABLE',
+  'THEN', 'TRUE', 'UNION', 'UNIQUE', 'USING', 'VIEW', 'WHEN', 'WHERE'
+]);
+
+const AGREGADAS = new Set(['COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'STRING_AGG', 'ARRAY_AGG']);
+
+// Palabras que cierran el tramo de un JOIN o de un WHERE
+const FIN_DE_CLAUSULA = new Set([
+  'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'CROSS', 'NATURAL', 'WHERE', 'GROUP', 'HAVING',
+  'ORDER', 'LIMIT', 'OFFSET', 'UNION', 'INTERSECT', 'EXCEPT', 'RETURNING'
+]);
+
+const PATRON_TOKEN = /(\s+)|(--[^\n]*)|(\/\*[\s\S]*?(?:\*\/|$))|('(?:[^']|'')*'?)|("(?:[^"]|"")*"?)|((?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)|([\p{L}_][\p{L}\p{N}_$]*)|(::|<=|>=|<>|!=|\|\||[=<>+\-*/%(),;.\[\]])/uy;
+
+function tokenizar(codigo) {
+  const tokens = [];
+  const errores = [];
+  let pos = 0;
+  while (pos < codigo.length) {
+    PATRON_TOKEN.lastIndex = pos;
+    const m = PATRON_TOKEN.exec(codigo);
+    if (!m) {
+      errores.push({ pos, mensaje: `carácter inesperado '${codigo[pos]}'` });
+      tokens.push({ tipo: 'error', texto: codigo[pos], pos });
+      pos += 1;
+      continue;
+    }
+    const texto = m[0];
+    let tipo = 'espacio';
+    if (m[2] || m[3]) {
+      tipo = 'comentario';
+      if (m[3] && !texto.endsWith('*/')) errores.push({ pos, mensaje: 'comentario /* sin cerrar' });
+    } else if (m[4]) {
+      tipo = 'cadena';
+      if (texto.length < 2 || !texto.endsWith("'")) errores.push({ pos, mensaje: 'cadena sin comilla de cierre' });
+    } else if (m[5]) {
+      tipo = 'citado';
+      if (texto.length < 2 || !texto.endsWith('"')) errores.push({ pos, mensaje: 'identificador entre comillas sin cerrar' });
+    } else if (m[6]) {
+      tipo = 'numero';
+    } else if (m[7]) {
+      tipo = PALABRAS_CLAVE.has(texto.toUpperCase()) ? 'clave' : 'palabra';
+    } else if (m[8]) {
+      tipo = 'operador';
+    }
+    tokens.push({ tipo, texto, pos, valor: texto.toUpperCase() });
+    pos += texto.length;
+  }
+  return { tokens, errores };
+}
+
+function revisarSentencia(tokens, errores, advertencias) {
+  if (!tokens.length) return;
+  const primero = tokens[0];
+  if (!(primero.texto === '(' || COMANDOS.has(primero.valor))) {
+    errores.push({ pos: primero.pos, mensaje: 'debe comenzar con un comando SQL válido (SELECT, CREATE, INSERT, ...)' });
+    return;
+  }
+
+  // Profundidad de paréntesis de cada token, para comparar cláusulas del mismo nivel
+  const profundidad = [];
+  let nivel = 0;
+  for (const token of tokens) {
+    if (token.texto === ')') nivel -= 1;
+    profundidad.push(nivel);
+    if (token.texto === '(') nivel += 1;
+  }
+
+  const grupos = new Set();
+  tokens.forEach((token, i) => {
+    if (token.valor === 'GROUP') grupos.add(profundidad[i]);
+  });
+
+  tokens.forEach((token, i) => {
+    const siguiente = tokens[i + 1];
+    const nivelToken = profundidad[i];
+
+    if (token.valor === 'SELECT' && siguiente && siguiente.valor === 'FROM') {
+      errores.push({ pos: siguiente.pos, mensaje: 'faltan las columnas entre SELECT y FROM' });
+    }
+
+    if (token.valor === 'JOIN') {
+      const previo = tokens[i - 1];
+      const antePrevio = tokens[i - 2];
+      const cruzado = [previo, antePrevio].some((t) => t && (t.valor === 'CROSS' || t.valor === 'NATURAL'));
+      if (!cruzado) {
+        let conCondicion = false;
+        for (let j = i + 1; j < tokens.length && profundidad[j] >= nivelToken; j += 1) {
+          if (profundidad[j] !== nivelToken) continue;
+          if (tokens[j].valor === 'ON' || tokens[j].valor === 'USING') {
+            conCondicion = true;
+            break;
+          }
+          if (FIN_DE_CLAUSULA.has(tokens[j].valor)) break;
+        }
+        if (!conCondicion) {
+          errores.push({ pos: token.pos, mensaje: 'JOIN sin condición: agrega ON (o USING), o usa CROSS JOIN' });
+        }
+      }
+    }
+
+    if (token.valor === 'WHERE') {
+      for (let j = i + 1; j < tokens.length && profundidad[j] >= nivelToken; j += 1) {
+        if (profundidad[j] === nivelToken && FIN_DE_CLAUSULA.has(tokens[j].valor)) break;
+        const funcion = tokens[j + 1];
+        if (profundidad[j] === nivelToken && AGREGADAS.has(tokens[j].valor) && funcion && funcion.texto === '(') {
+          errores.push({ pos: tokens[j].pos, mensaje: `no se permiten funciones de agregación (${tokens[j].valor}) en WHERE; usa HAVING` });
+          break;
+        }
+      }
+    }
+
+    if (token.valor === 'HAVING' && !grupos.has(nivelToken)) {
+      advertencias.push({ pos: token.pos, mensaje: 'HAVING sin GROUP BY: toda la tabla se trata como un único grupo' });
+    }
+  });
+}
+
+function validar(codigo) {
+  const { tokens, errores } = tokenizar(codigo);
+  const advertencias = [];
+  const significativos = tokens.filter((t) => t.tipo !== 'espacio' && t.tipo !== 'comentario');
+
+  const abiertos = [];
+  for (const token of significativos) {
+    if (token.texto === '(') abiertos.push(token);
+    if (token.texto === ')') {
+      if (abiertos.length) abiertos.pop();
+      else errores.push({ pos: token.pos, mensaje: 'paréntesis de cierre sin abrir' });
+    }
+  }
+  abiertos.forEach((token) => errores.push({ pos: token.pos, mensaje: 'paréntesis sin cerrar' }));
+
+  let sentencia = [];
+  let sentencias = 0;
+  for (const token of [...significativos, { texto: ';' }]) {
+    if (token.texto === ';') {
+      if (sentencia.length) sentencias += 1;
+      revisarSentencia(sentencia, errores, advertencias);
+      sentencia = [];
+    } else {
+      sentencia.push(token);
+    }
+  }
+
+  errores.sort((a, b) => a.pos - b.pos);
+  advertencias.sort((a, b) => a.pos - b.pos);
+  return { tokens, errores, advertencias, sentencias };
+}
+
+function escapar(texto) {
+  return texto.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+}
+
+function resaltar(codigo, resultado) {
+  const marcados = new Set(resultado.errores.map((e) => e.pos));
+  let html = '';
+  for (const token of resultado.tokens) {
+    const clases = [`t-${token.tipo}`];
+    if (marcados.has(token.pos)) clases.push('t-marcado');
+    html += token.tipo === 'espacio' ? escapar(token.texto) : `<span class="${clases.join(' ')}">${escapar(token.texto)}</span>`;
+  }
+  // El salto final mantiene el alto del <pre> igual al del textarea
+  return `${html}\n`;
+}
+
+function lineaColumna(codigo, pos) {
+  const anterior = codigo.slice(0, pos);
+  const linea = anterior.split('\n').length;
+  return `Línea ${linea}, columna ${pos - anterior.lastIndexOf('\n')}`;
+}
+
+function mostrarMensajes(raiz, codigo, resultado, completo) {
+  const mensajes = raiz.querySelector('.mensajes');
+  const problemas = [
+    ...resultado.errores.map((p) => ({ ...p, clase: 'error' })),
+    ...resultado.advertencias.map((p) => ({ ...p, clase: 'advertencia' }))
+  ];
+
+  if (!completo) {
+    // Mientras se escribe solo se indica el primer error
+    const primero = resultado.errores[0];
+    mensajes.className = 'mensajes discreto';
+    mensajes.textContent = primero ? `Sintaxis: ${lineaColumna(codigo, primero.pos)}: ${primero.mensaje}` : '';
+    return;
+  }
+
+  mensajes.innerHTML = '';
+  if (!codigo.trim()) {
+    mensajes.className = 'mensajes advertencia';
+    mensajes.textContent = 'El código está vacío';
+    return;
+  }
+  mensajes.className = `mensajes ${resultado.errores.length ? 'error' : 'exito'}`;
+  if (!resultado.errores.length) {
+    const linea = document.createElement('div');
+    linea.textContent = `Sintaxis válida: ${resultado.sentencias} sentencia(s)`;
+    mensajes.appendChild(linea);
+  }
+  problemas.forEach((p) => {
+    const linea = document.createElement('div');
+    linea.className = p.clase;
+    linea.textContent = `${lineaColumna(codigo, p.pos)}: ${p.mensaje}`;
+    mensajes.appendChild(linea);
+  });
+}
+
+// El editor se desmonta al cambiar de sección; el borrador sobrevive en la
+// pestaña mientras el servidor no cargue un código nuevo
+function leerBorrador(clave, version) {
+  try {
+    const borrador = JSON.parse(sessionStorage.getItem(`editor_sql:${clave}`));
+    return borrador && borrador.version === version ? borrador.texto : null;
+  } catch (error) {
+    return null;
+  }
+}
+
+function guardarBorrador(clave, version, texto) {
+  try {
+    sessionStorage.setItem(`editor_sql:${clave}`, JSON.stringify({ version, texto }));
+  } catch (error) {
+    // Sin almacenamiento el borrador solo dura lo que dure el componente
+  }
+}
+
+function montar(raiz, data, setTriggerValue) {
+  const texto = raiz.querySelector('textarea');
+  const resaltado = raiz.querySelector('.resaltado');
+  const barra = raiz.querySelector('.barra');
+  texto.style.height = `${data.altura}px`;
+  resaltado.style.height = `${data.altura}px`;
+
+  let pendiente = null;
+  const actualizar = (completo) => {
+    const resultado = validar(texto.value);
+    resaltado.innerHTML = resaltar(texto.value, resultado);
+    resaltado.scrollTop = texto.scrollTop;
+    mostrarMensajes(raiz, texto.value, resultado, completo);
+    return resultado;
+  };
+  raiz.actualizar = actualizar;
+
+  texto.addEventListener('input', () => {
+    clearTimeout(pendiente);
+    pendiente = setTimeout(() => {
+      actualizar(false);
+      guardarBorrador(data.clave, raiz.dataset.version, texto.value);
+    }, 150);
+  });
+  texto.addEventListener('scroll', () => {
+    resaltado.scrollTop = texto.scrollTop;
+    resaltado.scrollLeft = texto.scrollLeft;
+  });
+  texto.addEventListener('keydown', (evento) => {
+    if (evento.key === 'Tab') {
+      evento.preventDefault();
+      texto.setRangeText('    ', texto.selectionStart, texto.selectionEnd, 'end');
+      actualizar(false);
+    }
+  });
+
+  data.acciones.forEach((accion) => {
+    const boton = document.createElement('button');
+    boton.type = 'button';
+    boton.textContent = accion.etiqueta;
+    boton.addEventListener('click', () => {
+      if (accion.id === 'validar') {
+        actualizar(true);
+      } else if (accion.id === 'limpiar') {
+        texto.value = data.vacio;
+        actualizar(false);
+        guardarBorrador(data.clave, raiz.dataset.version, texto.value);
+      } else if (accion.id === 'copiar') {
+        navigator.clipboard.writeText(texto.value).then(() => {
+          raiz.querySelector('.mensajes').textContent = 'Código copiado al portapapeles';
+        });
+      } else {
+        // Única acción que llega al servidor
+        setTriggerValue('accion', { modo: accion.id, codigo: texto.value });
+      }
+    });
+    barra.appendChild(boton);
+  });
+}
+
+export default function (componente) {
+  const { data, parentElement, setTriggerValue } = componente;
+  const raiz = parentElement.querySelector('.editor-sql');
+
+  if (!raiz.dataset.montado) {
+    montar(raiz, data, setTriggerValue);
+    raiz.dataset.montado = 'si';
+  }
+
+  // El servidor solo reemplaza el texto cuando carga código nuevo (un reto,
+  // reiniciar); los reruns por otros widgets conservan lo que se escribió
+  const version = String(data.version);
+  if (raiz.dataset.version !== version) {
+    const borrador = leerBorrador(data.clave, version);
+    raiz.querySelector('textarea').value = borrador === null ? data.codigo : borrador;
+    raiz.dataset.version = version;
+    raiz.actualizar(false);
+  }
+}
@@ -0,0 +1,175 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from laboratorio.calificador import Huella, consulta_a_comparar, huella_esperada
+from laboratorio.contenido import ejercicios, retos
+from laboratorio.generador import ESCALAS, ruta_escala
+from laboratorio.motor import version_dataset
+
+# Subir VERSION_ESPERADOS cada vez que cambie cómo el motor ejecuta el SQL:
+# invalida los resultados guardados aunque el código y los datos no cambien
+VERSION_ESPERADOS = 1
+
+# A gran escala solo se guardan las primeras filas; el total y la huella
+# cubren el resultado completo
+FILAS_GUARDADAS = 10_000
+
+CLAVE_METADATOS = b'cbd_esperado'
+
+def clave_esperado(escala, codigo):
+    texto = f"{VERSION_ESPERADOS}\0{version_dataset(escala)}\0{codigo}"
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+def ruta_esperado(escala, codigo):
+    return ruta_escala(escala) / "esperados" / f"{clave_esperado(escala, codigo)}.parquet"
+
+def calcular_esperado(escala, codigo, timeout_s=None, memoria_mb=None):
+    from laboratorio.sesiones import SesionSQL
+
+    sesion = SesionSQL(escala)
+    sesion.establecer_limites(timeout_s, FILAS_GUARDADAS, memoria_mb)
+    try:
+        # La huella corre en una transacción que se descarta; después el
+        # código se ejecuta de verdad para leer las filas
+        exito, huella = huella_esperada(sesion, codigo)
+        if not exito:
+            return False, huella
+        exito, resultados = sesion.ejecutar(codigo)
+        if not exito:
+            return False, resultados
+
+        # Igual que al calificar: si el código crea una vista, el resultado es su contenido
+        consulta, _ = consulta_a_comparar(resultados[-1]['sentencia'])
+        if consulta is not None:
+            exito, resultados = sesion.ejecutar(consulta)
+            if not exito:
+                return False, resultados
+        return True, dict(resultados[-1], huella=huella)
+    finally:
+        sesion.cerrar()
+
+def guardar_esperado(escala, codigo, resultado):
+    ruta = ruta_esperado(escala, codigo)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    huella = resultado['huella']
+    metadatos = {
+        'sentencia': resultado['sentencia'],
+        'mensaje': resultado['mensaje'],
+        'total_filas': resultado['total_filas'],
+        # conjunto es un entero de 128 bits: en JSON va como texto
+        'huella': dict(huella._asdict(), conjunto=str(huella.conjunto))
+    }
+    tabla = pa.Table.from_pandas(resultado['datos'], preserve_index=False)
+    tabla = tabla.replace_schema_metadata({
+        **(tabla.schema.metadata or {}),
+        CLAVE_METADATOS: json.dumps(metadatos, ensure_ascii=False).encode('utf-8')
+    })
+
+    # Escritura atómica: la compilación y los procesos del sandbox pueden
+    # guardar el mismo resultado a la vez
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix='.parquet.tmp')
+    os.close(descriptor)
+    pq.write_table(tabla, temporal, compression='zstd')
+    os.replace(temporal, ruta)
+
+def _huella_de_metadatos(metadatos):
+    huella = metadatos['huella']
+    claves = huella['claves']
+    return Huella(huella['columnas'], huella['filas'], int(huella['conjunto']), huella['orden'],
+                  tuple(claves) if claves is not None else None)
+
+@functools.lru_cache(maxsize=64)
+def _leer_metadatos(ruta):
+    return json.loads(pq.read_schema(ruta).metadata[CLAVE_METADATOS])
+
+@functools.lru_cache(maxsize=64)
+def _leer(ruta):
+    # Lo devuelto se comparte entre sesiones: no modificarlo
+    tabla = pq.read_table(ruta)
+    metadatos = json.loads(tabla.schema.metadata[CLAVE_METADATOS])
+    return {
+        'sentencia': metadatos['sentencia'],
+        'datos': tabla.to_pandas(),
+        'mensaje': metadatos['mensaje'],
+        'total_filas': metadatos['total_filas'],
+        'huella': _huella_de_metadatos(metadatos)
+    }
+
+def leer_esperado(escala, codigo):
+    ruta = ruta_esperado(escala, codigo)
+    if not ruta.exists():
+        return None
+    return _leer(ruta)
+
+def huella_guardada(escala, codigo):
+    # Solo el esquema del archivo: calificar no necesita las filas
+    ruta = ruta_esperado(escala, codigo)
+    if not ruta.exists():
+        return None
+    return _huella_de_metadatos(_leer_metadatos(ruta))
+
+def obtener_esperado(escala, codigo, timeout_s=None, memoria_mb=None):
+    resultado = leer_esperado(escala, codigo)
+    if resultado is not None:
+        return True, resultado
+
+    exito, resultado = calcular_esperado(escala, codigo, timeout_s, memoria_mb)
+    if exito:
+        guardar_esperado(escala, codigo, resultado)
+    return exito, resultado
+
+def codigos_del_curso():
+    for ejercicio in ejercicios():
+        yield ejercicio['titulo'], ejercicio['solucion']
+    for reto in retos():
+        yield f"Reto: {reto['titulo']}", reto['codigo']
+
+def compilar(escalas, forzar=False, timeout_s=None):
+    fallas = []
+    for nombre_escala in escalas:
+        escala = ESCALAS[nombre_escala]
+        for titulo, codigo in codigos_del_curso():
+            ruta = ruta_esperado(escala, codigo)
+            if forzar and ruta.exists():
+                ruta.unlink()
+            inicio = time.perf_counter()
+            exito, resultado = obtener_esperado(escala, codigo, timeout_s)
+            segundos = time.perf_counter() - inicio
+            if exito:
+                estado = f"{resultado['total_filas']:,} filas"
+            else:
+                estado = f"ERROR: {resultado}"
+                fallas.append(f"{nombre_escala} {titulo}: {resultado}")
+            print(f"{nombre_escala:<4} {titulo:<48} {segundos * 1000:8.0f}ms  {estado}", flush=True)
+    return fallas
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m laboratorio.esperados",
+        description="Ejecuta las soluciones de los ejercicios y el código de los retos sobre cada escala "
+                    "y guarda los resultados esperados en disco."
+    )
+    parser.add_argument("--escalas", choices=list(ESCALAS), nargs='+', default=list(ESCALAS),
+                        help="escalas a compilar (por defecto todas)")
+    parser.add_argument("--forzar", action="store_true", help="vuelve a calcular aunque ya estén guardados")
+    parser.add_argument("--timeout", type=float, default=None, help="segundos máximos por consulta")
+    args = parser.parse_args(argumentos)
+
+    fallas = compilar(args.escalas, args.forzar, args.timeout)
+    if fallas:
+        print(f"\n{len(fallas)} códigos sin resultado esperado:")
+        print("\n".join(f"  {falla}" for falla in fallas))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
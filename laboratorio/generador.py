@@ -0,0 +1,185 @@
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from laboratorio.datos import obtener_datos_ejemplo, obtener_profesores
+
+# Subir VERSION_DATOS cada vez que cambie la forma en que se generan los datos:
+# invalida los Parquet cacheados en disco.
+VERSION_DATOS = 1
+SEMILLA = 20250115
+
+ESCALAS = {
+    '1×': 1,
+    '1k×': 1_000,
+    '1M×': 1_000_000
+}
+
+DIRECTORIO_CACHE = Path(os.environ.get(
+    'CBD_DATOS_DIR',
+    Path(__file__).resolve().parent.parent / '.cache_datos'
+))
+
+NOMBRES = ['Ana', 'Luis', 'María', 'Carlos', 'Laura', 'Andrés', 'Camila', 'Juan',
+           'Valentina', 'Santiago', 'Daniela', 'Felipe', 'Sofía', 'Mateo', 'Isabella',
+           'Sebastián', 'Mariana', 'Diego', 'Paula', 'Alejandro']
+APELLIDOS = ['García', 'Pérez', 'López', 'Ruiz', 'Torres', 'Gómez', 'Rodríguez',
+             'Martínez', 'Hernández', 'Díaz', 'Moreno', 'Álvarez', 'Romero', 'Vargas',
+             'Castro', 'Ramírez', 'Jiménez', 'Rojas', 'Herrera', 'Restrepo']
+
+# Distribución aproximada de la matrícula universitaria por ciudad
+CIUDADES = ['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Bucaramanga',
+            'Cartagena', 'Pereira', 'Manizales']
+PESOS_CIUDADES = [0.34, 0.24, 0.13, 0.09, 0.07, 0.06, 0.04, 0.03]
+
+MATERIAS = [
+    ('Base de Datos', 'Sistemas'), ('Programación', 'Sistemas'),
+    ('Estructuras de Datos', 'Sistemas'), ('Redes', 'Sistemas'),
+    ('Cálculo', 'Matemáticas'), ('Álgebra Lineal', 'Matemáticas'),
+    ('Estadística', 'Matemáticas'), ('Física', 'Física'),
+    ('Electromagnetismo', 'Física'), ('Química', 'Química')
+]
+NIVELES = ['I', 'II', 'III']
+CREDITOS = [2, 3, 4, 5]
+PESOS_CREDITOS = [0.1, 0.4, 0.4, 0.1]
+
+# Las inscripciones se concentran al inicio de cada semestre
+INICIOS_SEMESTRE = np.array(['2023-01-16', '2023-07-17', '2024-01-15', '2024-07-15',
+                             '2025-01-13', '2025-07-14'], dtype='datetime64[D]')
+PESOS_SEMESTRE = [0.08, 0.10, 0.15, 0.18, 0.22, 0.27]
+DIAS_MEDIOS_INSCRIPCION = 6
+MAX_DIAS_INSCRIPCION = 45
+
+TABLAS = ['professors', 'students', 'courses', 'enrollments']
+
+def _slug(texto):
+    equivalencias = str.maketrans('áéíóúÁÉÍÓÚñÑ', 'aeiouAEIOUnN')
+    return texto.translate(equivalencias).lower().replace(' ', '')
+
+def _nombres_completos(rng, n):
+    # Los nombres se generan como categorías (códigos enteros sobre una tabla de
+    # combinaciones) en lugar de concatenar cadenas fila por fila
+    combinaciones = [(nombre, apellido) for nombre in NOMBRES for apellido in APELLIDOS]
+    completos = [f"{n} {a}" for n, a in combinaciones]
+    slugs = pa.array([f"{_slug(n)}.{_slug(a)}" for n, a in combinaciones])
+    indice = rng.integers(0, len(combinaciones), n)
+    return pd.Categorical.from_codes(indice, completos), slugs.take(indice)
+
+def _texto(arreglo):
+    return pd.array(arreglo, dtype='string[pyarrow]')
+
+def _tamanos(escala):
+    raiz = math.ceil(math.sqrt(escala))
+    return {
+        'professors': 3 * raiz,
+        'students': 5 * escala,
+        'courses': 4 * raiz,
+        'enrollments': 7 * escala
+    }
+
+def generar_datos(escala, semilla=SEMILLA):
+    if escala == 1:
+        students, courses, enrollments = obtener_datos_ejemplo()
+        return {
+            'professors': obtener_profesores(),
+            'students': students,
+            'courses': courses,
+            'enrollments': enrollments
+        }
+
+    rng = np.random.default_rng([semilla, escala])
+    tamanos = _tamanos(escala)
+
+    n_prof = tamanos['professors']
+    nombres_prof, _ = _nombres_completos(rng, n_prof)
+    professors = pd.DataFrame({
+        'professor_id': np.arange(1, n_prof + 1),
+        'nombre': nombres_prof,
+        'departamento': rng.choice(sorted({d for _, d in MATERIAS}), n_prof)
+    })
+
+    n_est = tamanos['students']
+    student_id = np.arange(1, n_est + 1)
+    nombres, slugs = _nombres_completos(rng, n_est)
+    students = pd.DataFrame({
+        'student_id': student_id,
+        'nombre': nombres,
+        'email': _texto(pc.binary_join_element_wise(
+            slugs, pa.array(student_id).cast(pa.string()), '@uni.edu', ''
+        )),
+        'ciudad': pd.Categorical.from_codes(
+            rng.choice(len(CIUDADES), n_est, p=PESOS_CIUDADES), CIUDADES
+        ),
+        'documento': _texto(pa.array(1_000_000_000 + student_id).cast(pa.string())),
+        'activo': rng.random(n_est) < 0.85
+    })
+
+    n_cur = tamanos['courses']
+    i_materia = np.arange(n_cur) % len(MATERIAS)
+    i_nivel = (np.arange(n_cur) // len(MATERIAS)) % len(NIVELES)
+    grupo = np.arange(n_cur) // (len(MATERIAS) * len(NIVELES)) + 1
+    materias = np.array([m for m, _ in MATERIAS], dtype=object)
+    departamentos = np.array([d for _, d in MATERIAS], dtype=object)
+    courses = pd.DataFrame({
+        'course_id': np.arange(101, 101 + n_cur),
+        'nombre': (pd.Series(materias[i_materia]) + ' ' +
+                   pd.Series(np.array(NIVELES, dtype=object)[i_nivel]) + ' - G' +
+                   pd.Series(grupo.astype(str))),
+        'creditos': rng.choice(CREDITOS, n_cur, p=PESOS_CREDITOS),
+        'departamento': departamentos[i_materia],
+        'professor_id': rng.integers(1, n_prof + 1, n_cur)
+    })
+
+    # Popularidad de cursos tipo Zipf: unos pocos cursos concentran la demanda
+    n_ins = tamanos['enrollments']
+    popularidad = 1.0 / np.arange(1, n_cur + 1) ** 0.8
+    popularidad /= popularidad.sum()
+    curso = rng.permutation(n_cur)[rng.choice(n_cur, n_ins, p=popularidad)]
+
+    semestre = rng.choice(len(INICIOS_SEMESTRE), n_ins, p=PESOS_SEMESTRE)
+    dias = np.minimum(rng.exponential(DIAS_MEDIOS_INSCRIPCION, n_ins).astype(np.int64),
+                      MAX_DIAS_INSCRIPCION)
+    fechas_posibles = np.datetime_as_string(
+        (INICIOS_SEMESTRE[:, None] + np.arange(MAX_DIAS_INSCRIPCION + 1)).ravel(), unit='D'
+    )
+
+    enrollments = pd.DataFrame({
+        'enrollment_id': np.arange(1, n_ins + 1),
+        'student_id': rng.integers(1, n_est + 1, n_ins),
+        'course_id': 101 + curso,
+        'fecha_inscripcion': pd.Categorical.from_codes(
+            semestre * (MAX_DIAS_INSCRIPCION + 1) + dias, fechas_posibles
+        )
+    })
+
+    return {
+        'professors': professors,
+        'students': students,
+        'courses': courses,
+        'enrollments': enrollments
+    }
+
+def ruta_escala(escala):
+    return DIRECTORIO_CACHE / f"v{VERSION_DATOS}" / f"escala_{escala}"
+
+def obtener_datos(escala):
+    ruta = ruta_escala(escala)
+    if all((ruta / f"{tabla}.parquet").exists() for tabla in TABLAS):
+        return {tabla: pd.read_parquet(ruta / f"{tabla}.parquet") for tabla in TABLAS}
+
+    tablas = generar_datos(escala)
+    ruta.mkdir(parents=True, exist_ok=True)
+    for tabla, df in tablas.items():
+        # Escritura atómica: varios procesos pueden construir la misma escala a la vez
+        descriptor, temporal = tempfile.mkstemp(dir=ruta, suffix='.parquet.tmp')
+        os.close(descriptor)
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta / f"{tabla}.parquet")
+
+    return tablas
@@ -0,0 +1,567 @@
+import html
+from pathlib import Path
+
+import streamlit as st
+
+from laboratorio.cache import CacheResultados, es_solo_lectura
+from laboratorio.metricas import RegistroTiempos
+from laboratorio.progreso import AlmacenProgreso
+from laboratorio.sintaxis import analizar_sql
+
+# Piezas de la interfaz que comparten el punto de entrada (CBD_S4.py) y las
+# páginas de paginas/. El módulo se importa una vez por proceso: el estado de
+# cada sesión vive en st.session_state, nunca en variables del módulo. El motor
+# (y con él pandas) se importa recién con la primera consulta.
+
+SECCIONES_PROGRESO = {
+    'teoria': 'progreso_teoria',
+    'ejercicios': 'ejercicios_completados',
+    'practica': 'practica_completada'
+}
+
+@st.cache_resource
+def obtener_almacen_progreso():
+    return AlmacenProgreso()
+
+def items_progreso(estado):
+    return list(estado) if isinstance(estado, dict) else list(range(len(estado)))
+
+def descartar_casillas():
+    # Los widgets con key conservan su propio estado: se descartan para que
+    # vuelvan a leer el progreso
+    for key in list(st.session_state.keys()):
+        if key.startswith(('ej_', 'prac_')):
+            del st.session_state[key]
+
+def cargar_progreso(estudiante):
+    # Una sola lectura por índice al iniciar la sesión o cambiar de estudiante
+    progreso = obtener_almacen_progreso().leer(estudiante)
+    for seccion, clave in SECCIONES_PROGRESO.items():
+        estado = st.session_state[clave]
+        guardado = progreso.get(seccion, {})
+        for item in items_progreso(estado):
+            estado[item] = guardado.get(str(item), False)
+    st.session_state.version_progreso += 1
+    descartar_casillas()
+
+def actualizar_progreso(seccion, item, valor):
+    estado = st.session_state[SECCIONES_PROGRESO[seccion]]
+    if estado[item] == valor:
+        return
+    estado[item] = valor
+    st.session_state.version_progreso += 1
+    # Se encola y se escribe junto con los cambios de otros estudiantes
+    if st.session_state.estudiante:
+        obtener_almacen_progreso().registrar(st.session_state.estudiante, seccion, str(item), valor)
+
+def marcar_casilla(seccion, item, clave):
+    actualizar_progreso(seccion, item, st.session_state[clave])
+
+def casilla_progreso(etiqueta, seccion, item, clave, **opciones):
+    # El valor vive en la key del widget y el progreso se actualiza en el
+    # callback, antes de que se vuelva a ejecutar el fragmento que la contiene
+    if clave not in st.session_state:
+        st.session_state[clave] = st.session_state[SECCIONES_PROGRESO[seccion]][item]
+    st.checkbox(etiqueta, key=clave, on_change=marcar_casilla, args=(seccion, item, clave), **opciones)
+
+def comenzar_ejecucion_completa():
+    # Lugares de la página que muestran el progreso, en esta ejecución
+    # completa. Se crean antes que los fragmentos que los actualizan, y esos
+    # fragmentos siguen usando los de la última ejecución completa.
+    st.session_state.marcadores_progreso = []
+    st.session_state.en_ejecucion_completa = True
+
+def terminar_ejecucion_completa():
+    # Desde aquí solo se vuelven a ejecutar fragmentos
+    st.session_state.en_ejecucion_completa = False
+
+def registrar_marcador_progreso(dibujar):
+    st.session_state.marcadores_progreso.append((st.empty(), dibujar))
+
+def refrescar_progreso(forzar=False):
+    # Un fragmento no vuelve a ejecutar la barra lateral ni el resto de la
+    # página: si cambió el progreso, redibuja los marcadores en su lugar
+    if forzar or st.session_state.progreso_dibujado != st.session_state.version_progreso:
+        for marcador, dibujar in st.session_state.marcadores_progreso:
+            with marcador.container():
+                dibujar()
+        st.session_state.progreso_dibujado = st.session_state.version_progreso
+    elif st.session_state.en_ejecucion_completa:
+        # Streamlit solo deja que un fragmento escriba fuera de él si lo hizo
+        # en la ejecución completa: se reserva el lugar, que el final del
+        # script vuelve a dibujar
+        for marcador, _ in st.session_state.marcadores_progreso:
+            marcador.empty()
+
+def cambiar_estudiante():
+    estudiante = st.session_state.estudiante.strip()
+    st.session_state.estudiante = estudiante
+    if estudiante:
+        st.query_params['estudiante'] = estudiante
+        cargar_progreso(estudiante)
+    elif 'estudiante' in st.query_params:
+        del st.query_params['estudiante']
+
+def inicializar_estado():
+    if 'ejercicios_completados' not in st.session_state:
+        st.session_state.ejercicios_completados = [False] * 5
+
+    if 'practica_completada' not in st.session_state:
+        st.session_state.practica_completada = [False] * 4
+
+    if 'modo_docente' not in st.session_state:
+        st.session_state.modo_docente = False
+
+    if 'progreso_teoria' not in st.session_state:
+        st.session_state.progreso_teoria = {
+            'revise_teoria': False,
+            'hice_ejercicios': False,
+            'consulte_ejemplos': False
+        }
+
+    if 'codigo_sandbox' not in st.session_state:
+        st.session_state.codigo_sandbox = "-- Escribe tu consulta SQL aquí\n"
+
+    if 'version_sandbox' not in st.session_state:
+        st.session_state.version_sandbox = 0
+
+    if 'version_ejercicios' not in st.session_state:
+        st.session_state.version_ejercicios = 0
+
+    if 'calificaciones' not in st.session_state:
+        st.session_state.calificaciones = {}
+
+    if 'version_progreso' not in st.session_state:
+        st.session_state.version_progreso = 0
+        st.session_state.progreso_dibujado = None
+
+    if 'sesiones_sql' not in st.session_state:
+        st.session_state.sesiones_sql = {}
+
+    if 'consulta_sandbox' not in st.session_state:
+        st.session_state.consulta_sandbox = None
+
+    if 'estudiante' not in st.session_state:
+        st.session_state.estudiante = st.query_params.get('estudiante', '')
+        if st.session_state.estudiante:
+            cargar_progreso(st.session_state.estudiante)
+
+def aplicar_estilos():
+    st.markdown("""
+    <style>
+    .main {
+        background-color: #ffffff;
+    }
+    
+    /* Mejora de contraste para tabs */
+    .stTabs [data-baseweb="tab-list"] {
+        background-color: #f8f9fa;
+        border-bottom: 2px solid #dee2e6;
+        gap: 2px;
+    }
+    
+    .stTabs [data-baseweb="tab"] {
+        background-color: #ffffff;
+        color: #2d3748;
+        font-weight: 500;
+        border: 1px solid #dee2e6;
+        border-bottom: none;
+        padding: 0.5rem 1rem;
+    }
+    
+    .stTabs [data-baseweb="tab"]:hover {
+        background-color: #f1f5f9;
+        color: #1a202c;
+    }
+    
+    .stTabs [aria-selected="true"] {
+        background-color: #4a5568 !important;
+        color: #ffffff !important;
+        font-weight: 600;
+        border-color: #4a5568 !important;
+    }
+    
+    .header-principal {
+        background: linear-gradient(135deg, #4a5568 0%, #718096 100%);
+        color: white;
+        padding: 2rem;
+        border-radius: 8px;
+        margin-bottom: 2rem;
+    }
+    
+    .header-principal h1 {
+        margin: 0;
+        font-size: 2rem;
+        font-weight: 500;
+    }
+    
+    .concepto-card {
+        background: white;
+        padding: 1.5rem;
+        border-radius: 6px;
+        border-left: 3px solid #4a5568;
+        margin: 1rem 0;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+    }
+    
+    .concepto-card h4 {
+        color: #1a202c;
+        font-weight: 600;
+    }
+    
+    .concepto-card p {
+        color: #4a5568;
+    }
+    
+    .ejercicio-container {
+        background: white;
+        border: 1px solid #e2e8f0;
+        border-radius: 6px;
+        padding: 1.5rem;
+        margin: 1.5rem 0;
+    }
+    
+    .solucion-docente {
+        background: #e8f4f8;
+        border: 1px solid #2c5282;
+        border-radius: 4px;
+        padding: 1rem;
+        margin-top: 1rem;
+    }
+    
+    .modo-docente-activo {
+        background: #fed7aa;
+        color: #7c2d12;
+        padding: 0.5rem 1rem;
+        border-radius: 4px;
+        font-weight: 600;
+        text-align: center;
+        margin: 1rem 0;
+    }
+    
+    .progreso-card {
+        background: #f8f9fa;
+        padding: 1.5rem;
+        border-radius: 6px;
+        margin: 1rem 0;
+        border: 1px solid #dee2e6;
+    }
+    
+    .progreso-card h4 {
+        color: #2d3748;
+        margin-bottom: 1rem;
+    }
+    
+    .resultado-tabla {
+        background: white;
+        padding: 1rem;
+        border-radius: 4px;
+        margin: 1rem 0;
+        border: 1px solid #e5e7eb;
+    }
+    
+    .plan-consulta details {
+        margin-left: 1.2rem;
+    }
+    
+    .plan-consulta > details {
+        margin-left: 0;
+    }
+    
+    .plan-hoja {
+        margin: 0.25rem 0 0.25rem 1.2rem;
+    }
+    
+    .plan-seq {
+        background: #fed7aa;
+        color: #7c2d12;
+        padding: 0 0.4rem;
+        border-radius: 4px;
+    }
+    
+    .plan-indice {
+        background: #c6f6d5;
+        color: #22543d;
+        padding: 0 0.4rem;
+        border-radius: 4px;
+    }
+    
+    .plan-filas {
+        color: #718096;
+        font-size: 0.9rem;
+    }
+    
+    .tip-box {
+        background: #fffbeb;
+        border-left: 3px solid #d97706;
+        padding: 1rem;
+        margin: 1rem 0;
+        border-radius: 4px;
+        color: #78350f;
+    }
+    
+    /* Botones con mejor contraste */
+    .stButton > button {
+        background: #4a5568;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 0.5rem 1rem;
+        font-weight: 500;
+        transition: all 0.2s;
+    }
+    
+    .stButton > button:hover {
+        background: #2d3748;
+        color: white;
+    }
+    
+    /* Código con fondo claro para mejor legibilidad */
+    .stCode, pre {
+        background-color: #f7fafc !important;
+        color: #1a202c !important;
+        border: 1px solid #e2e8f0 !important;
+        padding: 1rem !important;
+        border-radius: 4px !important;
+    }
+    
+    /* Asegurar buen contraste en todo el texto */
+    p, li, span {
+        color: #2d3748;
+    }
+    
+    h1, h2, h3, h4, h5, h6 {
+        color: #1a202c;
+    }
+    
+    /* Radio buttons y checkboxes con mejor contraste */
+    .stRadio > label {
+        color: #2d3748 !important;
+    }
+    
+    .stCheckbox > label {
+        color: #2d3748 !important;
+    }
+    
+    /* Expander con mejor contraste */
+    .streamlit-expanderHeader {
+        background-color: #f8f9fa;
+        color: #1a202c !important;
+        border: 1px solid #dee2e6;
+    }
+    
+    /* Info, success, warning, error boxes */
+    .stAlert {
+        background-color: #f8f9fa;
+        color: #1a202c;
+        border: 1px solid #cbd5e0;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+def describir_problema(problema):
+    return f"Línea {problema['linea']}, columna {problema['columna']}: {problema['mensaje']}"
+
+def validar_sintaxis_sql(codigo):
+    analisis = analizar_sql(codigo)
+    if not analisis['sentencias'] and not analisis['errores']:
+        return False, "El código está vacío"
+
+    problemas = [describir_problema(p) for p in analisis['errores'] + analisis['advertencias']]
+    if analisis['errores']:
+        return False, "\n\n".join(problemas)
+    return True, "\n\n".join([f"Sintaxis válida: {', '.join(analisis['sentencias'])}"] + problemas)
+
+def registrar_errores_sintaxis(codigo):
+    # Alimenta los errores frecuentes del panel docente
+    for error in analizar_sql(codigo)['errores']:
+        obtener_almacen_progreso().registrar_error(error['mensaje'])
+
+def calcular_progreso_total():
+    teoria = sum(st.session_state.progreso_teoria.values())
+    ejercicios = sum(st.session_state.ejercicios_completados)
+    practica = sum(st.session_state.practica_completada)
+
+    total_items = len(st.session_state.progreso_teoria) + \
+                  len(st.session_state.ejercicios_completados) + \
+                  len(st.session_state.practica_completada)
+
+    completados = teoria + ejercicios + practica
+
+    return (completados / total_items * 100) if total_items > 0 else 0
+
+def progreso_general():
+    st.markdown("### Progreso General")
+    progreso = calcular_progreso_total()
+    st.progress(progreso / 100)
+    st.caption(f"{progreso:.0f}% completado")
+
+    with st.expander("Detalles"):
+        teoria = sum(st.session_state.progreso_teoria.values())
+        ejercicios = sum(st.session_state.ejercicios_completados)
+        practica = sum(st.session_state.practica_completada)
+
+        st.caption(f"Teoría: {teoria}/3")
+        st.caption(f"Ejercicios: {ejercicios}/5")
+        st.caption(f"Práctica: {practica}/4")
+
+@st.cache_resource
+def obtener_cache_resultados():
+    return CacheResultados()
+
+@st.cache_resource
+def obtener_pool_sandbox():
+    from laboratorio.pool import PoolSandbox
+    from laboratorio.postgres import crear_pool_postgres
+
+    # Con CBD_POSTGRES_DSN el sandbox usa PostgreSQL; sin driver o sin
+    # servidor, el motor embebido
+    pool = crear_pool_postgres()
+    return pool if pool is not None else PoolSandbox()
+
+@st.cache_resource
+def obtener_registro_tiempos():
+    return RegistroTiempos()
+
+def medir(bloque):
+    return obtener_registro_tiempos().medir(bloque)
+
+@st.cache_data
+def leer_recurso_editor(nombre):
+    return (Path(__file__).parent / "editor_sql" / nombre).read_text(encoding="utf-8")
+
+def obtener_componente_editor():
+    # El registro de componentes es del runtime: se declara en cada ejecución
+    # (es idempotente) y solo la lectura de los archivos se cachea
+    return st.components.v2.component(
+        "editor_sql",
+        html="""<div class="editor-sql">
+            <div class="area"><pre class="resaltado"></pre><textarea spellcheck="false"></textarea></div>
+            <div class="barra"></div>
+            <div class="mensajes"></div>
+        </div>""",
+        css=leer_recurso_editor("editor.css"),
+        js=leer_recurso_editor("editor.js")
+    )
+
+def editor_sql(key, codigo, version, acciones, altura=250, vacio=""):
+    # Editor con resaltado y validación en el navegador: escribir, validar,
+    # limpiar o copiar no provocan reruns. Solo las acciones que necesitan al
+    # servidor devuelven {'modo', 'codigo'}, una vez, en el rerun del clic.
+    resultado = obtener_componente_editor()(
+        key=key,
+        data={
+            'codigo': codigo,
+            'version': version,
+            'clave': key,
+            'altura': altura,
+            'vacio': vacio,
+            'acciones': [{'id': id_accion, 'etiqueta': etiqueta} for id_accion, etiqueta in acciones]
+        },
+        on_accion_change=lambda: None
+    )
+    return resultado.accion
+
+def obtener_sesion_sql(escala=1):
+    sesiones = st.session_state.sesiones_sql
+    if escala not in sesiones:
+        sesiones[escala] = obtener_pool_sandbox().sesion(escala, cache=obtener_cache_resultados())
+    return sesiones[escala]
+
+def mostrar_resultados(exito, salida, consulta=None):
+    if not exito:
+        st.error(salida)
+        return
+
+    with medir('tablas'):
+        for i, resultado in enumerate(salida):
+            if resultado['datos'] is None:
+                st.success(resultado['mensaje'])
+            elif resultado['total_filas'] > len(resultado['datos']):
+                # Otra página vuelve a ejecutar la sentencia sobre la sesión
+                # actual: si una sentencia posterior del script escribió, ya
+                # no devolvería las mismas filas
+                repetible = all(es_solo_lectura(posterior['sentencia']) for posterior in salida[i:])
+                mostrar_tabla_paginada(resultado, consulta if repetible else None, i)
+            else:
+                st.dataframe(resultado['datos'], use_container_width=True)
+                st.caption(resultado['mensaje'])
+
+def mostrar_resultado_esperado(exito, salida):
+    if not exito:
+        st.error(salida)
+        return
+    mostrar_resultados(True, [salida])
+
+def mostrar_tabla_paginada(resultado, consulta, indice):
+    datos = resultado['datos']
+    tamano = len(datos)
+    total = resultado['total_filas']
+
+    # Pedir otra página vuelve a ejecutar la sentencia: solo se ofrece para
+    # lecturas que se pueden repetir
+    if consulta is None:
+        st.dataframe(datos, use_container_width=True)
+        st.caption(f"Se muestran las primeras {tamano:,} de {total:,} filas")
+        return
+
+    paginas = -(-total // tamano)
+    numero = st.number_input(f"Página (de {paginas:,})", min_value=1, max_value=paginas,
+                             key=f"pagina_sandbox_{indice}")
+    if numero > 1:
+        # En la sesión solo se guarda la página visible, nunca el resultado completo
+        actual = consulta['paginas'].get(indice)
+        if actual is None or actual[0] != numero:
+            with st.spinner("Cargando página..."):
+                exito, pagina = consulta['sesion'].pagina(resultado['sentencia'], (numero - 1) * tamano)
+            if not exito:
+                st.error(pagina)
+                return
+            actual = (numero, pagina)
+            consulta['paginas'][indice] = actual
+        datos = actual[1]
+
+    desde = (numero - 1) * tamano
+    st.dataframe(datos, use_container_width=True)
+    st.caption(f"Filas {desde + 1:,}–{desde + len(datos):,} de {total:,}")
+
+def _html_nodo_plan(nodo):
+    clase = "plan-otro"
+    if nodo['acceso'] == 'Lectura secuencial':
+        clase = "plan-seq"
+    elif nodo['acceso']:
+        clase = "plan-indice"
+
+    etiqueta = f"<code>{html.escape(nodo['detalle'])}</code>"
+    if nodo['acceso']:
+        etiqueta += f" <span class=\"{clase}\">{nodo['acceso']}</span>"
+    if nodo['filas_estimadas'] is not None:
+        etiqueta += f" <span class=\"plan-filas\">~{nodo['filas_estimadas']:,} filas est.</span>"
+
+    if not nodo['hijos']:
+        return f"<div class=\"plan-hoja\">{etiqueta}</div>"
+    hijos = "".join(_html_nodo_plan(hijo) for hijo in nodo['hijos'])
+    return f"<details open><summary>{etiqueta}</summary>{hijos}</details>"
+
+def mostrar_plan(exito, salida):
+    if not exito:
+        st.error(salida)
+        return
+
+    for resultado in salida:
+        if not resultado['plan']:
+            continue
+
+        nodos = "".join(_html_nodo_plan(nodo) for nodo in resultado['plan'])
+        lineas = [l.strip() for l in resultado['sentencia'].splitlines() if not l.strip().startswith('--')]
+        with st.expander(f"Plan: {' '.join(lineas)[:80]}", expanded=True):
+            st.markdown(f"<div class=\"plan-consulta\"><details open><summary><strong>Consulta</strong> "
+                        f"— {resultado['filas']:,} filas en {resultado['tiempo_ms']:.2f} ms</summary>"
+                        f"{nodos}</details></div>", unsafe_allow_html=True)
+
+    if any(resultado.get('tiempos_por_nodo') for resultado in salida):
+        st.caption("Plan de PostgreSQL (EXPLAIN ANALYZE): cada nodo muestra sus filas y su tiempo reales; "
+                   "~filas est. es la estimación del planificador.")
+    else:
+        st.caption("SQLite no mide tiempos por operador: el tiempo y las filas son de la consulta completa; "
+                   "las filas por nodo son estimaciones de ANALYZE.")
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+RUTA_APP = Path(__file__).resolve().parent.parent / 'CBD_S4.py'
+RUTA_BASE = Path(__file__).resolve().parent.parent / 'latencia_base.json'
+
+# Páginas del curso (paginas/*.py), en el orden de la navegación
+PAGINAS = ["inicio", "conceptos", "ejercicios", "practica", "cheatsheet", "recursos"]
+
+# Una interacción es una regresión si supera a la base en más de esta
+# proporción y, además, en más del mínimo absoluto (por debajo es ruido)
+UMBRAL = 0.25
+MINIMO_MS = 25
+MINIMO_MB = 1
+
+def _evento_editor(at, clave, modo, codigo):
+    # AppTest no sabe disparar componentes v2: se agrega a mano el evento que
+    # enviaría el navegador con setTriggerValue
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    editor = next(elemento for elemento in at.get('bidi_component')
+                  if elemento.proto.id.endswith(f"-{clave}"))
+    estados = at._tree.get_widget_states()
+    estados.widgets.append(WidgetState(
+        id=f"$$STREAMLIT_INTERNAL_KEY_{editor.proto.id}__events",
+        json_trigger_value=json.dumps([{'event': 'accion', 'value': {'modo': modo, 'codigo': codigo}}])
+    ))
+    return at._run(estados)
+
+def _abrir(at, pagina):
+    return at.switch_page(f"paginas/{pagina}.py").run()
+
+def _casilla(at, etiqueta):
+    casilla = next(casilla for casilla in at.checkbox if casilla.key == etiqueta or casilla.label == etiqueta)
+    return casilla.check().run()
+
+def recorrido(at):
+    # Lo que hace un estudiante en una clase, seguido de lo que mira el docente.
+    # "Validar" no aparece: se resuelve en el navegador y no ejecuta el script.
+    from laboratorio.contenido import ejercicios, retos
+
+    yield "primera carga", at.run
+    for pagina in PAGINAS:
+        yield f"página {pagina}", lambda: _abrir(at, pagina)
+
+    yield "volver a Inicio", lambda: _abrir(at, "inicio")
+    yield "casilla de teoría", lambda: _casilla(at, "✓ Revisé la teoría")
+
+    yield "volver a Ejercicios", lambda: _abrir(at, "ejercicios")
+    for i, ejercicio in enumerate(ejercicios()):
+        yield f"ver resultado ejercicio {i + 1}", \
+            lambda: _evento_editor(at, f"editor_ej_{i}", 'ejecutar', ejercicio['solucion'])
+    yield "resultado esperado ejercicio 1", lambda: at.button(key="esperado_0").click().run()
+    yield "calificar ejercicio 1", \
+        lambda: _evento_editor(at, "editor_ej_0", 'calificar', ejercicios()[0]['solucion'])
+
+    yield "volver a Práctica", lambda: _abrir(at, "practica")
+    for i in range(len(retos())):
+        yield f"cargar reto {i + 1}", lambda: at.button(key=f"reto_{i}").click().run()
+    yield "casilla de reto", lambda: _casilla(at, "prac_0")
+
+    yield "activar modo docente", lambda: at.toggle(key='modo_docente').set_value(True).run()
+    yield "página Ejercicios (docente)", lambda: _abrir(at, "ejercicios")
+    yield "casilla de ejercicio", lambda: _casilla(at, "ej_1")
+    yield "página Panel docente", lambda: _abrir(at, "panel_docente")
+
+def recorrer(timeout_s, memoria=False):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(RUTA_APP), default_timeout=timeout_s)
+    mediciones = {}
+    for nombre, accion in recorrido(at):
+        if memoria:
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        accion()
+        segundos = time.perf_counter() - inicio
+        if at.exception:
+            raise RuntimeError(f"{nombre}: {at.exception[0].value}")
+        mediciones[nombre] = tracemalloc.get_traced_memory()[1] - antes if memoria else segundos
+    return mediciones
+
+def medir(repeticiones=5, timeout_s=120):
+    # El primer recorrido arranca el pool y llena las cachés del proceso: no se cuenta
+    recorrer(timeout_s)
+    tiempos = {}
+    for _ in range(repeticiones):
+        for nombre, segundos in recorrer(timeout_s).items():
+            tiempos.setdefault(nombre, []).append(segundos)
+
+    # tracemalloc frena la ejecución: la memoria se mide en una pasada aparte
+    tracemalloc.start()
+    try:
+        picos = recorrer(timeout_s, memoria=True)
+    finally:
+        tracemalloc.stop()
+
+    # Se compara el mínimo: el ruido de la máquina solo suma tiempo, nunca lo resta
+    return {
+        nombre: {
+            'segundos': min(muestras),
+            'mediana_s': statistics.median(muestras),
+            'maximo_s': max(muestras),
+            'pico_bytes': picos.get(nombre, 0)
+        }
+        for nombre, muestras in tiempos.items()
+    }
+
+def comparar(actual, base, umbral=UMBRAL):
+    regresiones = []
+    for nombre, medicion in actual.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            continue
+        for campo, minimo, unidad, escala in (('segundos', MINIMO_MS, 'ms', 1000),
+                                              ('pico_bytes', MINIMO_MB, 'MB', 1 / 1024 / 1024)):
+            valor = medicion[campo] * escala
+            referencia = anterior[campo] * escala
+            if valor > referencia * (1 + umbral) and valor - referencia > minimo:
+                regresiones.append(f"{nombre}: {valor:.1f} {unidad} (base {referencia:.1f} {unidad})")
+    return regresiones
+
+def reporte(actual, base):
+    ancho = max(len(nombre) for nombre in actual)
+    lineas = [f"{'Interacción':<{ancho}}  {'mínimo':>9}  {'mediana':>9}  {'máximo':>9}  {'base':>9}  {'pico':>8}"]
+    for nombre, medicion in actual.items():
+        referencia = base.get(nombre)
+        columna_base = f"{referencia['segundos'] * 1000:7.1f}ms" if referencia else f"{'-':>9}"
+        lineas.append(f"{nombre:<{ancho}}  {medicion['segundos'] * 1000:7.1f}ms  "
+                      f"{medicion['mediana_s'] * 1000:7.1f}ms  {medicion['maximo_s'] * 1000:7.1f}ms  {columna_base}  "
+                      f"{medicion['pico_bytes'] / 1024 / 1024:6.1f}MB")
+    return "\n".join(lineas)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m laboratorio.latencia",
+        description="Mide la latencia de cada interacción de CBD_S4.py con AppTest y la compara con una base."
+    )
+    parser.add_argument("--repeticiones", type=int, default=5, help="recorridos completos a medir (por defecto 5)")
+    parser.add_argument("--base", default=str(RUTA_BASE), help=f"archivo de la base (por defecto {RUTA_BASE.name})")
+    parser.add_argument("--guardar-base", action="store_true", help="guarda esta medición como nueva base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL,
+                        help=f"aumento tolerado antes de marcar una regresión, como fracción (por defecto {UMBRAL})")
+    parser.add_argument("--timeout", type=float, default=120, help="segundos máximos por interacción")
+    args = parser.parse_args(argumentos)
+
+    # El progreso y los errores que generan las interacciones no van a la base real
+    os.environ.setdefault('CBD_PROGRESO_DB', str(Path(tempfile.mkdtemp()) / 'progreso.sqlite'))
+
+    actual = medir(args.repeticiones, args.timeout)
+    ruta_base = Path(args.base)
+    base = json.loads(ruta_base.read_text(encoding='utf-8'))['interacciones'] if ruta_base.exists() else {}
+    print(reporte(actual, base))
+
+    if args.guardar_base:
+        import streamlit
+
+        ruta_base.write_text(json.dumps({
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'streamlit': streamlit.__version__,
+            'repeticiones': args.repeticiones,
+            'interacciones': actual
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"Base guardada en {ruta_base}")
+        return 0
+
+    if not base:
+        print(f"No hay base en {ruta_base}: ejecuta con --guardar-base para crearla")
+        return 0
+
+    regresiones = comparar(actual, base, args.umbral)
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones sobre el {args.umbral:.0%} tolerado:")
+        print("\n".join(f"  {regresion}" for regresion in regresiones))
+        return 1
+    print(f"\nSin regresiones sobre el {args.umbral:.0%} tolerado")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from laboratorio.calificador import calificar_contra, huella_esperada
+from laboratorio.contenido import ejercicios
+from laboratorio.esperados import huella_guardada
+from laboratorio.generador import ESCALAS
+from laboratorio.motor import dividir_sentencias
+
+# Cada entrega es un archivo .sql por estudiante con una sección por ejercicio,
+# encabezada por un comentario "-- Ejercicio N"
+PATRON_SECCION = re.compile(r'^[ \t]*--[ \t]*Ejercicio[ \t]+(\d+)\b[^\n]*$', re.IGNORECASE | re.MULTILINE)
+
+CAMPOS_REPORTE = ['estudiante', 'ejercicio', 'titulo', 'resultado', 'mensaje', 'segundos']
+
+# Estado de cada proceso trabajador: una sesión (un motor) y las huellas de
+# las soluciones, calculadas una sola vez por proceso antes de la primera entrega
+_sesion = None
+_esperadas = {}
+
+def dividir_entrega(texto):
+    secciones = {}
+    encabezados = list(PATRON_SECCION.finditer(texto))
+    for i, encabezado in enumerate(encabezados):
+        fin = encabezados[i + 1].start() if i + 1 < len(encabezados) else len(texto)
+        secciones[int(encabezado.group(1))] = texto[encabezado.end():fin]
+    return secciones
+
+def _iniciar_trabajador(escala, timeout_s):
+    global _sesion
+    from laboratorio.sesiones import SesionSQL
+
+    _sesion = SesionSQL(escala)
+    _sesion.establecer_limites(timeout_s)
+    # Las entregas comparten la sesión: ninguna huella esperada puede
+    # depender de lo que haya ejecutado una entrega anterior
+    for numero, ejercicio in enumerate(ejercicios(), start=1):
+        guardada = huella_guardada(escala, ejercicio['solucion'])
+        _esperadas[numero] = (True, guardada) if guardada is not None \
+            else huella_esperada(_sesion, ejercicio['solucion'])
+
+def _calificar_seccion(numero, codigo):
+    if not dividir_sentencias(codigo):
+        return 'sin respuesta', "La entrega no incluye este ejercicio"
+
+    exito, esperada = _esperadas[numero]
+    if not exito:
+        return 'error', esperada
+    exito, salida = calificar_contra(_sesion, codigo, ejercicios()[numero - 1]['solucion'], esperada)
+    if not exito:
+        return 'error', salida
+    return ('aprobado' if salida['correcto'] else 'reprobado'), salida['mensaje']
+
+def calificar_entrega(ruta):
+    secciones = dividir_entrega(Path(ruta).read_text(encoding='utf-8', errors='replace'))
+    filas = []
+    for numero, ejercicio in enumerate(ejercicios(), start=1):
+        inicio = time.perf_counter()
+        resultado, mensaje = _calificar_seccion(numero, secciones.get(numero, ""))
+        filas.append({
+            'estudiante': Path(ruta).stem,
+            'ejercicio': numero,
+            'titulo': ejercicio['titulo'],
+            'resultado': resultado,
+            'mensaje': mensaje,
+            'segundos': round(time.perf_counter() - inicio, 4)
+        })
+    return filas
+
+def calificar_directorio(directorio, escala=1, procesos=None, timeout_s=10):
+    rutas = sorted(str(ruta) for ruta in Path(directorio).glob('*.sql'))
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto,
+                             initializer=_iniciar_trabajador, initargs=(escala, timeout_s)) as pool:
+        # Lotes grandes: el costo de cada tarea es mínimo frente al de la comunicación
+        lote = max(1, len(rutas) // ((procesos or os.cpu_count() or 1) * 4))
+        return [fila for filas in pool.map(calificar_entrega, rutas, chunksize=lote) for fila in filas]
+
+def escribir_reporte(filas, salida):
+    salida = Path(salida)
+    if salida.suffix.lower() == '.json':
+        salida.write_text(json.dumps(filas, ensure_ascii=False, indent=2), encoding='utf-8')
+        return
+    with salida.open('w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=CAMPOS_REPORTE)
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+def resumen(filas):
+    lineas = []
+    for numero, ejercicio in enumerate(ejercicios(), start=1):
+        propias = [fila for fila in filas if fila['ejercicio'] == numero]
+        aprobadas = sum(fila['resultado'] == 'aprobado' for fila in propias)
+        errores = sum(fila['resultado'] == 'error' for fila in propias)
+        lineas.append(f"{ejercicio['titulo']}: {aprobadas}/{len(propias)} aprobados, {errores} con error")
+    return "\n".join(lineas)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m laboratorio.lote",
+        description="Califica un directorio de entregas .sql contra los ejercicios guiados."
+    )
+    parser.add_argument("directorio", help="directorio con un archivo .sql por estudiante")
+    parser.add_argument("--salida", default="reporte.csv", help="reporte .csv o .json (por defecto reporte.csv)")
+    parser.add_argument("--escala", choices=list(ESCALAS), default=next(iter(ESCALAS)),
+                        help="datos sobre los que se ejecutan las consultas")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--timeout", type=float, default=10, help="segundos máximos por consulta")
+    args = parser.parse_args(argumentos)
+
+    if not Path(args.directorio).is_dir():
+        parser.error(f"{args.directorio} no es un directorio")
+
+    inicio = time.perf_counter()
+    filas = calificar_directorio(args.directorio, ESCALAS[args.escala], args.procesos, args.timeout)
+    escribir_reporte(filas, args.salida)
+
+    entregas = len({fila['estudiante'] for fila in filas})
+    print(resumen(filas))
+    print(f"{entregas} entregas calificadas en {time.perf_counter() - inicio:.1f} s; reporte en {args.salida}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
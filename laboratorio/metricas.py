@@ -0,0 +1,106 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Archivo para el textfile collector de node_exporter; sin definir no se exporta
+RUTA_PROMETHEUS = os.environ.get('CBD_METRICAS_PROM')
+INTERVALO_EXPORTACION_S = float(os.environ.get('CBD_METRICAS_INTERVALO_S', 15))
+
+# Mediciones recientes por bloque con las que se calculan los percentiles
+VENTANA = 500
+
+CUANTILES = (0.5, 0.95)
+
+def percentil(ordenados, cuantil):
+    # Rango más cercano: siempre devuelve una medición real
+    if not ordenados:
+        return 0.0
+    return ordenados[max(0, math.ceil(cuantil * len(ordenados)) - 1)]
+
+class RegistroTiempos:
+    # Tiempo de pared de cada vista y bloque, medido en cada ejecución del
+    # script. Los percentiles usan una ventana de las últimas mediciones; la
+    # cantidad y la suma son acumuladas, como espera Prometheus.
+    def __init__(self, ventana=VENTANA, ruta_prometheus=RUTA_PROMETHEUS,
+                 intervalo_s=INTERVALO_EXPORTACION_S):
+        self.ventana = ventana
+        self.ruta_prometheus = Path(ruta_prometheus) if ruta_prometheus else None
+        self.intervalo_s = intervalo_s
+        self._muestras = {}
+        self._totales = {}
+        self._lock = threading.Lock()
+        self._ultima_exportacion = time.monotonic()
+
+    @contextmanager
+    def medir(self, bloque):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            # También cuenta si el bloque termina con st.rerun() o st.stop()
+            self.registrar(bloque, time.perf_counter() - inicio)
+
+    def registrar(self, bloque, segundos):
+        with self._lock:
+            if bloque not in self._muestras:
+                self._muestras[bloque] = deque(maxlen=self.ventana)
+                self._totales[bloque] = [0, 0.0]
+            self._muestras[bloque].append(segundos)
+            totales = self._totales[bloque]
+            totales[0] += 1
+            totales[1] += segundos
+
+    def _copiar(self):
+        with self._lock:
+            return {bloque: (sorted(muestras), tuple(self._totales[bloque]))
+                    for bloque, muestras in self._muestras.items()}
+
+    def resumen(self):
+        filas = []
+        for bloque, (ordenados, (cantidad, suma)) in self._copiar().items():
+            filas.append({
+                'bloque': bloque,
+                'mediciones': cantidad,
+                'p50': percentil(ordenados, 0.5),
+                'p95': percentil(ordenados, 0.95),
+                'total': suma
+            })
+        return sorted(filas, key=lambda fila: fila['p95'], reverse=True)
+
+    def texto_prometheus(self):
+        lineas = [
+            "# HELP cbd_render_segundos Tiempo de pared por vista y bloque en cada ejecución del script",
+            "# TYPE cbd_render_segundos summary"
+        ]
+        for bloque, (ordenados, (cantidad, suma)) in sorted(self._copiar().items()):
+            for cuantil in CUANTILES:
+                lineas.append(f'cbd_render_segundos{{bloque="{bloque}",quantile="{cuantil}"}} '
+                              f'{percentil(ordenados, cuantil):.6f}')
+            lineas.append(f'cbd_render_segundos_sum{{bloque="{bloque}"}} {suma:.6f}')
+            lineas.append(f'cbd_render_segundos_count{{bloque="{bloque}"}} {cantidad}')
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta=None):
+        ruta = Path(ruta) if ruta else self.ruta_prometheus
+        # El collector no debe leer nunca un archivo a medio escribir
+        temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+        temporal.write_text(self.texto_prometheus(), encoding='utf-8')
+        os.replace(temporal, ruta)
+
+    def exportar_si_corresponde(self):
+        if self.ruta_prometheus is None:
+            return
+        with self._lock:
+            ahora = time.monotonic()
+            if ahora - self._ultima_exportacion < self.intervalo_s:
+                return
+            self._ultima_exportacion = ahora
+        try:
+            self.exportar()
+        except OSError:
+            # Las métricas nunca interrumpen la clase
+            pass
@@ -0,0 +1,292 @@
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from laboratorio.calificador import huella_de_cursor
+from laboratorio.dialecto import traducir
+from laboratorio.generador import VERSION_DATOS, obtener_datos, ruta_escala
+from laboratorio.plan import explicar_sentencias
+
+ESQUEMA_SQL = """
+CREATE TABLE professors (
+    professor_id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    departamento TEXT
+);
+
+CREATE TABLE students (
+    student_id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    email TEXT NOT NULL,
+    ciudad TEXT,
+    documento TEXT,
+    activo BOOLEAN DEFAULT TRUE
+);
+
+CREATE TABLE courses (
+    course_id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    creditos INTEGER NOT NULL,
+    departamento TEXT,
+    professor_id INTEGER REFERENCES professors(professor_id)
+);
+
+CREATE TABLE enrollments (
+    enrollment_id INTEGER PRIMARY KEY,
+    student_id INTEGER REFERENCES students(student_id),
+    course_id INTEGER REFERENCES courses(course_id),
+    fecha_inscripcion DATE NOT NULL
+);
+"""
+
+ORDEN_TABLAS = ['professors', 'students', 'courses', 'enrollments']
+
+# Cada cuántas instrucciones de la VM de SQLite se revisa el tiempo límite
+INSTRUCCIONES_POR_REVISION = 10_000
+
+# Lo que el SQL del estudiante no puede hacer: adjuntar otras bases (VACUUM
+# también adjunta una), terminar la transacción con la que el motor descarta
+# cambios ni quitar los límites del sandbox
+ACCIONES_PROHIBIDAS = {
+    sqlite3.SQLITE_ATTACH: "adjuntar otras bases de datos (ATTACH, VACUUM)",
+    sqlite3.SQLITE_DETACH: "separar bases de datos adjuntas (DETACH)",
+    sqlite3.SQLITE_TRANSACTION: "controlar transacciones (BEGIN, COMMIT, ROLLBACK): "
+                                "cada sentencia ya confirma sus cambios en tu sesión",
+    sqlite3.SQLITE_SAVEPOINT: "controlar transacciones (SAVEPOINT, RELEASE)"
+}
+PRAGMAS_PROHIBIDAS = {'hard_heap_limit', 'soft_heap_limit'}
+
+def _tiene_contenido(sentencia):
+    sin_comentarios = re.sub(r'--[^\n]*|/\*.*?\*/', '', sentencia, flags=re.DOTALL)
+    return sin_comentarios.strip().strip(';').strip() != ""
+
+def dividir_sentencias(codigo):
+    sentencias = []
+    actual = ""
+    for fragmento in codigo.split(';'):
+        actual += fragmento + ';'
+        if sqlite3.complete_statement(actual):
+            if _tiene_contenido(actual):
+                sentencias.append(actual.strip())
+            actual = ""
+
+    actual = actual[:-1]
+    if _tiene_contenido(actual):
+        sentencias.append(actual.strip())
+
+    return sentencias
+
+def cargar_tablas(conn, tablas):
+    conn.executescript(ESQUEMA_SQL)
+    conn.execute("BEGIN")
+    for nombre in ORDEN_TABLAS:
+        df = tablas[nombre]
+        columnas = ", ".join(df.columns)
+        marcadores = ", ".join("?" * len(df.columns))
+        conn.executemany(
+            f"INSERT INTO {nombre} ({columnas}) VALUES ({marcadores})",
+            zip(*(df[columna].tolist() for columna in df.columns))
+        )
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+
+def version_dataset(escala):
+    return f"escala={escala}/v{VERSION_DATOS}"
+
+def ruta_base_sqlite(escala):
+    return ruta_escala(escala) / "base.sqlite"
+
+def construir_base_sqlite(escala):
+    ruta = ruta_base_sqlite(escala)
+    if ruta.exists():
+        return ruta
+
+    tablas = obtener_datos(escala)
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix='.sqlite.tmp')
+    os.close(descriptor)
+    conn = sqlite3.connect(temporal, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        cargar_tablas(conn, tablas)
+    finally:
+        conn.close()
+    # La base es compartida por todas las sesiones: nadie la escribe después de construirla
+    os.chmod(temporal, 0o444)
+    os.replace(temporal, ruta)
+    return ruta
+
+class MotorSQL:
+    def __init__(self, conn, version):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self.version = version
+        self.filas_por_pagina = None
+        self._timeout_s = None
+        self._memoria_mb = None
+        self._limite = None
+        self._sentencia_interna = False
+        self._prohibida = None
+
+    def ejecutar(self, codigo):
+        sentencias = dividir_sentencias(codigo)
+        if not sentencias:
+            return False, "El código está vacío"
+
+        return self._ejecutar_protegido(sentencias)
+
+    def establecer_limites(self, timeout_s=None, filas_por_pagina=None, memoria_mb=None):
+        self.filas_por_pagina = filas_por_pagina
+        self._timeout_s = timeout_s
+        self._memoria_mb = memoria_mb
+        if memoria_mb is not None:
+            # hard_heap_limit es global al proceso: pensado para procesos trabajadores
+            self._interna(f"PRAGMA hard_heap_limit = {memoria_mb * 1024 * 1024}")
+        if timeout_s is not None:
+            self._conn.set_progress_handler(self._tiempo_agotado, INSTRUCCIONES_POR_REVISION)
+
+    def _tiempo_agotado(self):
+        return self._limite is not None and time.monotonic() > self._limite
+
+    def _iniciar_reloj(self):
+        if self._timeout_s is not None:
+            self._limite = time.monotonic() + self._timeout_s
+
+    def _autorizar(self, accion, argumento1, argumento2, base, origen):
+        # Autorizador de la conexión: SQLite lo consulta al preparar cada sentencia
+        if self._sentencia_interna:
+            return sqlite3.SQLITE_OK
+        if accion == sqlite3.SQLITE_PRAGMA and argumento1.lower() in PRAGMAS_PROHIBIDAS:
+            self._prohibida = f"cambiar los límites del sandbox (PRAGMA {argumento1})"
+            return sqlite3.SQLITE_DENY
+        if accion in ACCIONES_PROHIBIDAS:
+            self._prohibida = ACCIONES_PROHIBIDAS[accion]
+            return sqlite3.SQLITE_DENY
+        return sqlite3.SQLITE_OK
+
+    def _interna(self, sentencia):
+        # Sentencias del propio motor que el autorizador le niega al estudiante
+        self._sentencia_interna = True
+        try:
+            return self._conn.execute(sentencia)
+        finally:
+            self._sentencia_interna = False
+
+    def _mensaje_error(self, error):
+        # La negativa del autorizador llega como "not authorized" o, dentro de
+        # VACUUM, "authorization denied"
+        if self._prohibida is not None and 'authoriz' in str(error):
+            return f"El laboratorio no permite {self._prohibida}"
+        if self._tiempo_agotado():
+            return f"La consulta superó el tiempo límite de {self._timeout_s:g} s y fue cancelada"
+        if self._memoria_mb is not None and 'out of memory' in str(error):
+            return f"La consulta superó el límite de memoria del sandbox ({self._memoria_mb} MB)"
+        return f"Error en la consulta: {error}"
+
+    def _ejecutar_protegido(self, sentencias):
+        with self._lock:
+            self._iniciar_reloj()
+            try:
+                return True, self._ejecutar_sentencias(sentencias)
+            except sqlite3.Error as e:
+                return False, self._mensaje_error(e)
+
+    def pagina(self, sentencia, desde, cantidad):
+        # Sin cursores que sobrevivan entre procesos, cada página vuelve a
+        # ejecutar la consulta, con LIMIT/OFFSET: SQLite salta las filas
+        # anteriores sin pasarlas a Python
+        consulta = re.sub(r'[\s;]+$', '', self._preparar(sentencia))
+        with self._lock:
+            self._iniciar_reloj()
+            try:
+                # El salto de línea evita que un comentario final se coma el paréntesis
+                cursor = self._conn.execute(f"SELECT * FROM ({consulta}\n) LIMIT ? OFFSET ?", (cantidad, desde))
+                # En la subconsulta SQLite renombra las columnas repetidas (nombre:1)
+                columnas = [re.sub(r':\d+$', '', col[0]) for col in cursor.description]
+                return True, pd.DataFrame(cursor.fetchall(), columns=columnas)
+            except sqlite3.Error as e:
+                return False, self._mensaje_error(e)
+
+    def explicar(self, codigo):
+        sentencias = dividir_sentencias(codigo)
+        if not sentencias:
+            return False, "El código está vacío"
+
+        with self._lock:
+            self._iniciar_reloj()
+            self._interna("BEGIN")
+            try:
+                return True, explicar_sentencias(self._conn, [self._preparar(s) for s in sentencias])
+            except sqlite3.Error as e:
+                return False, self._mensaje_error(e)
+            finally:
+                self._descartar_transaccion()
+
+    def huella(self, codigo, claves=None, consulta=None):
+        # Huella del resultado final sin materializarlo; consulta reemplaza a la
+        # última sentencia como fuente de las filas (el contenido de una vista)
+        sentencias = dividir_sentencias(codigo)
+        if not sentencias:
+            return False, "El código está vacío"
+
+        with self._lock:
+            self._iniciar_reloj()
+            self._interna("BEGIN")
+            try:
+                for sentencia in sentencias[:-1]:
+                    self._ejecutar_sentencia(sentencia)
+                cursor = self._conn.execute(self._preparar(sentencias[-1]))
+                if consulta is not None:
+                    cursor = self._conn.execute(consulta)
+                if cursor.description is None:
+                    return True, None
+                return True, huella_de_cursor(cursor, claves)
+            except sqlite3.Error as e:
+                return False, self._mensaje_error(e)
+            finally:
+                self._descartar_transaccion()
+
+    def _preparar(self, sentencia):
+        return traducir(sentencia)
+
+    def _ejecutar_sentencia(self, sentencia):
+        cursor = self._conn.execute(self._preparar(sentencia))
+        return resultado_de_cursor(sentencia, cursor, self.filas_por_pagina)
+
+    def _ejecutar_sentencias(self, sentencias):
+        # Cada ejecución corre en una transacción que se descarta al final,
+        # así el DDL/DML de un estudiante no modifica los datos compartidos.
+        self._interna("BEGIN")
+        try:
+            return [self._ejecutar_sentencia(sentencia) for sentencia in sentencias]
+        finally:
+            self._descartar_transaccion()
+
+    def _descartar_transaccion(self):
+        if self._conn.in_transaction:
+            self._interna("ROLLBACK")
+
+def resultado_de_cursor(sentencia, cursor, filas_por_pagina=None):
+    if cursor.description is not None:
+        columnas = [col[0] for col in cursor.description]
+        if filas_por_pagina is None:
+            filas = cursor.fetchall()
+            total = len(filas)
+        else:
+            # Solo la primera página se materializa; el resto se cuenta
+            filas = cursor.fetchmany(filas_por_pagina)
+            total = len(filas) + sum(1 for _ in cursor)
+        datos = pd.DataFrame(filas, columns=columnas)
+        return {'sentencia': sentencia, 'datos': datos, 'mensaje': f"{total} filas", 'total_filas': total}
+
+    comando = re.sub(r'--[^\n]*', '', sentencia).split()[0].upper()
+    if cursor.rowcount >= 0:
+        mensaje = f"{comando} ejecutado: {cursor.rowcount} filas afectadas"
+    else:
+        mensaje = f"{comando} ejecutado correctamente"
+    return {'sentencia': sentencia, 'datos': None, 'mensaje': mensaje}
@@ -0,0 +1,122 @@
+import re
+import sqlite3
+import time
+
+PATRON_ACCESO = re.compile(
+    r'^(?P<operacion>SCAN|SEARCH) (?P<tabla>\w+)'
+    r'(?: USING (?P<automatico>AUTOMATIC )?(?:COVERING )?'
+    r'(?:INDEX (?P<indice>\w+)|(?P<pk>INTEGER PRIMARY KEY|PRIMARY KEY)))?'
+    r'(?: \((?P<condicion>.*)\))?'
+)
+PATRON_ALIAS = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)'
+    r'(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|INNER|LEFT|RIGHT|CROSS|GROUP|ORDER|LIMIT|HAVING)\b)(\w+))?',
+    re.IGNORECASE
+)
+
+def _alias_tablas(sentencia):
+    alias = {}
+    for tabla, nombre in PATRON_ALIAS.findall(sentencia):
+        alias[tabla.lower()] = tabla.lower()
+        if nombre:
+            alias[nombre.lower()] = tabla.lower()
+    return alias
+
+def _estadisticas(conn):
+    estadisticas = {}
+    try:
+        for tabla, indice, stat in conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1"):
+            valores = [int(v) for v in stat.split() if v.isdigit()]
+            estadisticas[(tabla.lower(), (indice or '').lower())] = valores
+    except sqlite3.OperationalError:
+        # Sin ANALYZE previo no hay estadísticas: el plan se muestra sin estimaciones
+        pass
+    return estadisticas
+
+def _filas_tabla(estadisticas, tabla):
+    for (nombre, _), valores in estadisticas.items():
+        if nombre == tabla and valores:
+            return valores[0]
+    return None
+
+def clasificar_nodo(detalle, alias, estadisticas):
+    coincidencia = PATRON_ACCESO.match(detalle)
+    if not coincidencia:
+        return {'detalle': detalle, 'acceso': None, 'tabla': None, 'filas_estimadas': None}
+
+    tabla = alias.get(coincidencia.group('tabla').lower(), coincidencia.group('tabla').lower())
+    condicion = coincidencia.group('condicion') or ""
+    igualdades = condicion.count('=') - condicion.count('>=') - condicion.count('<=')
+    filas_tabla = _filas_tabla(estadisticas, tabla)
+    filas = None
+
+    if coincidencia.group('operacion') == 'SCAN':
+        acceso = 'Lectura secuencial' if not coincidencia.group('indice') else 'Recorrido completo de índice'
+        filas = filas_tabla
+    elif coincidencia.group('automatico'):
+        acceso = 'Índice automático (temporal)'
+    elif coincidencia.group('pk'):
+        acceso = 'Búsqueda por clave primaria'
+        filas = 1 if igualdades > 0 and '>' not in condicion and '<' not in condicion else None
+    else:
+        acceso = 'Búsqueda por índice'
+        stat = estadisticas.get((tabla, coincidencia.group('indice').lower()))
+        if stat and 0 < igualdades < len(stat) and '>' not in condicion and '<' not in condicion:
+            filas = stat[igualdades]
+
+    return {'detalle': detalle, 'acceso': acceso, 'tabla': tabla, 'filas_estimadas': filas}
+
+def _arbol(filas_plan, alias, estadisticas):
+    nodos = {0: {'hijos': []}}
+    for identificador, padre, _, detalle in filas_plan:
+        nodo = clasificar_nodo(detalle, alias, estadisticas)
+        nodo['hijos'] = []
+        nodos[identificador] = nodo
+        nodos.get(padre, nodos[0])['hijos'].append(nodo)
+    return nodos[0]['hijos']
+
+def explicar_sentencias(conn, sentencias):
+    estadisticas = _estadisticas(conn)
+    resultados = []
+    for sentencia in sentencias:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sentencia}").fetchall()
+
+        inicio = time.perf_counter()
+        cursor = conn.execute(sentencia)
+        # Se cuentan las filas sin materializarlas
+        filas = sum(1 for _ in cursor) if cursor.description is not None else max(cursor.rowcount, 0)
+        tiempo = (time.perf_counter() - inicio) * 1000
+
+        resultados.append({
+            'sentencia': sentencia,
+            'plan': _arbol(plan, _alias_tablas(sentencia), estadisticas),
+            'filas': filas,
+            'tiempo_ms': tiempo
+        })
+    return resultados
+
+ACCESOS_POSTGRES = {
+    'Seq Scan': 'Lectura secuencial',
+    'Index Scan': 'Búsqueda por índice',
+    'Index Only Scan': 'Búsqueda por índice',
+    'Bitmap Index Scan': 'Búsqueda por índice'
+}
+
+def arbol_postgres(plan):
+    # Un nodo de EXPLAIN (ANALYZE, FORMAT JSON) con la forma de clasificar_nodo;
+    # a diferencia de SQLite, cada nodo trae sus filas y su tiempo reales
+    detalle = plan['Node Type']
+    if 'Relation Name' in plan:
+        detalle += f" on {plan['Relation Name']}"
+    if 'Index Name' in plan:
+        detalle += f" using {plan['Index Name']}"
+    if 'Actual Rows' in plan:
+        detalle += (f" (real: {plan['Actual Rows']:,} filas × {plan['Actual Loops']}, "
+                    f"{plan['Actual Total Time']:.2f} ms)")
+    return {
+        'detalle': detalle,
+        'acceso': ACCESOS_POSTGRES.get(plan['Node Type']),
+        'tabla': plan.get('Relation Name'),
+        'filas_estimadas': plan['Plan Rows'],
+        'hijos': [arbol_postgres(hijo) for hijo in plan.get('Plans', [])]
+    }
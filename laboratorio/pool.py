@@ -0,0 +1,395 @@
+import multiprocessing
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+
+from laboratorio.cache import clave_cache, es_solo_lectura, tamano_resultados
+from laboratorio.motor import construir_base_sqlite, dividir_sentencias, ruta_base_sqlite, version_dataset
+
+PROCESOS = int(os.environ.get('CBD_SANDBOX_PROCESOS', min(4, os.cpu_count() or 1)))
+TIMEOUT_S = float(os.environ.get('CBD_SANDBOX_TIMEOUT_S', 10))
+FILAS_POR_PAGINA = int(os.environ.get('CBD_SANDBOX_FILAS_POR_PAGINA', 500))
+MEMORIA_MB = int(os.environ.get('CBD_SANDBOX_MEMORIA_MB', 512))
+
+DIRECTORIO_CAPAS = os.path.join(tempfile.gettempdir(), 'cbd_sesiones')
+
+# Margen para que el propio trabajador interrumpa la consulta antes de matarlo
+GRACIA_S = 2.0
+
+class TrabajoSQL:
+    def __init__(self, tarea):
+        self.tarea = tarea
+        self.estado = 'en cola'
+        self.resultado = None
+        self.inicio = None
+        self.fin = None
+        self.clave_cache = None
+        self._lock = threading.Lock()
+        self._listo = threading.Event()
+        self._cancelar = threading.Event()
+
+    @property
+    def terminado(self):
+        return self._listo.is_set()
+
+    @property
+    def transcurrido(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.monotonic()) - self.inicio
+
+    def cancelar(self):
+        with self._lock:
+            self._cancelar.set()
+            if self.estado != 'en cola':
+                return
+        # Un trabajo que aún espera turno se descarta sin ocupar un proceso
+        self._terminar('cancelado', _respuesta_error("Consulta cancelada"))
+
+    def esperar(self, timeout=None):
+        self._listo.wait(timeout)
+        return self.resultado
+
+    def _comenzar(self):
+        with self._lock:
+            if self._cancelar.is_set():
+                return False
+            self.estado = 'ejecutando'
+            self.inicio = time.monotonic()
+            return True
+
+    def _terminar(self, estado, resultado):
+        self.estado = estado
+        self.resultado = resultado
+        self.fin = time.monotonic()
+        self._listo.set()
+
+def _limitar_memoria(memoria_mb):
+    try:
+        import resource
+    except ImportError:
+        return
+
+    # El límite se suma al tamaño actual del proceso: el intérprete y pandas
+    # ya ocupan buena parte del espacio de direcciones antes de la primera consulta
+    try:
+        with open('/proc/self/statm') as statm:
+            actual = int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return
+    limite = actual + memoria_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+def _calificar_tarea(tarea):
+    from laboratorio.calificador import calificar
+
+    try:
+        exito, salida = calificar(tarea['escala'], tarea['codigo'], tarea['solucion'],
+                                  tarea['timeout_s'], tarea['memoria_mb'])
+    except MemoryError:
+        exito, salida = False, f"La consulta superó el límite de memoria del sandbox ({tarea['memoria_mb']} MB)"
+    # Calificar usa sesiones propias en memoria: la capa del estudiante no cambia
+    return {'exito': exito, 'salida': salida, 'modificada': False}
+
+def _esperado_tarea(tarea):
+    from laboratorio.esperados import obtener_esperado
+
+    try:
+        exito, salida = obtener_esperado(tarea['escala'], tarea['codigo'], tarea['timeout_s'], tarea['memoria_mb'])
+    except MemoryError:
+        exito, salida = False, f"La consulta superó el límite de memoria del sandbox ({tarea['memoria_mb']} MB)"
+    return {'exito': exito, 'salida': salida, 'modificada': False}
+
+def _ejecutar_tarea(tarea):
+    from laboratorio.sesiones import SesionSQL
+
+    if tarea['modo'] == 'calificar':
+        return _calificar_tarea(tarea)
+    if tarea['modo'] == 'esperado':
+        return _esperado_tarea(tarea)
+
+    sesion = SesionSQL(tarea['escala'], ruta_capa=tarea['ruta_capa'])
+    sesion.establecer_limites(tarea['timeout_s'], tarea['filas_por_pagina'], tarea['memoria_mb'])
+    try:
+        if tarea['modo'] == 'explicar':
+            exito, salida = sesion.explicar(tarea['codigo'])
+        elif tarea['modo'] == 'pagina':
+            exito, salida = sesion.pagina(tarea['codigo'], tarea['desde'], tarea['filas_por_pagina'])
+        else:
+            exito, salida = sesion.ejecutar(tarea['codigo'])
+    except MemoryError:
+        exito, salida = False, f"La consulta superó el límite de memoria del sandbox ({tarea['memoria_mb']} MB)"
+    finally:
+        sesion.cerrar()
+    return {'exito': exito, 'salida': salida, 'modificada': sesion.modificada}
+
+def _proceso_trabajador(conexion, memoria_mb):
+    _limitar_memoria(memoria_mb)
+    while True:
+        try:
+            tarea = conexion.recv()
+        except EOFError:
+            return
+        if tarea is None:
+            return
+        try:
+            respuesta = _ejecutar_tarea(tarea)
+        except (sqlite3.Error, OSError) as e:
+            respuesta = {'exito': False, 'salida': f"Error en el sandbox: {e}", 'modificada': True}
+        conexion.send(respuesta)
+
+class _Trabajador:
+    def __init__(self, contexto, memoria_mb):
+        self._contexto = contexto
+        self._memoria_mb = memoria_mb
+        self._iniciar()
+
+    def _iniciar(self):
+        self.conexion, extremo = self._contexto.Pipe()
+        self.proceso = self._contexto.Process(target=_proceso_trabajador,
+                                              args=(extremo, self._memoria_mb), daemon=True)
+        self.proceso.start()
+        extremo.close()
+
+    def reiniciar(self):
+        self.proceso.kill()
+        self.proceso.join()
+        self.conexion.close()
+        self._iniciar()
+
+    def detener(self):
+        try:
+            self.conexion.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.proceso.join(timeout=1)
+        if self.proceso.is_alive():
+            self.proceso.kill()
+
+class PoolSandbox:
+    # Pool acotado de procesos que ejecutan el SQL de los estudiantes. Una
+    # consulta que se cuelga o agota la memoria solo afecta a su proceso, que
+    # se mata y se reemplaza; el servidor de Streamlit nunca la ejecuta.
+    def __init__(self, procesos=PROCESOS, timeout_s=TIMEOUT_S, filas_por_pagina=FILAS_POR_PAGINA,
+                 memoria_mb=MEMORIA_MB):
+        self.timeout_s = timeout_s
+        self.filas_por_pagina = filas_por_pagina
+        self.memoria_mb = memoria_mb
+        self._cola = queue.Queue()
+        self._contexto = multiprocessing.get_context('spawn')
+        self._preparaciones = {}
+        self._lock_preparaciones = threading.Lock()
+        self._trabajadores = [_Trabajador(self._contexto, memoria_mb) for _ in range(procesos)]
+        for trabajador in self._trabajadores:
+            threading.Thread(target=self._atender, args=(trabajador,), daemon=True).start()
+
+    def enviar(self, escala, ruta_capa, codigo, modo='ejecutar', desde=0, solucion=None):
+        trabajo = TrabajoSQL({
+            'escala': escala,
+            'ruta_capa': ruta_capa,
+            'codigo': codigo,
+            'modo': modo,
+            'desde': desde,
+            'solucion': solucion,
+            'timeout_s': self.timeout_s,
+            'filas_por_pagina': self.filas_por_pagina,
+            'memoria_mb': self.memoria_mb
+        })
+        self._cola.put(trabajo)
+        return trabajo
+
+    def ejecutar(self, escala, ruta_capa, codigo, modo='ejecutar', desde=0, solucion=None):
+        return self.enviar(escala, ruta_capa, codigo, modo, desde, solucion).esperar()
+
+    def sesion(self, escala, cache=None):
+        return SesionSandbox(escala, self, cache)
+
+    def preparar(self, escala):
+        # La base de una escala se construye una sola vez y en un proceso
+        # aparte: fuera del servidor de Streamlit y sin el límite de memoria
+        # de los trabajadores, en el que generar 1M× no cabe. Devuelve el
+        # evento que marca el fin de la construcción, o None si ya existe.
+        if ruta_base_sqlite(escala).exists():
+            return None
+        with self._lock_preparaciones:
+            lista = self._preparaciones.get(escala)
+            if lista is None:
+                lista = threading.Event()
+                self._preparaciones[escala] = lista
+                threading.Thread(target=self._construir_base, args=(escala, lista), daemon=True).start()
+        return lista
+
+    def _construir_base(self, escala, lista):
+        proceso = self._contexto.Process(target=construir_base_sqlite, args=(escala,), daemon=True)
+        proceso.start()
+        proceso.join()
+        # Si falló, el próximo trabajo de la escala vuelve a intentarlo
+        with self._lock_preparaciones:
+            del self._preparaciones[escala]
+        lista.set()
+
+    def _esperar_datos(self, trabajo):
+        escala = trabajo.tarea['escala']
+        lista = self.preparar(escala)
+        if lista is None:
+            return True
+
+        trabajo.estado = 'preparando datos'
+        while not lista.wait(0.05):
+            if trabajo._cancelar.is_set():
+                trabajo._terminar('cancelado', _respuesta_error("Consulta cancelada"))
+                return False
+        if not ruta_base_sqlite(escala).exists():
+            trabajo._terminar('terminado', {
+                'exito': False,
+                'salida': "No se pudieron preparar los datos de esta escala; intenta de nuevo",
+                'modificada': False
+            })
+            return False
+        trabajo.estado = 'ejecutando'
+        return True
+
+    def detener(self):
+        for _ in self._trabajadores:
+            self._cola.put(None)
+        for trabajador in self._trabajadores:
+            trabajador.detener()
+
+    def _atender(self, trabajador):
+        while True:
+            trabajo = self._cola.get()
+            if trabajo is None:
+                return
+            if not trabajo._comenzar() or not self._esperar_datos(trabajo):
+                continue
+
+            trabajador.conexion.send(trabajo.tarea)
+            limite = time.monotonic() + self.timeout_s + GRACIA_S
+
+            while True:
+                if trabajador.conexion.poll(0.05):
+                    try:
+                        trabajo._terminar('terminado', trabajador.conexion.recv())
+                    except (EOFError, OSError):
+                        trabajador.reiniciar()
+                        trabajo._terminar('terminado', _respuesta_error(
+                            f"El proceso del sandbox terminó inesperadamente (posible exceso "
+                            f"de memoria, límite {self.memoria_mb} MB)"
+                        ))
+                    break
+
+                if trabajo._cancelar.is_set():
+                    trabajador.reiniciar()
+                    trabajo._terminar('cancelado', _respuesta_error("Consulta cancelada"))
+                    break
+
+                if time.monotonic() > limite:
+                    trabajador.reiniciar()
+                    trabajo._terminar('cancelado', _respuesta_error(
+                        f"La consulta superó el tiempo límite de {self.timeout_s:g} s y fue cancelada"
+                    ))
+                    break
+
+def _respuesta_error(mensaje):
+    # Tras matar un proceso no se sabe qué alcanzó a escribir en la capa
+    return {'exito': False, 'salida': mensaje, 'modificada': True}
+
+def _trabajo_resuelto(exito, salida):
+    trabajo = TrabajoSQL(None)
+    trabajo._comenzar()
+    trabajo._terminar('terminado', {'exito': exito, 'salida': salida, 'modificada': False})
+    return trabajo
+
+class SesionSandbox:
+    # Lado Streamlit de una SesionSQL: la capa copy-on-write vive en un archivo
+    # propio de la sesión y cualquier proceso del pool puede abrirla.
+    def __init__(self, escala, pool, cache=None):
+        self.escala = escala
+        self.version = version_dataset(escala)
+        self.modificada = False
+        self._pool = pool
+        self._cache = cache
+        os.makedirs(DIRECTORIO_CAPAS, exist_ok=True)
+        # capa: lo que el pool necesita para encontrar los cambios de la sesión
+        descriptor, self.capa = tempfile.mkstemp(dir=DIRECTORIO_CAPAS, suffix='.sqlite')
+        os.close(descriptor)
+        self._finalizador = weakref.finalize(self, _eliminar_capa, self.capa)
+
+    def enviar(self, codigo, modo='ejecutar'):
+        if not dividir_sentencias(codigo):
+            return _trabajo_resuelto(False, "El código está vacío")
+
+        # Antes de enviarlo: si el trabajo se reemplaza sin recibir su respuesta,
+        # la sesión ya no debe leer ni llenar la caché compartida
+        if not es_solo_lectura(codigo):
+            self.modificada = True
+
+        clave = None
+        if modo == 'ejecutar':
+            clave = clave_cache(self._cache, self.version, codigo, not self.modificada)
+            resultados = self._cache.obtener(clave) if clave is not None else None
+            if resultados is not None:
+                return _trabajo_resuelto(True, resultados)
+
+        trabajo = self._pool.enviar(self.escala, self.capa, codigo, modo)
+        trabajo.clave_cache = clave
+        return trabajo
+
+    def recibir(self, trabajo):
+        respuesta = trabajo.esperar()
+        self.modificada = self.modificada or respuesta['modificada']
+        if respuesta['exito'] and trabajo.clave_cache is not None:
+            salida = respuesta['salida']
+            tamano = tamano_resultados(salida) if isinstance(salida, list) \
+                else int(salida.memory_usage(deep=True).sum())
+            self._cache.guardar(trabajo.clave_cache, salida, tamano)
+            trabajo.clave_cache = None
+        return respuesta['exito'], respuesta['salida']
+
+    def ejecutar(self, codigo):
+        return self.recibir(self.enviar(codigo))
+
+    def explicar(self, codigo):
+        return self.recibir(self.enviar(codigo, 'explicar'))
+
+    def calificar(self, codigo, solucion):
+        if not dividir_sentencias(codigo):
+            return False, "El código está vacío"
+        return self.recibir(self._pool.enviar(self.escala, None, codigo, 'calificar', solucion=solucion))
+
+    def esperado(self, codigo):
+        # Si ya está en disco (compilado o calculado antes por cualquier
+        # sesión) se lee sin pasar por el pool
+        from laboratorio.esperados import leer_esperado
+
+        resultado = leer_esperado(self.escala, codigo)
+        if resultado is not None:
+            return True, resultado
+        return self.recibir(self._pool.enviar(self.escala, None, codigo, 'esperado'))
+
+    def pagina(self, sentencia, desde):
+        clave = clave_cache(self._cache, self.version, sentencia, not self.modificada)
+        if clave is not None:
+            clave += ('pagina', desde, self._pool.filas_por_pagina)
+            datos = self._cache.obtener(clave)
+            if datos is not None:
+                return True, datos
+
+        trabajo = self._pool.enviar(self.escala, self.capa, sentencia, 'pagina', desde)
+        trabajo.clave_cache = clave
+        return self.recibir(trabajo)
+
+    def reiniciar(self):
+        _eliminar_capa(self.capa)
+        self.modificada = False
+
+def _eliminar_capa(ruta):
+    for sufijo in ('', '-journal', '-wal', '-shm'):
+        try:
+            os.remove(ruta + sufijo)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,480 @@
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+import weakref
+
+import pandas as pd
+
+from laboratorio.cache import es_solo_lectura
+from laboratorio.calificador import calificar_contra, huella_de_cursor, huella_esperada
+from laboratorio.generador import VERSION_DATOS, obtener_datos
+from laboratorio.motor import ESQUEMA_SQL, ORDEN_TABLAS, dividir_sentencias, resultado_de_cursor, version_dataset
+from laboratorio.plan import arbol_postgres
+from laboratorio.pool import FILAS_POR_PAGINA, GRACIA_S, PROCESOS, TIMEOUT_S, PoolSandbox, SesionSandbox, TrabajoSQL
+from laboratorio.sesiones import COMENTARIOS_INICIALES, PATRON_DROP_TABLE, PATRON_TABLA_ESCRITA
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+# Sin DSN (o sin psycopg, o sin servidor) el sandbox usa el motor embebido
+DSN = os.environ.get('CBD_POSTGRES_DSN', '')
+CONEXIONES = int(os.environ.get('CBD_POSTGRES_CONEXIONES', PROCESOS))
+
+# Filas por cada COPY al cargar los datos de una escala
+FILAS_POR_COPY = 100_000
+
+# Sin conexiones sanas, cada cuánto se vuelve a probar el servidor al abrir una sesión
+REINTENTO_S = 30
+
+SENTENCIAS_EXPLICABLES = {'SELECT', 'WITH', 'VALUES', 'INSERT', 'UPDATE', 'DELETE'}
+
+# Rol de grupo de las sesiones: solo puede leer los esquemas de datos. Cada
+# sesión corre con un rol propio, miembro de este, que solo puede crear en
+# su esquema
+ROL_ESTUDIANTES = 'cbd_estudiantes'
+
+# Cambiar el rol o la configuración de la conexión, o salir de la
+# transacción con la que explicar y calificar descartan sus cambios
+PATRON_SENTENCIA_PROHIBIDA = re.compile(
+    COMENTARIOS_INICIALES +
+    r'(SET|RESET|DISCARD|BEGIN|START|COMMIT|END|ROLLBACK|ABORT|SAVEPOINT|RELEASE|PREPARE\s+TRANSACTION|DO'
+    r'|CREATE\s+(?:OR\s+REPLACE\s+)?(?:FUNCTION|PROCEDURE))\b',
+    re.IGNORECASE | re.DOTALL
+)
+# set_config cambia el rol como SET ROLE y query_to_xml ejecuta SQL dinámico;
+# con U&"..." sus nombres se podrían escribir de otra forma
+PATRON_FUNCION_PROHIBIDA = re.compile(r'\b(?:set_config|query_to_xml\w*)\b|U&"', re.IGNORECASE)
+
+def crear_rol_estudiantes(conn):
+    with conn.transaction():
+        conn.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (ROL_ESTUDIANTES,))
+        if not conn.execute("SELECT 1 FROM pg_roles WHERE rolname = %s", (ROL_ESTUDIANTES,)).fetchone():
+            conn.execute(f"CREATE ROLE {ROL_ESTUDIANTES} NOLOGIN")
+
+def eliminar_capa(conn, capa):
+    # El esquema y el rol de una sesión (o de una calificación) llevan el mismo nombre
+    conn.execute(f"DROP SCHEMA IF EXISTS {capa} CASCADE")
+    if conn.execute("SELECT 1 FROM pg_roles WHERE rolname = %s", (capa,)).fetchone():
+        conn.execute(f"DROP OWNED BY {capa}")
+        conn.execute(f"DROP ROLE {capa}")
+
+def esquema_datos(escala):
+    return f"cbd_datos_v{VERSION_DATOS}_e{escala}"
+
+def cargar_esquema_datos(conn, escala):
+    esquema = esquema_datos(escala)
+    with conn.transaction():
+        # Varios servidores de la app pueden compartir la base: uno carga los
+        # datos y los demás esperan el bloqueo y encuentran el esquema listo
+        conn.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (esquema,))
+        if not conn.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", (esquema,)).fetchone():
+            conn.execute(f"CREATE SCHEMA {esquema}")
+            conn.execute(f"SET LOCAL search_path TO {esquema}")
+            conn.execute(ESQUEMA_SQL)
+            tablas = obtener_datos(escala)
+            for nombre in ORDEN_TABLAS:
+                df = tablas[nombre]
+                with conn.cursor().copy(f"COPY {nombre} ({', '.join(df.columns)}) FROM STDIN (FORMAT csv)") as copia:
+                    for desde in range(0, len(df), FILAS_POR_COPY):
+                        copia.write(df.iloc[desde:desde + FILAS_POR_COPY].to_csv(index=False, header=False))
+                conn.execute(f"ANALYZE {nombre}")
+
+        # Los datos son del usuario de la app; las sesiones solo los leen
+        conn.execute(f"GRANT USAGE ON SCHEMA {esquema} TO {ROL_ESTUDIANTES}")
+        conn.execute(f"GRANT SELECT ON ALL TABLES IN SCHEMA {esquema} TO {ROL_ESTUDIANTES}")
+    return esquema
+
+class MotorPostgres:
+    # Mismo contrato que SesionSQL sobre una conexión del pool: las tablas del
+    # curso se leen del esquema compartido de la escala y lo que crea el
+    # estudiante vive en un esquema propio de la sesión, que va primero en el
+    # search_path. Escribir en una tabla del curso la copia antes a ese esquema.
+    def __init__(self, conn, escala, esquema, timeout_s, filas_por_pagina=None):
+        self._conn = conn
+        self._datos = esquema_datos(escala)
+        self._timeout_s = timeout_s
+        self.esquema = esquema
+        self.filas_por_pagina = filas_por_pagina
+        self.modificada = False
+        self._crear_capa()
+        conn.execute(f"SET search_path TO {esquema}, {self._datos}")
+        # Desde aquí el SQL corre con el rol de la sesión
+        conn.execute(f"SET ROLE {esquema}")
+
+    def _crear_capa(self):
+        with self._conn.transaction():
+            self._conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.esquema}")
+            if self._conn.execute("SELECT 1 FROM pg_roles WHERE rolname = %s", (self.esquema,)).fetchone():
+                return
+            self._conn.execute(f"CREATE ROLE {self.esquema} NOLOGIN IN ROLE {ROL_ESTUDIANTES}")
+            # Sin ser miembro, el usuario de la app no podría hacer SET ROLE
+            self._conn.execute(f"GRANT {self.esquema} TO CURRENT_USER")
+            self._conn.execute(f"GRANT USAGE, CREATE ON SCHEMA {self.esquema} TO {self.esquema}")
+
+    def eliminar(self):
+        self._conn.execute("RESET ROLE")
+        eliminar_capa(self._conn, self.esquema)
+
+    def _tablas_propias(self):
+        return {fila[0] for fila in self._conn.execute(
+            "SELECT tablename FROM pg_tables WHERE schemaname = %s", (self.esquema,)
+        )}
+
+    def _preparar(self, sentencia):
+        prohibida = PATRON_SENTENCIA_PROHIBIDA.match(sentencia) or PATRON_FUNCION_PROHIBIDA.search(sentencia)
+        if prohibida:
+            raise psycopg.ProgrammingError(
+                f"el laboratorio no permite cambiar el rol, la configuración ni las transacciones "
+                f"de la conexión ({prohibida.group(prohibida.lastindex or 0).strip()})"
+            )
+
+        eliminada = PATRON_DROP_TABLE.match(sentencia)
+        if eliminada and eliminada.group(1).lower() in set(ORDEN_TABLAS) - self._tablas_propias():
+            raise psycopg.ProgrammingError(
+                f"la tabla base {eliminada.group(1)} es de solo lectura; usa Reiniciar Progreso "
+                f"para descartar tus cambios"
+            )
+
+        escrita = PATRON_TABLA_ESCRITA.match(sentencia)
+        if escrita:
+            tabla = escrita.group(1).lower()
+            if tabla in ORDEN_TABLAS and tabla not in self._tablas_propias():
+                self._conn.execute(
+                    f"CREATE TABLE {self.esquema}.{tabla} (LIKE {self._datos}.{tabla} INCLUDING ALL)"
+                )
+                self._conn.execute(f"INSERT INTO {self.esquema}.{tabla} SELECT * FROM {self._datos}.{tabla}")
+        return sentencia
+
+    def _cursor(self, sentencia):
+        return self._conn.execute(self._preparar(sentencia))
+
+    def _declarar(self, sentencia, nombre):
+        # Cursor del servidor (dentro de una transacción): las filas quedan en
+        # PostgreSQL y al servidor de Streamlit solo llegan las que se piden
+        cursor = self._conn.cursor(name=nombre)
+        cursor.execute(self._preparar(sentencia))
+        return cursor
+
+    def _mover_al_final(self, nombre):
+        # Recorre el resto del cursor en el servidor y devuelve cuántas filas saltó
+        return self._conn.execute(f"MOVE FORWARD ALL IN {nombre}").rowcount
+
+    def _resultado(self, sentencia):
+        if not es_solo_lectura(sentencia):
+            return resultado_de_cursor(sentencia, self._cursor(sentencia), self.filas_por_pagina)
+
+        with self._conn.transaction(), self._declarar(sentencia, 'cbd_consulta') as cursor:
+            if self.filas_por_pagina is None:
+                filas = cursor.fetchall()
+                total = len(filas)
+            else:
+                filas = cursor.fetchmany(self.filas_por_pagina)
+                total = len(filas) + self._mover_al_final('cbd_consulta')
+            datos = pd.DataFrame(filas, columns=[col.name for col in cursor.description])
+        return {'sentencia': sentencia, 'datos': datos, 'mensaje': f"{total} filas", 'total_filas': total}
+
+    def _descartar(self, sentencia):
+        # Ejecuta la sentencia sin traer sus filas
+        if not es_solo_lectura(sentencia):
+            self._cursor(sentencia)
+            return
+        with self._declarar(sentencia, 'cbd_descartada'):
+            self._mover_al_final('cbd_descartada')
+
+    def _mensaje_error(self, error):
+        if isinstance(error, psycopg.errors.QueryCanceled):
+            return f"La consulta superó el tiempo límite de {self._timeout_s:g} s y fue cancelada"
+        return f"Error en la consulta: {error}"
+
+    def ejecutar(self, codigo):
+        sentencias = dividir_sentencias(codigo)
+        if not sentencias:
+            return False, "El código está vacío"
+
+        # Como en SesionSQL, cada sentencia confirma sus cambios en la sesión
+        resultados = []
+        try:
+            for sentencia in sentencias:
+                if not es_solo_lectura(sentencia):
+                    self.modificada = True
+                resultados.append(self._resultado(sentencia))
+        except psycopg.Error as e:
+            return False, self._mensaje_error(e)
+        return True, resultados
+
+    def pagina(self, sentencia, desde, cantidad):
+        try:
+            # Un cursor del servidor avanza hasta la fila pedida sin traer las anteriores
+            with self._conn.transaction(force_rollback=True), self._conn.cursor(name='cbd_pagina') as cursor:
+                cursor.execute(self._preparar(sentencia))
+                cursor.scroll(desde)
+                filas = cursor.fetchmany(cantidad)
+                return True, pd.DataFrame(filas, columns=[col.name for col in cursor.description])
+        except psycopg.Error as e:
+            return False, self._mensaje_error(e)
+
+    def explicar(self, codigo):
+        sentencias = dividir_sentencias(codigo)
+        if not sentencias:
+            return False, "El código está vacío"
+
+        resultados = []
+        try:
+            with self._conn.transaction(force_rollback=True):
+                for sentencia in sentencias:
+                    comando = re.sub(r'--[^\n]*', '', sentencia).split()[0].upper()
+                    if comando not in SENTENCIAS_EXPLICABLES:
+                        inicio = time.perf_counter()
+                        cursor = self._conn.execute(self._preparar(sentencia))
+                        resultados.append({'sentencia': sentencia, 'plan': [], 'filas': max(cursor.rowcount, 0),
+                                           'tiempo_ms': (time.perf_counter() - inicio) * 1000})
+                        continue
+
+                    plan = self._conn.execute(
+                        f"EXPLAIN (ANALYZE, FORMAT JSON) {self._preparar(sentencia)}"
+                    ).fetchone()[0][0]
+                    resultados.append({
+                        'sentencia': sentencia,
+                        'plan': [arbol_postgres(plan['Plan'])],
+                        'filas': plan['Plan']['Actual Rows'],
+                        'tiempo_ms': plan['Execution Time'],
+                        'tiempos_por_nodo': True
+                    })
+        except psycopg.Error as e:
+            return False, self._mensaje_error(e)
+        return True, resultados
+
+    def huella(self, codigo, claves=None, consulta=None):
+        sentencias = dividir_sentencias(codigo)
+        if not sentencias:
+            return False, "El código está vacío"
+
+        try:
+            with self._conn.transaction(force_rollback=True):
+                for sentencia in sentencias[:-1]:
+                    self._descartar(sentencia)
+                ultima = sentencias[-1]
+                if consulta is not None:
+                    self._descartar(ultima)
+                    ultima = consulta
+
+                if es_solo_lectura(ultima):
+                    # La huella recorre el cursor por lotes, sin materializar el resultado
+                    with self._declarar(ultima, 'cbd_huella') as cursor:
+                        return True, huella_de_cursor(cursor, claves)
+                cursor = self._cursor(ultima)
+                if cursor.description is None:
+                    return True, None
+                return True, huella_de_cursor(cursor, claves)
+        except psycopg.Error as e:
+            return False, self._mensaje_error(e)
+
+class SesionPostgres(SesionSandbox):
+    # Lado Streamlit de una sesión en PostgreSQL: la capa es un esquema propio
+    def __init__(self, escala, pool, cache=None):
+        self.escala = escala
+        # Otro motor, otros resultados: no comparten la caché con el embebido
+        self.version = f"postgres/{version_dataset(escala)}"
+        self.modificada = False
+        self._pool = pool
+        self._cache = cache
+        self.capa = f"cbd_sesion_{uuid.uuid4().hex}"
+        self._finalizador = weakref.finalize(self, pool.enviar, escala, self.capa, "", 'eliminar')
+
+    def reiniciar(self):
+        self._pool.ejecutar(self.escala, self.capa, "", 'eliminar')
+        self.modificada = False
+
+def _respuesta_error(mensaje):
+    return {'exito': False, 'salida': mensaje, 'modificada': True}
+
+class PoolPostgres:
+    # Mismo contrato que PoolSandbox, con un hilo por conexión: las consultas
+    # corren en PostgreSQL, que aplica el statement_timeout por su cuenta. El
+    # pool está acotado a CONEXIONES conexiones abiertas.
+    def __init__(self, dsn, conexiones=CONEXIONES, timeout_s=TIMEOUT_S, filas_por_pagina=FILAS_POR_PAGINA):
+        self.dsn = dsn
+        self.timeout_s = timeout_s
+        self.filas_por_pagina = filas_por_pagina
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._en_curso = {}
+        self._escalas_listas = set()
+        self._lock_datos = threading.Lock()
+        self._respaldo = None
+        self._conectado = True
+        self._proximo_reintento = 0.0
+        # Si el servidor no responde, el error llega a crear_pool_postgres
+        self._conexiones = [self._conectar() for _ in range(conexiones)]
+        crear_rol_estudiantes(self._conexiones[0])
+        for indice in range(conexiones):
+            threading.Thread(target=self._atender, args=(indice,), daemon=True).start()
+        threading.Thread(target=self._vigilar, daemon=True).start()
+
+    def _conectar(self):
+        return psycopg.connect(self.dsn, autocommit=True, connect_timeout=5)
+
+    def _conexion_sana(self, indice):
+        # La conexión nueva reemplaza a la rota en el pool: el vigilante
+        # cancela sobre ella y detener la cierra
+        if self._conexiones[indice].broken:
+            self._conexiones[indice] = self._conectar()
+        return self._conexiones[indice]
+
+    def _restablecer(self, conn):
+        # Nada de lo que dejó la tarea anterior (rol, statement_timeout,
+        # search_path) pasa a la siguiente
+        conn.execute("RESET ROLE")
+        conn.execute("RESET ALL")
+        conn.execute(f"SET statement_timeout = {int(self.timeout_s * 1000)}")
+
+    def _embebido(self):
+        with self._lock:
+            if self._respaldo is None:
+                self._respaldo = PoolSandbox(timeout_s=self.timeout_s, filas_por_pagina=self.filas_por_pagina)
+            return self._respaldo
+
+    def _reintentar(self):
+        # Sin sesiones en PostgreSQL ninguna conexión del pool informaría que
+        # el servidor volvió: se prueba, a lo sumo una vez cada REINTENTO_S
+        with self._lock:
+            if time.monotonic() < self._proximo_reintento:
+                return False
+            self._proximo_reintento = time.monotonic() + REINTENTO_S
+        try:
+            psycopg.connect(self.dsn, connect_timeout=2).close()
+        except psycopg.Error:
+            return False
+        self._conectado = True
+        return True
+
+    def sesion(self, escala, cache=None):
+        # El estado del servidor es el de las conexiones del pool en su última tarea
+        if self._conectado or self._reintentar():
+            return SesionPostgres(escala, self, cache)
+        # Sin servidor, las sesiones nuevas usan el motor embebido
+        return self._embebido().sesion(escala, cache)
+
+    def enviar(self, escala, capa, codigo, modo='ejecutar', desde=0, solucion=None):
+        if modo == 'esperado':
+            # Los resultados esperados son los del motor de referencia (el
+            # embebido), que corre en sus propios procesos
+            return self._embebido().enviar(escala, None, codigo, modo)
+
+        trabajo = TrabajoSQL({
+            'escala': escala,
+            'capa': capa,
+            'codigo': codigo,
+            'modo': modo,
+            'desde': desde,
+            'solucion': solucion
+        })
+        self._cola.put(trabajo)
+        return trabajo
+
+    def ejecutar(self, escala, capa, codigo, modo='ejecutar', desde=0, solucion=None):
+        return self.enviar(escala, capa, codigo, modo, desde, solucion).esperar()
+
+    def detener(self):
+        for _ in self._conexiones:
+            self._cola.put(None)
+        if self._respaldo is not None:
+            self._respaldo.detener()
+
+    def _asegurar_datos(self, conn, escala):
+        # Se comprueba en cada tarea: si alguien borró el esquema, se vuelve a cargar
+        if escala in self._escalas_listas and conn.execute(
+                "SELECT to_regnamespace(%s)", (esquema_datos(escala),)).fetchone()[0] is not None:
+            return
+        with self._lock_datos:
+            cargar_esquema_datos(conn, escala)
+            self._escalas_listas.add(escala)
+
+    def _ejecutar_tarea(self, conn, tarea):
+        if tarea['modo'] == 'eliminar':
+            eliminar_capa(conn, tarea['capa'])
+            return {'exito': True, 'salida': None, 'modificada': False}
+
+        self._asegurar_datos(conn, tarea['escala'])
+        if tarea['modo'] == 'calificar':
+            # Esquema propio y desechable: el de la sesión no influye en la calificación
+            motor = MotorPostgres(conn, tarea['escala'], f"cbd_calificar_{uuid.uuid4().hex}", self.timeout_s)
+            try:
+                exito, salida = huella_esperada(motor, tarea['solucion'])
+                if exito:
+                    exito, salida = calificar_contra(motor, tarea['codigo'], tarea['solucion'], salida)
+            finally:
+                motor.eliminar()
+            return {'exito': exito, 'salida': salida, 'modificada': False}
+
+        motor = MotorPostgres(conn, tarea['escala'], tarea['capa'], self.timeout_s, self.filas_por_pagina)
+        if tarea['modo'] == 'explicar':
+            exito, salida = motor.explicar(tarea['codigo'])
+        elif tarea['modo'] == 'pagina':
+            exito, salida = motor.pagina(tarea['codigo'], tarea['desde'], self.filas_por_pagina)
+        else:
+            exito, salida = motor.ejecutar(tarea['codigo'])
+        return {'exito': exito, 'salida': salida, 'modificada': motor.modificada}
+
+    def _atender(self, indice):
+        while True:
+            trabajo = self._cola.get()
+            if trabajo is None:
+                self._conexiones[indice].close()
+                return
+            if not trabajo._comenzar():
+                continue
+
+            try:
+                conn = self._conexion_sana(indice)
+                with self._lock:
+                    self._en_curso[trabajo] = conn
+                try:
+                    self._restablecer(conn)
+                    respuesta = self._ejecutar_tarea(conn, trabajo.tarea)
+                finally:
+                    with self._lock:
+                        del self._en_curso[trabajo]
+            except psycopg.Error as e:
+                respuesta = _respuesta_error(f"Error de conexión con PostgreSQL: {e}")
+            except Exception as e:
+                # Sin esto el hilo moriría con el trabajo sin terminar y el
+                # pool perdería una conexión
+                respuesta = _respuesta_error(f"Error inesperado en el sandbox: {e}")
+            self._conectado = not self._conexiones[indice].broken
+
+            if trabajo._cancelar.is_set():
+                trabajo._terminar('cancelado', _respuesta_error("Consulta cancelada"))
+            else:
+                trabajo._terminar('terminado', respuesta)
+
+    def _vigilar(self):
+        # Cancelar desde la interfaz interrumpe la consulta en el servidor. Un
+        # trabajo que pasa del tiempo límite con margen también se cancela,
+        # aunque el statement_timeout de la conexión no lo haya detenido.
+        canceladas = weakref.WeakSet()
+        while True:
+            time.sleep(0.05)
+            with self._lock:
+                en_curso = list(self._en_curso.items())
+            for trabajo, conn in en_curso:
+                excedido = trabajo.transcurrido > self.timeout_s + GRACIA_S
+                if (trabajo._cancelar.is_set() or excedido) and trabajo not in canceladas:
+                    canceladas.add(trabajo)
+                    try:
+                        conn.cancel_safe()
+                    except psycopg.Error:
+                        pass
+
+def crear_pool_postgres(dsn=DSN):
+    if not dsn or psycopg is None:
+        return None
+    try:
+        return PoolPostgres(dsn)
+    except psycopg.Error:
+        return None
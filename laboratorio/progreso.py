@@ -0,0 +1,301 @@
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+RUTA_PROGRESO = Path(os.environ.get(
+    'CBD_PROGRESO_DB',
+    Path(__file__).resolve().parent.parent / '.progreso' / 'progreso.sqlite'
+))
+INTERVALO_ESCRITURA_S = float(os.environ.get('CBD_PROGRESO_INTERVALO_S', 1.0))
+
+# Con tantos cambios pendientes se escribe sin esperar al intervalo
+MAX_PENDIENTES = 1000
+
+VERSION_ESQUEMA = 2
+
+ESQUEMA_PROGRESO = """
+CREATE TABLE IF NOT EXISTS progreso (
+    estudiante TEXT NOT NULL,
+    seccion TEXT NOT NULL,
+    item TEXT NOT NULL,
+    valor INTEGER NOT NULL,
+    actualizado REAL NOT NULL,
+    PRIMARY KEY (estudiante, seccion, item)
+) WITHOUT ROWID;
+
+-- Agregados de la clase, mantenidos por triggers dentro de la misma
+-- transacción que escribe cada lote: el panel docente nunca recorre a
+-- todos los estudiantes
+CREATE TABLE IF NOT EXISTS completados_item (
+    seccion TEXT NOT NULL,
+    item TEXT NOT NULL,
+    estudiantes INTEGER NOT NULL,
+    PRIMARY KEY (seccion, item)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS completados_estudiante (
+    estudiante TEXT PRIMARY KEY,
+    completados INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS histograma_progreso (
+    completados INTEGER PRIMARY KEY,
+    estudiantes INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS errores_frecuentes (
+    mensaje TEXT PRIMARY KEY,
+    veces INTEGER NOT NULL,
+    ultimo REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_errores_veces ON errores_frecuentes (veces);
+
+CREATE TRIGGER IF NOT EXISTS progreso_insertado AFTER INSERT ON progreso
+BEGIN
+    INSERT INTO completados_estudiante VALUES (NEW.estudiante, 0)
+        ON CONFLICT (estudiante) DO NOTHING;
+    UPDATE completados_estudiante SET completados = completados + NEW.valor
+        WHERE estudiante = NEW.estudiante AND NEW.valor != 0;
+    INSERT INTO completados_item VALUES (NEW.seccion, NEW.item, NEW.valor)
+        ON CONFLICT (seccion, item) DO UPDATE SET estudiantes = estudiantes + excluded.estudiantes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS progreso_actualizado AFTER UPDATE OF valor ON progreso
+WHEN OLD.valor != NEW.valor
+BEGIN
+    UPDATE completados_estudiante SET completados = completados + NEW.valor - OLD.valor
+        WHERE estudiante = NEW.estudiante;
+    UPDATE completados_item SET estudiantes = estudiantes + NEW.valor - OLD.valor
+        WHERE seccion = NEW.seccion AND item = NEW.item;
+END;
+
+CREATE TRIGGER IF NOT EXISTS estudiante_insertado AFTER INSERT ON completados_estudiante
+BEGIN
+    INSERT INTO histograma_progreso VALUES (NEW.completados, 1)
+        ON CONFLICT (completados) DO UPDATE SET estudiantes = estudiantes + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS estudiante_actualizado AFTER UPDATE OF completados ON completados_estudiante
+WHEN OLD.completados != NEW.completados
+BEGIN
+    UPDATE histograma_progreso SET estudiantes = estudiantes - 1 WHERE completados = OLD.completados;
+    INSERT INTO histograma_progreso VALUES (NEW.completados, 1)
+        ON CONFLICT (completados) DO UPDATE SET estudiantes = estudiantes + 1;
+END;
+"""
+
+def generalizar_error(mensaje):
+    # "se encontró 'FORM'" y "se encontró 'x'" cuentan como el mismo error
+    return re.sub(r"'[^']*'", "'…'", mensaje)
+
+class AlmacenProgreso:
+    # Progreso de cada estudiante en un SQLite en modo WAL. Las casillas que
+    # se marcan se acumulan en memoria (el último valor de cada una gana) y un
+    # hilo las escribe por lotes en una sola transacción; las lecturas no
+    # esperan a las escrituras y ven los cambios aún pendientes.
+    def __init__(self, ruta=RUTA_PROGRESO, intervalo_s=INTERVALO_ESCRITURA_S):
+        self.ruta = Path(ruta)
+        self.intervalo_s = intervalo_s
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = self._conectar()
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._crear_esquema()
+        self._lectores = queue.SimpleQueue()
+
+        self._lock = threading.Condition()
+        # Una sola escritura a la vez sobre la conexión compartida
+        self._lock_escritura = threading.Lock()
+        self._pendientes = {}
+        self._escribiendo = {}
+        self._errores = {}
+        self._cantidad_pendientes = 0
+        self._detenido = False
+        self._cambios = 0
+        self._escrituras = 0
+
+        self._hilo = threading.Thread(target=self._escribir_periodicamente, daemon=True)
+        self._hilo.start()
+        atexit.register(self.detener)
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None, timeout=30)
+        # En WAL, NORMAL solo arriesga la última transacción ante un corte de luz
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _crear_esquema(self):
+        self._conn.executescript(ESQUEMA_PROGRESO)
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < VERSION_ESQUEMA:
+                self._reconstruir_agregados()
+                self._conn.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+            self._conn.execute("COMMIT")
+        except sqlite3.Error:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+
+    def _reconstruir_agregados(self):
+        # Única pasada completa: bases creadas antes de que existieran los agregados
+        for tabla in ('completados_item', 'completados_estudiante', 'histograma_progreso'):
+            self._conn.execute(f"DELETE FROM {tabla}")
+        self._conn.execute(
+            "INSERT INTO completados_item "
+            "SELECT seccion, item, SUM(valor) FROM progreso GROUP BY seccion, item"
+        )
+        self._conn.execute(
+            "INSERT INTO completados_estudiante "
+            "SELECT estudiante, SUM(valor) FROM progreso GROUP BY estudiante"
+        )
+
+    def _consultar(self, sql, parametros=()):
+        try:
+            conn = self._lectores.get_nowait()
+        except queue.Empty:
+            conn = self._conectar()
+        try:
+            return conn.execute(sql, parametros).fetchall()
+        finally:
+            self._lectores.put(conn)
+
+    def leer(self, estudiante):
+        filas = self._consultar(
+            "SELECT seccion, item, valor FROM progreso WHERE estudiante = ?", (estudiante,)
+        )
+
+        progreso = {}
+        for seccion, item, valor in filas:
+            progreso.setdefault(seccion, {})[item] = bool(valor)
+        with self._lock:
+            for cambios in (self._escribiendo.get(estudiante, {}), self._pendientes.get(estudiante, {})):
+                for (seccion, item), valor in cambios.items():
+                    progreso.setdefault(seccion, {})[item] = valor
+        return progreso
+
+    def registrar(self, estudiante, seccion, item, valor):
+        with self._lock:
+            cambios = self._pendientes.setdefault(estudiante, {})
+            if (seccion, item) not in cambios:
+                self._cantidad_pendientes += 1
+            cambios[(seccion, item)] = bool(valor)
+            self._cambios += 1
+            if self._cantidad_pendientes >= MAX_PENDIENTES:
+                self._lock.notify()
+
+    def registrar_error(self, mensaje):
+        # Los errores repetidos se suman en memoria y se escriben con el lote
+        mensaje = generalizar_error(mensaje)
+        with self._lock:
+            self._errores[mensaje] = self._errores.get(mensaje, 0) + 1
+
+    def vaciar(self):
+        with self._lock_escritura:
+            self._vaciar()
+
+    def _vaciar(self):
+        with self._lock:
+            lote = self._pendientes
+            errores = self._errores
+            self._pendientes = {}
+            self._errores = {}
+            self._cantidad_pendientes = 0
+            self._escribiendo = lote
+        if not lote and not errores:
+            return
+
+        ahora = time.time()
+        filas = [(estudiante, seccion, item, int(valor), ahora)
+                 for estudiante, cambios in lote.items()
+                 for (seccion, item), valor in cambios.items()]
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            # Los triggers actualizan los agregados de la clase en esta misma transacción
+            self._conn.executemany(
+                "INSERT INTO progreso VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (estudiante, seccion, item) "
+                "DO UPDATE SET valor = excluded.valor, actualizado = excluded.actualizado",
+                filas
+            )
+            self._conn.executemany(
+                "INSERT INTO errores_frecuentes VALUES (?, ?, ?) "
+                "ON CONFLICT (mensaje) "
+                "DO UPDATE SET veces = veces + excluded.veces, ultimo = excluded.ultimo",
+                [(mensaje, veces, ahora) for mensaje, veces in errores.items()]
+            )
+            self._conn.execute("COMMIT")
+        except sqlite3.Error:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            # El lote vuelve a la cola sin pisar cambios más recientes
+            with self._lock:
+                for estudiante, cambios in lote.items():
+                    nuevos = self._pendientes.setdefault(estudiante, {})
+                    for clave, valor in cambios.items():
+                        if clave not in nuevos:
+                            nuevos[clave] = valor
+                            self._cantidad_pendientes += 1
+                for mensaje, veces in errores.items():
+                    self._errores[mensaje] = self._errores.get(mensaje, 0) + veces
+                self._escribiendo = {}
+            raise
+
+        with self._lock:
+            self._escribiendo = {}
+            self._escrituras += 1
+
+    def detener(self):
+        with self._lock:
+            self._detenido = True
+            self._lock.notify()
+        self._hilo.join(timeout=5)
+        self.vaciar()
+
+    def resumen_clase(self, max_errores=10):
+        # Solo lee los agregados: el costo no depende de la cantidad de
+        # estudiantes. Los cambios del lote en curso aparecen al escribirse.
+        histograma = dict(self._consultar(
+            "SELECT completados, estudiantes FROM histograma_progreso WHERE estudiantes > 0"
+        ))
+        return {
+            'estudiantes': sum(histograma.values()),
+            'histograma': histograma,
+            'completados': {
+                (seccion, item): estudiantes
+                for seccion, item, estudiantes in self._consultar(
+                    "SELECT seccion, item, estudiantes FROM completados_item"
+                )
+            },
+            'errores': self._consultar(
+                "SELECT mensaje, veces FROM errores_frecuentes ORDER BY veces DESC LIMIT ?",
+                (max_errores,)
+            )
+        }
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'cambios': self._cambios,
+                'escrituras': self._escrituras,
+                'pendientes': self._cantidad_pendientes
+            }
+
+    def _escribir_periodicamente(self):
+        while True:
+            with self._lock:
+                if not self._detenido and self._cantidad_pendientes < MAX_PENDIENTES:
+                    self._lock.wait(self.intervalo_s)
+                if self._detenido:
+                    return
+            try:
+                self.vaciar()
+            except sqlite3.Error:
+                # Base ocupada por otro proceso: se reintenta en el siguiente intervalo
+                pass
@@ -0,0 +1,158 @@
+import os
+import re
+import sqlite3
+
+from laboratorio.cache import es_solo_lectura
+from laboratorio.dialecto import preparar_conexion, traducir
+from laboratorio.motor import MotorSQL, construir_base_sqlite, dividir_sentencias, version_dataset
+
+COMENTARIOS_INICIALES = r'^(?:\s*--[^\n]*\n|\s*/\*.*?\*/)*\s*'
+
+PATRON_TABLA_ESCRITA = re.compile(
+    COMENTARIOS_INICIALES +
+    r'(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM'
+    r'|ALTER\s+TABLE|CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?\w+\s+ON)'
+    r'\s+(\w+)',
+    re.IGNORECASE | re.DOTALL
+)
+PATRON_DROP_TABLE = re.compile(
+    COMENTARIOS_INICIALES + r'DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(\w+)',
+    re.IGNORECASE | re.DOTALL
+)
+PATRON_CREATE_VIEW = re.compile(
+    '(' + COMENTARIOS_INICIALES + r'CREATE\s+)(VIEW\b)',
+    re.IGNORECASE | re.DOTALL
+)
+PATRON_NOMBRE_VISTA = re.compile(
+    COMENTARIOS_INICIALES + r'(CREATE|DROP)\s+(?:TEMP\s+)?VIEW\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?(\w+)',
+    re.IGNORECASE | re.DOTALL
+)
+
+TABLA_VISTAS = "_vistas_sesion"
+
+class SesionSQL(MotorSQL):
+    # Base de datos copy-on-write de un estudiante: las tablas base se leen del
+    # archivo compartido (adjunto en solo lectura) y todo lo que el estudiante
+    # crea o modifica vive en una capa propia de la sesión, en memoria o en el
+    # archivo ruta_capa si la sesión se abre desde otros procesos.
+    def __init__(self, escala, ruta_capa=None):
+        self.escala = escala
+        self.ruta_capa = ruta_capa
+        self._ruta_base = construir_base_sqlite(escala)
+        super().__init__(self._abrir_capa(), version_dataset(escala))
+
+    def _abrir_capa(self):
+        destino = 'file::memory:' if self.ruta_capa is None else f"file:{self.ruta_capa}"
+        # Sin caché de sentencias preparadas: el autorizador debe ver cada
+        # sentencia del estudiante, aunque repita el texto de una interna
+        conn = sqlite3.connect(destino, uri=True, check_same_thread=False, isolation_level=None,
+                               cached_statements=0)
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("ATTACH DATABASE ? AS base", (f"file:{self._ruta_base}?mode=ro",))
+        conn.execute(f"CREATE TABLE IF NOT EXISTS main.{TABLA_VISTAS} (nombre TEXT PRIMARY KEY, sql TEXT)")
+        preparar_conexion(conn)
+
+        # Las vistas temporales no sobreviven a la conexión: se recrean desde
+        # el registro de la capa
+        vistas = conn.execute(f"SELECT sql FROM main.{TABLA_VISTAS} ORDER BY rowid").fetchall()
+        for (sql,) in vistas:
+            conn.execute(sql)
+
+        self.tablas_base = {fila[0] for fila in conn.execute(
+            "SELECT name FROM base.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )}
+        tablas_capa = {fila[0] for fila in conn.execute(
+            f"SELECT name FROM main.sqlite_master WHERE name NOT LIKE 'sqlite_%' "
+            f"AND tbl_name != '{TABLA_VISTAS}'"
+        )}
+        self.promovidas = self.tablas_base & tablas_capa
+        self.modificada = bool(vistas or tablas_capa)
+
+        # Desde aquí solo corre el SQL del estudiante: ATTACH de la base
+        # compartida sin ?mode=ro, o de cualquier otro archivo, queda prohibido
+        conn.set_authorizer(self._autorizar)
+        return conn
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
+
+    def reiniciar(self):
+        with self._lock:
+            self._conn.close()
+            if self.ruta_capa is not None and os.path.exists(self.ruta_capa):
+                os.remove(self.ruta_capa)
+            self._conn = self._abrir_capa()
+
+    def _promover(self, tabla):
+        # Primera escritura sobre una tabla base: se copia a la capa privada y
+        # desde entonces el nombre sin calificar resuelve a la copia (main va
+        # antes que las bases adjuntas en la búsqueda de nombres de SQLite).
+        definicion = self._conn.execute(
+            "SELECT sql FROM base.sqlite_master WHERE type = 'table' AND name = ?", (tabla,)
+        ).fetchone()[0]
+        self._conn.execute(definicion)
+        self._conn.execute(f"INSERT INTO main.{tabla} SELECT * FROM base.{tabla}")
+        self.promovidas.add(tabla)
+
+    def _preparar(self, sentencia):
+        sentencia = traducir(sentencia)
+        eliminada = PATRON_DROP_TABLE.match(sentencia)
+        if eliminada and eliminada.group(1).lower() in self.tablas_base - self.promovidas:
+            raise sqlite3.OperationalError(
+                f"la tabla base {eliminada.group(1)} es de solo lectura; usa Reiniciar Progreso "
+                f"para descartar tus cambios"
+            )
+
+        escrita = PATRON_TABLA_ESCRITA.match(sentencia)
+        if escrita:
+            tabla = escrita.group(1).lower()
+            if tabla in self.tablas_base and tabla not in self.promovidas:
+                self._promover(tabla)
+
+        # Una vista de main no puede referirse a tablas de otra base; las vistas
+        # temporales sí, y también viven solo en esta sesión
+        return PATRON_CREATE_VIEW.sub(r'\1TEMP \2', sentencia, count=1)
+
+    def _registrar_vista(self, sentencia):
+        # Las vistas materializadas se registran ya traducidas a vistas
+        vista = PATRON_NOMBRE_VISTA.match(traducir(sentencia))
+        if not vista:
+            return
+        if vista.group(1).upper() == 'CREATE':
+            self._conn.execute(f"INSERT OR REPLACE INTO main.{TABLA_VISTAS} VALUES (?, ?)",
+                               (vista.group(2), self._preparar(sentencia)))
+        else:
+            self._conn.execute(f"DELETE FROM main.{TABLA_VISTAS} WHERE nombre = ?", (vista.group(2),))
+
+    def _ejecutar_sentencias(self, sentencias):
+        # A diferencia del motor compartido, los cambios de la sesión se conservan
+        resultados = []
+        for sentencia in sentencias:
+            resultados.append(self._ejecutar_sentencia(sentencia))
+            if not es_solo_lectura(sentencia):
+                self._registrar_vista(sentencia)
+                self.modificada = True
+        return resultados
+
+    def _marcar_escrituras(self, codigo):
+        # explicar y huella descartan sus cambios, pero si algo escapara de esa
+        # transacción la sesión ya no debe leer ni escribir la caché compartida
+        if not all(es_solo_lectura(sentencia) for sentencia in dividir_sentencias(codigo)):
+            self.modificada = True
+
+    def explicar(self, codigo):
+        promovidas = set(self.promovidas)
+        self._marcar_escrituras(codigo)
+        try:
+            return super().explicar(codigo)
+        finally:
+            self.promovidas = promovidas
+
+    def huella(self, codigo, claves=None, consulta=None):
+        promovidas = set(self.promovidas)
+        self._marcar_escrituras(codigo)
+        try:
+            return super().huella(codigo, claves, consulta)
+        finally:
+            self.promovidas = promovidas
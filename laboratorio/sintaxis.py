@@ -0,0 +1,914 @@
+import functools
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', ['tipo', 'valor', 'texto', 'pos'])
+
+PATRON_TOKEN = re.compile(r'''
+    (?P<espacio>\s+)
+  | (?P<comentario>--[^\n]*)
+  | (?P<bloque>/\*)
+  | (?P<cadena>[Ee]?'(?:[^']|'')*')
+  | (?P<cadena_abierta>')
+  | (?P<citado>"(?:[^"]|"")*")
+  | (?P<numero>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<palabra>[^\W\d]\w*)
+  | (?P<operador>::|<=|>=|<>|!=|\|\||[=<>+\-*/%(),;.\[\]])
+''', re.VERBOSE)
+
+RESERVADAS = {
+    'ALL', 'AND', 'AS', 'ASC', 'BETWEEN', 'BY', 'CASE', 'CROSS', 'DESC', 'DISTINCT', 'ELSE',
+    'END', 'EXCEPT', 'EXISTS', 'FETCH', 'FILTER', 'FROM', 'FULL', 'GROUP', 'HAVING', 'ILIKE',
+    'IN', 'INNER', 'INTERSECT', 'INTO', 'IS', 'JOIN', 'LEFT', 'LIKE', 'LIMIT', 'NATURAL',
+    'NOT', 'NULL', 'OFFSET', 'ON', 'OR', 'ORDER', 'OUTER', 'OVER', 'RETURNING', 'RIGHT',
+    'SELECT', 'SET', 'THEN', 'UNION', 'USING', 'VALUES', 'WHEN', 'WHERE', 'WINDOW', 'WITH'
+}
+
+AGREGADAS = {'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'STRING_AGG', 'ARRAY_AGG', 'BOOL_AND',
+             'BOOL_OR', 'EVERY', 'GROUP_CONCAT', 'STDDEV', 'VARIANCE'}
+
+# Claves primarias del esquema del curso (ESQUEMA_SQL): agrupar por la clave
+# permite usar cualquier otra columna de esa tabla, como en PostgreSQL
+CLAVES_PRIMARIAS = {
+    'professors': 'professor_id',
+    'students': 'student_id',
+    'courses': 'course_id',
+    'enrollments': 'enrollment_id'
+}
+
+class ErrorSintaxis(Exception):
+    def __init__(self, mensaje, pos):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.pos = pos
+
+def tokenizar(codigo):
+    tokens = []
+    pos = 0
+    while pos < len(codigo):
+        coincidencia = PATRON_TOKEN.match(codigo, pos)
+        if not coincidencia:
+            raise ErrorSintaxis(f"carácter inesperado '{codigo[pos]}'", pos)
+
+        tipo = coincidencia.lastgroup
+        texto = coincidencia.group()
+        if tipo == 'bloque':
+            fin = codigo.find('*/', pos + 2)
+            if fin == -1:
+                raise ErrorSintaxis("comentario /* sin cerrar", pos)
+            pos = fin + 2
+            continue
+        if tipo == 'cadena_abierta':
+            raise ErrorSintaxis("cadena sin comilla de cierre", pos)
+
+        if tipo == 'palabra':
+            tokens.append(Token('palabra', texto.upper(), texto, pos))
+        elif tipo == 'citado':
+            tokens.append(Token('palabra', texto[1:-1].replace('""', '"'), texto, pos))
+        elif tipo in ('cadena', 'numero', 'operador'):
+            tokens.append(Token(tipo, texto, texto, pos))
+        pos = coincidencia.end()
+
+    tokens.append(Token('fin', '', '', len(codigo)))
+    return tokens
+
+def _nodo(tipo, pos, **campos):
+    campos.update(tipo=tipo, pos=pos)
+    return campos
+
+def _operacion(token, args):
+    return _nodo('operacion', token.pos, operador=token.valor, args=args)
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+        self.consultas = []
+        self.ultima_consulta = None
+
+    @property
+    def actual(self):
+        return self.tokens[self.i]
+
+    def _ver(self, desplazamiento=1):
+        return self.tokens[min(self.i + desplazamiento, len(self.tokens) - 1)]
+
+    def _avanzar(self):
+        token = self.actual
+        if token.tipo != 'fin':
+            self.i += 1
+        return token
+
+    def _es(self, *valores):
+        return self.actual.tipo in ('palabra', 'operador') and self.actual.valor in valores
+
+    def _aceptar(self, *valores):
+        if self._es(*valores):
+            return self._avanzar()
+        return None
+
+    def _error(self, mensaje, token=None):
+        token = token or self.actual
+        return ErrorSintaxis(mensaje, token.pos)
+
+    def _encontrado(self):
+        return "el final del código" if self.actual.tipo == 'fin' else f"'{self.actual.texto}'"
+
+    def _esperar(self, *valores):
+        if not self._es(*valores):
+            raise self._error(f"se esperaba {' o '.join(valores)} y se encontró {self._encontrado()}")
+        return self._avanzar()
+
+    def _identificador(self, descripcion="un nombre"):
+        token = self.actual
+        if token.tipo != 'palabra' or (token.valor in RESERVADAS and not token.texto.startswith('"')):
+            raise self._error(f"se esperaba {descripcion} y se encontró {self._encontrado()}")
+        self._avanzar()
+        return token.valor.lower() if not token.texto.startswith('"') else token.valor
+
+    def _nombre_calificado(self):
+        nombre = self._identificador()
+        while self._aceptar('.'):
+            nombre = self._identificador()
+        return nombre
+
+    def _saltar_parentesis(self):
+        self._esperar('(')
+        profundidad = 1
+        while profundidad:
+            if self.actual.tipo == 'fin':
+                raise self._error("falta cerrar un paréntesis")
+            token = self._avanzar()
+            if token.valor == '(' and token.tipo == 'operador':
+                profundidad += 1
+            elif token.valor == ')' and token.tipo == 'operador':
+                profundidad -= 1
+
+    # Sentencias
+
+    def sentencia(self):
+        token = self.actual
+        if self._es('SELECT', 'WITH', 'VALUES') or (self._es('(') and self._ver().valor in ('SELECT', 'WITH')):
+            self.consulta()
+            return 'SELECT'
+        if token.tipo != 'palabra':
+            raise self._error(f"se esperaba una sentencia SQL y se encontró {self._encontrado()}")
+
+        palabra = token.valor
+        if palabra == 'CREATE':
+            return self._create()
+        if palabra == 'INSERT':
+            return self._insert()
+        if palabra == 'UPDATE':
+            return self._update()
+        if palabra == 'DELETE':
+            return self._delete()
+        if palabra == 'DROP':
+            return self._drop()
+        if palabra == 'ALTER':
+            self._avanzar()
+            self._esperar('TABLE')
+            self._nombre_calificado()
+            self._resto_libre()
+            return 'ALTER TABLE'
+        if palabra == 'REFRESH':
+            self._avanzar()
+            self._esperar('MATERIALIZED')
+            self._esperar('VIEW')
+            self._aceptar('CONCURRENTLY')
+            self._nombre_calificado()
+            return 'REFRESH MATERIALIZED VIEW'
+        if palabra == 'EXPLAIN':
+            self._avanzar()
+            if self._es('('):
+                self._saltar_parentesis()
+            self._aceptar('ANALYZE')
+            self._aceptar('VERBOSE')
+            return 'EXPLAIN ' + self.sentencia()
+        if palabra == 'PRAGMA':
+            self._avanzar()
+            self._nombre_calificado()
+            self._resto_libre()
+            return 'PRAGMA'
+        if palabra in ('BEGIN', 'COMMIT', 'ROLLBACK', 'START', 'END'):
+            self._avanzar()
+            self._resto_libre()
+            return palabra
+        raise self._error(f"'{token.texto}' no es una sentencia SQL que el laboratorio reconozca "
+                          f"(SELECT, CREATE, INSERT, UPDATE, DELETE, ALTER, DROP, REFRESH, PRAGMA)")
+
+    def _resto_libre(self):
+        # Para sentencias cuyo detalle no se analiza solo se comprueban los paréntesis
+        while not self._es(';') and self.actual.tipo != 'fin':
+            if self._es('('):
+                self._saltar_parentesis()
+            elif self._es(')'):
+                raise self._error("paréntesis de cierre sin abrir")
+            else:
+                self._avanzar()
+
+    def _create(self):
+        self._avanzar()
+        if self._aceptar('OR'):
+            self._esperar('REPLACE')
+        self._aceptar('TEMP', 'TEMPORARY')
+        unico = self._aceptar('UNIQUE')
+
+        if self._aceptar('INDEX'):
+            self._aceptar('CONCURRENTLY')
+            if self._aceptar('IF'):
+                self._esperar('NOT')
+                self._esperar('EXISTS')
+            if not self._es('ON'):
+                self._identificador("el nombre del índice")
+            self._esperar('ON')
+            self._nombre_calificado()
+            if self._aceptar('USING'):
+                self._identificador("un método de índice")
+            self._esperar('(')
+            self._lista(self._elemento_orden)
+            self._esperar(')')
+            if self._aceptar('WHERE'):
+                self.expresion()
+            return 'CREATE UNIQUE INDEX' if unico else 'CREATE INDEX'
+        if unico:
+            raise self._error("UNIQUE solo puede ir antes de INDEX")
+
+        materializada = self._aceptar('MATERIALIZED')
+        if self._aceptar('VIEW'):
+            if self._aceptar('IF'):
+                self._esperar('NOT')
+                self._esperar('EXISTS')
+            self._nombre_calificado()
+            if self._es('('):
+                self._saltar_parentesis()
+            self._esperar('AS')
+            self.consulta()
+            if self._aceptar('WITH'):
+                self._aceptar('NO')
+                self._esperar('DATA')
+            return 'CREATE MATERIALIZED VIEW' if materializada else 'CREATE VIEW'
+        if materializada:
+            raise self._error("MATERIALIZED solo puede ir antes de VIEW")
+
+        if self._aceptar('TABLE'):
+            if self._aceptar('IF'):
+                self._esperar('NOT')
+                self._esperar('EXISTS')
+            self._nombre_calificado()
+            if self._aceptar('AS'):
+                self.consulta()
+            else:
+                self._saltar_parentesis()
+            return 'CREATE TABLE'
+        raise self._error(f"se esperaba TABLE, VIEW o INDEX después de CREATE y se encontró {self._encontrado()}")
+
+    def _insert(self):
+        self._avanzar()
+        self._esperar('INTO')
+        self._nombre_calificado()
+        if self._es('(') and self._ver().valor not in ('SELECT', 'WITH'):
+            self._esperar('(')
+            self._lista(self._identificador)
+            self._esperar(')')
+        if self._aceptar('DEFAULT'):
+            self._esperar('VALUES')
+        else:
+            self.consulta()
+        if self._aceptar('ON'):
+            self._esperar('CONFLICT')
+            self._resto_hasta('RETURNING')
+        self._returning()
+        return 'INSERT'
+
+    def _resto_hasta(self, palabra):
+        while not self._es(';', palabra) and self.actual.tipo != 'fin':
+            if self._es('('):
+                self._saltar_parentesis()
+            else:
+                self._avanzar()
+
+    def _update(self):
+        self._avanzar()
+        tablas = {}
+        self._tabla_con_alias(tablas)
+        self._esperar('SET')
+
+        def asignacion():
+            if self._es('('):
+                self._saltar_parentesis()
+            else:
+                self._nombre_calificado()
+            self._esperar('=')
+            return self.expresion()
+
+        self._lista(asignacion)
+        if self._aceptar('FROM'):
+            self._from(tablas)
+        if self._aceptar('WHERE'):
+            self._revisar_sin_agregadas(self.expresion(), 'WHERE')
+        self._returning()
+        return 'UPDATE'
+
+    def _delete(self):
+        self._avanzar()
+        self._esperar('FROM')
+        tablas = {}
+        self._tabla_con_alias(tablas)
+        if self._aceptar('USING'):
+            self._from(tablas)
+        if self._aceptar('WHERE'):
+            self._revisar_sin_agregadas(self.expresion(), 'WHERE')
+        self._returning()
+        return 'DELETE'
+
+    def _returning(self):
+        if self._aceptar('RETURNING'):
+            self._lista(self._item_select)
+
+    def _drop(self):
+        self._avanzar()
+        if self._aceptar('MATERIALIZED'):
+            self._esperar('VIEW')
+            objeto = 'MATERIALIZED VIEW'
+        else:
+            objeto = self._esperar('TABLE', 'VIEW', 'INDEX').valor
+        if self._aceptar('IF'):
+            self._esperar('EXISTS')
+        self._lista(self._nombre_calificado)
+        self._aceptar('CASCADE', 'RESTRICT')
+        return f'DROP {objeto}'
+
+    # Consultas
+
+    def consulta(self):
+        if self._aceptar('WITH'):
+            self._aceptar('RECURSIVE')
+
+            def cte():
+                self._identificador("el nombre de la CTE")
+                if self._es('('):
+                    self._saltar_parentesis()
+                self._esperar('AS')
+                self._esperar('(')
+                self.consulta()
+                self._esperar(')')
+
+            self._lista(cte)
+
+        selects = [self._select_simple()]
+        while self._aceptar('UNION', 'INTERSECT', 'EXCEPT'):
+            self._aceptar('ALL', 'DISTINCT')
+            selects.append(self._select_simple())
+
+        orden = []
+        if self._aceptar('ORDER'):
+            self._esperar('BY')
+            orden = self._lista(self._elemento_orden)
+        if self._aceptar('LIMIT'):
+            if not self._aceptar('ALL'):
+                self.expresion()
+        if self._aceptar('OFFSET'):
+            self.expresion()
+            self._aceptar('ROWS', 'ROW')
+        if self._aceptar('FETCH'):
+            self._resto_hasta(')')
+
+        # ORDER BY pertenece al último SELECT cuando no hay operaciones de conjuntos
+        if len(selects) == 1 and selects[0] is not None:
+            selects[0]['orden'] = orden
+        # La consulta exterior es la última en terminar
+        self.ultima_consulta = (selects, orden)
+
+    def _select_simple(self):
+        if self._aceptar('('):
+            self.consulta()
+            self._esperar(')')
+            return None
+        if self._aceptar('VALUES'):
+            def fila():
+                self._esperar('(')
+                self._lista(self.expresion)
+                self._esperar(')')
+            self._lista(fila)
+            return None
+
+        inicio = self._esperar('SELECT')
+        select = {'pos': inicio.pos, 'items': [], 'tablas': {}, 'agrupacion': [],
+                  'having': None, 'orden': [], 'where': None}
+        self.consultas.append(select)
+
+        if self._aceptar('DISTINCT'):
+            if self._aceptar('ON'):
+                self._saltar_parentesis()
+        else:
+            self._aceptar('ALL')
+
+        if self._es('FROM', ';') or self.actual.tipo == 'fin':
+            raise self._error(f"se esperaba al menos una columna después de SELECT y se encontró {self._encontrado()}")
+        select['items'] = self._lista(self._item_select)
+        if self._aceptar('INTO'):
+            self._nombre_calificado()
+        if self._aceptar('FROM'):
+            self._from(select['tablas'])
+        if self._aceptar('WHERE'):
+            select['where'] = self.expresion()
+            self._revisar_sin_agregadas(select['where'], 'WHERE')
+        if self._es('GROUP'):
+            self._avanzar()
+            self._esperar('BY')
+            select['agrupacion'] = self._lista(self.expresion)
+        if self._es('HAVING'):
+            select['having'] = (self._avanzar(), self.expresion())
+        return select
+
+    def _item_select(self):
+        if self._es('*'):
+            return {'expresion': _nodo('estrella', self._avanzar().pos, tabla=None), 'alias': None}
+        expresion = self.expresion()
+        alias = None
+        if self._aceptar('AS'):
+            alias = self._identificador("un alias")
+        elif self.actual.tipo == 'palabra' and self.actual.valor not in RESERVADAS:
+            alias = self._identificador()
+        return {'expresion': expresion, 'alias': alias}
+
+    def _elemento_orden(self):
+        expresion = self.expresion()
+        self._aceptar('ASC', 'DESC')
+        if self._aceptar('NULLS'):
+            self._esperar('FIRST', 'LAST')
+        return expresion
+
+    def _lista(self, elemento):
+        elementos = [elemento()]
+        while self._aceptar(','):
+            elementos.append(elemento())
+        return elementos
+
+    def _tabla_con_alias(self, tablas):
+        if self._es('('):
+            self._avanzar()
+            self.consulta()
+            self._esperar(')')
+            nombre = None
+        else:
+            nombre = self._nombre_calificado()
+            if self._es('('):
+                # Función que devuelve filas, p. ej. generate_series(...)
+                self._saltar_parentesis()
+        alias = nombre
+        if self._aceptar('AS'):
+            alias = self._identificador("un alias")
+        elif self.actual.tipo == 'palabra' and self.actual.valor not in RESERVADAS:
+            alias = self._identificador()
+        if alias and self._es('('):
+            self._saltar_parentesis()
+        if alias:
+            tablas[alias] = nombre
+
+    def _from(self, tablas):
+        self._tabla_con_alias(tablas)
+        while True:
+            if self._aceptar(','):
+                self._tabla_con_alias(tablas)
+                continue
+
+            inicio = self.actual
+            natural = self._aceptar('NATURAL')
+            cruzado = self._aceptar('CROSS')
+            if not cruzado:
+                if self._aceptar('LEFT', 'RIGHT', 'FULL'):
+                    self._aceptar('OUTER')
+                else:
+                    self._aceptar('INNER')
+            if not self._es('JOIN'):
+                if self.actual is not inicio:
+                    raise self._error(f"se esperaba JOIN y se encontró {self._encontrado()}")
+                return
+            token_join = self._avanzar()
+            self._tabla_con_alias(tablas)
+
+            if natural or cruzado:
+                continue
+            if self._aceptar('ON'):
+                self._revisar_sin_agregadas(self.expresion(), 'ON')
+            elif self._aceptar('USING'):
+                self._saltar_parentesis()
+            else:
+                raise self._error(
+                    f"{inicio.texto.upper() if inicio is not token_join else 'JOIN'} sin condición: "
+                    f"agrega ON (o USING) después de la tabla, o usa CROSS JOIN si quieres el producto cartesiano",
+                    token_join
+                )
+
+    # Expresiones
+
+    def expresion(self):
+        izquierda = self._y()
+        while self._es('OR'):
+            operador = self._avanzar()
+            izquierda = _operacion(operador, [izquierda, self._y()])
+        return izquierda
+
+    def _y(self):
+        izquierda = self._no()
+        while self._es('AND'):
+            operador = self._avanzar()
+            izquierda = _operacion(operador, [izquierda, self._no()])
+        return izquierda
+
+    def _no(self):
+        if self._es('NOT'):
+            operador = self._avanzar()
+            return _operacion(operador, [self._no()])
+        return self._comparacion()
+
+    def _comparacion(self):
+        izquierda = self._aditiva()
+        while True:
+            operador = self.actual
+            if self._aceptar('IS'):
+                self._aceptar('NOT')
+                if self._aceptar('DISTINCT'):
+                    self._esperar('FROM')
+                    izquierda = _operacion(operador, [izquierda, self._aditiva()])
+                else:
+                    self._esperar('NULL', 'TRUE', 'FALSE')
+                    izquierda = _operacion(operador, [izquierda])
+                continue
+
+            negado = self._es('NOT') and self._ver().valor in ('IN', 'BETWEEN', 'LIKE', 'ILIKE')
+            if negado:
+                self._avanzar()
+            if self._aceptar('IN'):
+                self._esperar('(')
+                if self._es('SELECT', 'WITH'):
+                    self.consulta()
+                    derecha = [_nodo('subconsulta', operador.pos)]
+                else:
+                    derecha = self._lista(self.expresion)
+                self._esperar(')')
+                izquierda = _operacion(operador, [izquierda] + derecha)
+            elif self._aceptar('BETWEEN'):
+                menor = self._aditiva()
+                self._esperar('AND')
+                izquierda = _operacion(operador, [izquierda, menor, self._aditiva()])
+            elif self._aceptar('LIKE', 'ILIKE'):
+                args = [izquierda, self._aditiva()]
+                if self._aceptar('ESCAPE'):
+                    args.append(self._aditiva())
+                izquierda = _operacion(operador, args)
+            elif negado:
+                raise self._error("se esperaba IN, BETWEEN o LIKE después de NOT")
+            elif self._aceptar('=', '<', '>', '<=', '>=', '<>', '!='):
+                if self._es('ANY', 'SOME', 'ALL') and self._ver().valor == '(':
+                    # x = ANY(ARRAY[...]) o x > ALL(SELECT ...)
+                    self._avanzar()
+                    izquierda = _operacion(operador, [izquierda, self._primaria()])
+                else:
+                    izquierda = _operacion(operador, [izquierda, self._aditiva()])
+            else:
+                return izquierda
+
+    def _aditiva(self):
+        izquierda = self._multiplicativa()
+        while self._es('+', '-', '||'):
+            operador = self._avanzar()
+            izquierda = _operacion(operador, [izquierda, self._multiplicativa()])
+        return izquierda
+
+    def _multiplicativa(self):
+        izquierda = self._unaria()
+        while self._es('*', '/', '%'):
+            operador = self._avanzar()
+            izquierda = _operacion(operador, [izquierda, self._unaria()])
+        return izquierda
+
+    def _unaria(self):
+        if self._es('-', '+'):
+            operador = self._avanzar()
+            return _operacion(operador, [self._unaria()])
+        expresion = self._primaria()
+        while self._aceptar('::'):
+            self._tipo()
+        return expresion
+
+    def _tipo(self):
+        self._identificador("un tipo de dato")
+        self._aceptar('PRECISION', 'VARYING')
+        if self._es('('):
+            self._saltar_parentesis()
+        if self._aceptar('['):
+            self._esperar(']')
+
+    def _primaria(self):
+        token = self.actual
+
+        if self._aceptar('('):
+            if self._es('SELECT', 'WITH'):
+                self.consulta()
+                self._esperar(')')
+                return _nodo('subconsulta', token.pos)
+            elementos = self._lista(self.expresion)
+            self._esperar(')')
+            return elementos[0] if len(elementos) == 1 else _operacion(token, elementos)
+
+        if token.tipo in ('numero', 'cadena'):
+            self._avanzar()
+            return _nodo('literal', token.pos, valor=token.texto)
+
+        if token.tipo != 'palabra':
+            raise self._error(f"se esperaba una expresión y se encontró {self._encontrado()}")
+
+        palabra = token.valor if not token.texto.startswith('"') else None
+        if palabra in ('NULL', 'TRUE', 'FALSE'):
+            self._avanzar()
+            return _nodo('literal', token.pos)
+        if palabra in ('DATE', 'TIMESTAMP', 'INTERVAL', 'TIME') and self._ver().tipo == 'cadena':
+            self._avanzar()
+            self._avanzar()
+            return _nodo('literal', token.pos)
+        if palabra == 'CASE':
+            return self._case()
+        if palabra == 'ARRAY' and self._ver().valor == '[':
+            self._avanzar()
+            self._avanzar()
+            elementos = [] if self._es(']') else self._lista(self.expresion)
+            self._esperar(']')
+            return _operacion(token, elementos)
+        if palabra == 'EXISTS':
+            self._avanzar()
+            self._esperar('(')
+            self.consulta()
+            self._esperar(')')
+            return _nodo('subconsulta', token.pos)
+        if palabra == 'CAST':
+            self._avanzar()
+            self._esperar('(')
+            expresion = self.expresion()
+            self._esperar('AS')
+            self._tipo()
+            self._esperar(')')
+            return expresion
+        if palabra == 'EXTRACT' and self._ver().valor == '(':
+            self._avanzar()
+            self._avanzar()
+            campo = self._identificador("un campo de fecha (YEAR, MONTH, ...)")
+            self._esperar('FROM')
+            expresion = self.expresion()
+            self._esperar(')')
+            return _nodo('funcion', token.pos, nombre='EXTRACT', args=[_nodo('literal', token.pos, valor=campo), expresion],
+                         agregada=False, ventana=False)
+        if palabra in RESERVADAS:
+            raise self._error(f"se esperaba una expresión y se encontró {self._encontrado()}")
+
+        nombre = self._identificador()
+        if self._es('('):
+            return self._funcion(token, nombre)
+
+        # columna, tabla.columna o esquema.tabla.columna
+        tabla = None
+        while self._aceptar('.'):
+            tabla = nombre
+            if self._es('*'):
+                return _nodo('estrella', self._avanzar().pos, tabla=tabla)
+            nombre = self._identificador("el nombre de una columna")
+        return _nodo('columna', token.pos, tabla=tabla, nombre=nombre)
+
+    def _funcion(self, token, nombre):
+        self._esperar('(')
+        args = []
+        if self._aceptar('*'):
+            args = [_nodo('literal', token.pos)]
+        elif not self._es(')'):
+            self._aceptar('DISTINCT', 'ALL')
+            args = self._lista(self.expresion)
+            if self._aceptar('ORDER'):
+                self._esperar('BY')
+                self._lista(self._elemento_orden)
+        self._esperar(')')
+
+        if self._aceptar('FILTER'):
+            self._saltar_parentesis()
+        ventana = False
+        if self._aceptar('OVER'):
+            ventana = True
+            if self._es('('):
+                self._saltar_parentesis()
+            else:
+                self._identificador("el nombre de una ventana")
+        return _nodo('funcion', token.pos, nombre=nombre.upper(), args=args,
+                     agregada=nombre.upper() in AGREGADAS and not ventana, ventana=ventana)
+
+    def _case(self):
+        inicio = self._avanzar()
+        args = []
+        if not self._es('WHEN'):
+            args.append(self.expresion())
+        if not self._es('WHEN'):
+            raise self._error(f"se esperaba WHEN y se encontró {self._encontrado()}")
+        while self._aceptar('WHEN'):
+            args.append(self.expresion())
+            self._esperar('THEN')
+            args.append(self.expresion())
+        if self._aceptar('ELSE'):
+            args.append(self.expresion())
+        self._esperar('END')
+        return _operacion(inicio, args)
+
+    def _revisar_sin_agregadas(self, expresion, clausula):
+        agregada = _primera_agregada(expresion)
+        if agregada is not None:
+            raise ErrorSintaxis(
+                f"no se permiten funciones de agregación ({agregada['nombre']}) en {clausula}; "
+                f"para filtrar grupos usa HAVING", agregada['pos']
+            )
+
+def _hijos(expresion):
+    return expresion.get('args', [])
+
+def _primera_agregada(expresion):
+    if expresion['tipo'] == 'funcion' and expresion['agregada']:
+        return expresion
+    for hijo in _hijos(expresion):
+        encontrada = _primera_agregada(hijo)
+        if encontrada is not None:
+            return encontrada
+    return None
+
+def _firma(expresion):
+    # Forma comparable de una expresión, sin posiciones ni calificadores de tabla
+    if expresion['tipo'] == 'columna':
+        return ('columna', expresion['nombre'])
+    if expresion['tipo'] == 'funcion':
+        return ('funcion', expresion['nombre'], tuple(_firma(a) for a in expresion['args']))
+    if expresion['tipo'] == 'operacion':
+        return ('operacion', expresion['operador'], tuple(_firma(a) for a in expresion['args']))
+    return (expresion['tipo'], expresion.get('valor'))
+
+def _nombre_columna(columna):
+    return f"{columna['tabla']}.{columna['nombre']}" if columna['tabla'] else columna['nombre']
+
+def _revisar_agrupacion(select, problemas):
+    items = select['items']
+    having = select['having']
+    agrupacion = select['agrupacion']
+
+    if having is not None and not agrupacion:
+        problemas.append(('advertencia', having[0].pos,
+                          "HAVING sin GROUP BY: toda la tabla se trata como un único grupo"))
+
+    agregada = any(_primera_agregada(item['expresion']) for item in items) or \
+        (having is not None and _primera_agregada(having[1])) or \
+        any(_primera_agregada(expresion) for expresion in select['orden'])
+    if not agrupacion and not agregada:
+        return
+
+    alias = {item['alias']: item['expresion'] for item in items if item['alias']}
+    firmas = set()
+    columnas = set()
+    for expresion in agrupacion:
+        if expresion['tipo'] == 'columna' and not expresion['tabla'] and expresion['nombre'] in alias:
+            expresion = alias[expresion['nombre']]
+        elif expresion['tipo'] == 'literal' and str(expresion.get('valor')).isdigit():
+            # GROUP BY 1: posición dentro de la lista del SELECT
+            posicion = int(expresion['valor'])
+            if not 1 <= posicion <= len(items):
+                raise ErrorSintaxis(f"GROUP BY {posicion} no corresponde a ninguna columna del SELECT",
+                                    expresion['pos'])
+            expresion = items[posicion - 1]['expresion']
+        firmas.add(_firma(expresion))
+        if expresion['tipo'] == 'columna':
+            columnas.add((expresion['tabla'], expresion['nombre']))
+
+    # Agrupar por la clave primaria de una tabla agrupa todas sus columnas
+    tablas_por_clave = set()
+    for tabla, nombre in columnas:
+        if tabla is None and len(select['tablas']) == 1:
+            tabla = next(iter(select['tablas']))
+        if tabla in select['tablas'] and CLAVES_PRIMARIAS.get(select['tablas'][tabla]) == nombre:
+            tablas_por_clave.add(tabla)
+
+    def agrupada(columna):
+        tabla = columna['tabla']
+        if tabla is None and len(select['tablas']) == 1:
+            tabla = next(iter(select['tablas']))
+        if tabla in tablas_por_clave:
+            return True
+        return any(nombre == columna['nombre'] and (t is None or columna['tabla'] is None or t == columna['tabla'])
+                   for t, nombre in columnas)
+
+    def revisar(expresion, admite_alias):
+        if _firma(expresion) in firmas:
+            return
+        tipo = expresion['tipo']
+        if tipo == 'funcion' and (expresion['agregada'] or expresion['ventana']):
+            return
+        if tipo == 'columna':
+            if admite_alias and not expresion['tabla'] and expresion['nombre'] in alias:
+                return
+            if not agrupada(expresion):
+                raise ErrorSintaxis(
+                    f"la columna {_nombre_columna(expresion)} debe aparecer en GROUP BY "
+                    f"o usarse dentro de una función de agregación", expresion['pos']
+                )
+            return
+        if tipo == 'estrella':
+            if expresion['tabla'] not in tablas_por_clave:
+                raise ErrorSintaxis("SELECT * no se puede combinar con GROUP BY o funciones de agregación; "
+                                    "enumera las columnas agrupadas", expresion['pos'])
+            return
+        for hijo in _hijos(expresion):
+            revisar(hijo, admite_alias)
+
+    for item in items:
+        revisar(item['expresion'], False)
+    if having is not None:
+        revisar(having[1], False)
+    for expresion in select['orden']:
+        if expresion['tipo'] != 'literal':
+            revisar(expresion, True)
+
+def _linea_columna(codigo, pos):
+    linea = codigo.count('\n', 0, pos) + 1
+    columna = pos - (codigo.rfind('\n', 0, pos) + 1) + 1
+    return linea, columna
+
+@functools.lru_cache(maxsize=256)
+def analizar_sql(codigo):
+    # Cada rerun vuelve a validar el editor: el texto sin cambios sale de la caché.
+    # El resultado se comparte entre llamadas y no debe modificarse.
+    problemas = []
+    sentencias = []
+
+    try:
+        tokens = tokenizar(codigo)
+    except ErrorSintaxis as e:
+        problemas.append(('error', e.pos, e.mensaje))
+        tokens = None
+
+    if tokens is not None:
+        parser = _Parser(tokens)
+        while parser.actual.tipo != 'fin':
+            if parser._aceptar(';'):
+                continue
+            parser.consultas = []
+            try:
+                sentencias.append(parser.sentencia())
+                if not parser._es(';') and parser.actual.tipo != 'fin':
+                    raise parser._error(f"se esperaba ; o el final de la sentencia y se encontró {parser._encontrado()}")
+                for select in parser.consultas:
+                    _revisar_agrupacion(select, problemas)
+            except ErrorSintaxis as e:
+                problemas.append(('error', e.pos, e.mensaje))
+                # Se descarta el resto de la sentencia y se sigue con la siguiente
+                while not parser._es(';') and parser.actual.tipo != 'fin':
+                    parser._avanzar()
+
+    errores = []
+    advertencias = []
+    for tipo, pos, mensaje in sorted(problemas, key=lambda problema: problema[1]):
+        linea, columna = _linea_columna(codigo, pos)
+        destino = errores if tipo == 'error' else advertencias
+        destino.append({'linea': linea, 'columna': columna, 'mensaje': mensaje})
+
+    return {
+        'sentencias': tuple(sentencias),
+        'errores': tuple(errores),
+        'advertencias': tuple(advertencias)
+    }
+
+def _clave_de_orden(expresion, items):
+    if expresion['tipo'] == 'literal' and str(expresion.get('valor')).isdigit():
+        return int(expresion['valor']) - 1
+    if expresion['tipo'] == 'columna' and not expresion['tabla']:
+        for i, item in enumerate(items):
+            if item['alias'] == expresion['nombre']:
+                return i
+    firma = _firma(expresion)
+    for i, item in enumerate(items):
+        if item['expresion']['tipo'] != 'estrella' and _firma(item['expresion']) == firma:
+            return i
+    if expresion['tipo'] == 'columna' and any(item['expresion']['tipo'] == 'estrella' for item in items):
+        # Con SELECT * el nombre se resuelve contra las columnas del cursor
+        return expresion['nombre']
+    return None
+
+@functools.lru_cache(maxsize=256)
+def claves_de_orden(sentencia):
+    # Columnas del resultado por las que ordena la consulta principal: una
+    # posición, un nombre o None si la clave no es una columna del resultado.
+    # Devuelve None si la sentencia no es un SELECT con ORDER BY.
+    try:
+        parser = _Parser(tokenizar(sentencia))
+        if parser.sentencia() != 'SELECT':
+            return None
+    except ErrorSintaxis:
+        return None
+
+    selects, orden = parser.ultima_consulta
+    if not orden:
+        return None
+    items = selects[0]['items'] if selects[0] is not None else []
+    return tuple(_clave_de_orden(expresion, items) for expresion in orden)
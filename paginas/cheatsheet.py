@@ -0,0 +1,40 @@
+import streamlit as st
+
+from laboratorio import contenido
+
+st.markdown("## Cheat-sheet SQL Avanzado")
+
+st.dataframe(contenido.tabla('tablas.json', 'comandos'), use_container_width=True)
+
+st.markdown("### Ejemplos Rápidos")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("**Consulta con JOIN y agregación:**")
+    st.code("""
+SELECT 
+    s.ciudad,
+    COUNT(DISTINCT s.student_id) AS estudiantes,
+    COUNT(e.enrollment_id) AS inscripciones
+FROM students s
+LEFT JOIN enrollments e 
+    ON s.student_id = e.student_id
+GROUP BY s.ciudad
+HAVING COUNT(DISTINCT s.student_id) > 1
+ORDER BY estudiantes DESC;""", language='sql')
+
+with col2:
+    st.markdown("**Vista con múltiples JOIN:**")
+    st.code("""
+CREATE VIEW v_reporte_completo AS
+SELECT 
+    s.nombre AS estudiante,
+    c.nombre AS curso,
+    p.nombre AS profesor,
+    c.creditos,
+    e.fecha_inscripcion
+FROM enrollments e
+JOIN students s ON e.student_id = s.student_id
+JOIN courses c ON e.course_id = c.course_id
+JOIN professors p ON c.professor_id = p.professor_id;""", language='sql')
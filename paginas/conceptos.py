@@ -0,0 +1,273 @@
+import pandas as pd
+import streamlit as st
+
+from laboratorio import contenido
+from laboratorio.benchmarks import benchmark_escrituras, benchmark_indices, ejecutar_en_proceso
+from laboratorio.datos import obtener_datos_ejemplo
+from laboratorio.generador import ESCALAS
+
+@st.cache_data(show_spinner=False)
+def medir_indices(escala, repeticiones):
+    return ejecutar_en_proceso(benchmark_indices, escala, contenido.cargar('views_indexes.sql'), repeticiones)
+
+@st.cache_data(show_spinner=False)
+def medir_escrituras(escala, filas, tamano_lote):
+    return ejecutar_en_proceso(benchmark_escrituras, escala, contenido.cargar('views_indexes.sql'),
+                               filas, tamano_lote)
+
+st.markdown("## Conceptos Clave")
+
+tabs = st.tabs(["JOIN", "ORDER BY", "Funciones de Agregación", "GROUP BY/HAVING", "Índices", "Vistas"])
+
+with tabs[0]:
+    st.markdown("""
+    ### JOIN - Combinando Tablas
+    
+    Los JOIN permiten combinar filas de dos o más tablas basándose en columnas relacionadas.
+    """)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="concepto-card">
+        <h4>INNER JOIN</h4>
+        <p>Retorna solo los registros que tienen coincidencias en ambas tablas.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.code("""
+-- INNER JOIN básico
+SELECT s.nombre, c.nombre AS curso
+FROM students s
+INNER JOIN enrollments e 
+    ON s.student_id = e.student_id
+INNER JOIN courses c 
+    ON e.course_id = c.course_id;""", language='sql')
+    
+    with col2:
+        st.markdown("""
+        <div class="concepto-card">
+        <h4>LEFT JOIN</h4>
+        <p>Retorna todos los registros de la tabla izquierda, incluso sin coincidencias.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.code("""
+-- LEFT JOIN para incluir todos
+SELECT s.nombre, 
+       COUNT(e.enrollment_id) AS cursos
+FROM students s
+LEFT JOIN enrollments e 
+    ON s.student_id = e.student_id
+GROUP BY s.student_id, s.nombre;""", language='sql')
+    
+    if st.checkbox("Ver ejemplo con datos", key="join_ejemplo"):
+        students, courses, enrollments = obtener_datos_ejemplo()
+        
+        st.markdown("**Tabla students:**")
+        st.dataframe(students.head(3), use_container_width=True)
+        
+        st.markdown("**Resultado del INNER JOIN:**")
+        resultado = pd.DataFrame({
+            'estudiante': ['Ana García', 'Ana García', 'Luis Pérez'],
+            'curso': ['Base de Datos I', 'Programación II', 'Base de Datos I']
+        })
+        st.dataframe(resultado, use_container_width=True)
+
+with tabs[1]:
+    st.markdown("""
+    ### ORDER BY - Ordenamiento de Resultados
+    
+    ORDER BY permite ordenar los resultados por una o más columnas.
+    """)
+    
+    st.code("""
+-- Ordenamiento simple
+SELECT nombre, ciudad 
+FROM students 
+ORDER BY ciudad ASC, nombre DESC;
+
+-- Ordenamiento con expresiones
+SELECT nombre, 
+       ciudad,
+       LENGTH(nombre) AS longitud_nombre
+FROM students 
+ORDER BY longitud_nombre DESC, ciudad;
+
+-- Ordenamiento con NULLS FIRST/LAST
+SELECT nombre, fecha_nacimiento
+FROM students
+ORDER BY fecha_nacimiento DESC NULLS LAST;""", language='sql')
+
+with tabs[2]:
+    st.markdown("""
+    ### Funciones de Agregación
+    
+    Las funciones de agregación realizan cálculos sobre conjuntos de valores.
+    """)
+    
+    st.table(contenido.tabla('tablas.json', 'funciones_agregacion'))
+    
+    st.code("""
+-- Ejemplos de funciones de agregación
+SELECT 
+    COUNT(*) AS total_estudiantes,
+    COUNT(DISTINCT ciudad) AS ciudades_diferentes,
+    AVG(edad)::NUMERIC(4,2) AS edad_promedio,
+    MAX(fecha_ingreso) AS ultimo_ingreso,
+    MIN(fecha_ingreso) AS primer_ingreso
+FROM students
+WHERE activo = true;""", language='sql')
+
+with tabs[3]:
+    st.markdown("""
+    ### GROUP BY y HAVING
+    
+    GROUP BY agrupa filas con valores idénticos en columnas especificadas.
+    HAVING filtra grupos después de la agregación.
+    """)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**GROUP BY**")
+        st.code("""
+-- Agrupar por ciudad
+SELECT ciudad, 
+       COUNT(*) AS estudiantes
+FROM students
+GROUP BY ciudad
+ORDER BY estudiantes DESC;""", language='sql')
+    
+    with col2:
+        st.markdown("**HAVING**")
+        st.code("""
+-- Filtrar grupos con HAVING
+SELECT ciudad, 
+       COUNT(*) AS estudiantes
+FROM students
+GROUP BY ciudad
+HAVING COUNT(*) > 2
+ORDER BY estudiantes DESC;""", language='sql')
+    
+    st.info("**Tip:** WHERE filtra filas ANTES de agrupar, HAVING filtra grupos DESPUÉS de agrupar.")
+
+with tabs[4]:
+    st.markdown("""
+    ### Índices - Optimización de Consultas
+    
+    Los índices mejoran significativamente el rendimiento de las consultas.
+    """)
+    
+    st.code("""
+-- Índice simple
+CREATE INDEX idx_students_email ON students(email);
+
+-- Índice compuesto
+CREATE INDEX idx_enrollments_composite 
+ON enrollments(student_id, course_id);
+
+-- Índice único
+CREATE UNIQUE INDEX idx_documento 
+ON students(documento);
+
+-- Índice parcial
+CREATE INDEX idx_active_students 
+ON students(ciudad) 
+WHERE activo = true;
+
+-- Eliminar índice
+DROP INDEX idx_students_email;""", language='sql')
+    
+    st.warning("**Importante:** Los índices aceleran las consultas pero ralentizan INSERT/UPDATE/DELETE.")
+    
+    # Los benchmarks construyen y copian la base de la escala elegida: solo
+    # para el docente, y cada combinación de parámetros se mide una vez
+    if not st.session_state.modo_docente:
+        st.info("Activa modo docente para ejecutar los benchmarks de índices")
+    else:
+        with st.expander("Benchmark: la misma consulta con y sin índice"):
+            st.markdown("""
+            Ejecuta cada consulta repetidas veces sobre un dataset escalado, primero sin el índice
+            y luego después de crearlo con la definición de `views_indexes.sql`.
+            """)
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                escala = st.selectbox("Escala del dataset", list(ESCALAS), index=1, key="bench_escala")
+            
+            with col2:
+                repeticiones = st.number_input("Repeticiones por consulta", min_value=5,
+                                               max_value=500, value=50, key="bench_repeticiones")
+            
+            if st.button("Ejecutar benchmark", key="bench_indices"):
+                with st.spinner("Midiendo consultas (la primera vez se construye el dataset)..."):
+                    resultado = medir_indices(ESCALAS[escala], repeticiones)
+                
+                st.dataframe(resultado, use_container_width=True, hide_index=True)
+                st.caption("Latencias en milisegundos. El plan muestra SCAN (lectura completa) "
+                           "o SEARCH ... USING INDEX (búsqueda por índice).")
+        
+        with st.expander("Benchmark: costo de escritura según el número de índices"):
+            st.markdown("""
+            Inserta y actualiza el mismo lote de inscripciones en `enrollments` con 0, 1, 2 y 3
+            índices secundarios. Cada índice adicional es una estructura más que mantener en cada escritura.
+            """)
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                escala = st.selectbox("Escala del dataset", list(ESCALAS), index=1,
+                                      key="bench_escritura_escala")
+            
+            with col2:
+                filas = st.number_input("Filas a insertar", min_value=1_000, max_value=1_000_000,
+                                        value=20_000, step=1_000, key="bench_escritura_filas")
+            
+            with col3:
+                tamano_lote = st.number_input("Filas por lote", min_value=1, max_value=100_000,
+                                              value=1_000, key="bench_escritura_lote")
+            
+            if st.button("Ejecutar benchmark de escritura", key="bench_escrituras"):
+                with st.spinner("Insertando lotes..."):
+                    resultado = medir_escrituras(ESCALAS[escala], filas, tamano_lote)
+                
+                st.dataframe(resultado, use_container_width=True, hide_index=True)
+                st.bar_chart(resultado.set_index('Índices secundarios')[['INSERT filas/s', 'UPDATE filas/s']],
+                             stack=False)
+
+with tabs[5]:
+    st.markdown("""
+    ### Vistas - Consultas Reutilizables
+    
+    Las vistas son consultas almacenadas que se comportan como tablas virtuales.
+    """)
+    
+    st.code("""
+-- Crear vista simple
+CREATE VIEW v_estudiantes_activos AS
+SELECT student_id, nombre, email, ciudad
+FROM students
+WHERE activo = true;
+
+-- Vista con JOIN
+CREATE VIEW v_inscripciones_detalle AS
+SELECT 
+    s.nombre AS estudiante,
+    c.nombre AS curso,
+    c.creditos,
+    e.fecha_inscripcion
+FROM students s
+JOIN enrollments e ON s.student_id = e.student_id
+JOIN courses c ON e.course_id = c.course_id;
+
+-- Usar la vista
+SELECT * FROM v_estudiantes_activos
+WHERE ciudad = 'Medellín';
+
+-- Eliminar vista
+DROP VIEW v_estudiantes_activos;""", language='sql')
+    
+    st.success("**Beneficios:** Simplifican consultas complejas, mejoran seguridad y mantienen consistencia.")
@@ -0,0 +1,101 @@
+import streamlit as st
+
+from laboratorio import contenido
+from laboratorio.interfaz import (
+    actualizar_progreso, casilla_progreso, editor_sql, medir, mostrar_resultado_esperado, mostrar_resultados,
+    obtener_sesion_sql, refrescar_progreso, registrar_errores_sintaxis, registrar_marcador_progreso
+)
+
+def calificar_ejercicio(indice, codigo, solucion):
+    with medir('calificacion'):
+        exito, salida = obtener_sesion_sql().calificar(codigo, solucion)
+    if not exito:
+        st.session_state.calificaciones[indice] = (False, salida)
+        return
+    
+    st.session_state.calificaciones[indice] = (salida['correcto'], salida['mensaje'])
+    if salida['correcto']:
+        # La casilla se dibuja después de calificar: ya muestra el progreso nuevo
+        actualizar_progreso('ejercicios', indice, True)
+        st.session_state[f"ej_{indice}"] = True
+
+@st.fragment
+def tarjeta_ejercicio(i, ejercicio):
+    # Cada tarjeta se vuelve a ejecutar sola al usar su editor o su casilla
+    col1, col2 = st.columns([10, 1])
+    
+    with col1:
+        st.markdown(f"### {ejercicio['titulo']}")
+    
+    st.markdown(f"**Enunciado:** {ejercicio['enunciado']}")
+    
+    with st.expander("Ver pista"):
+        st.info(ejercicio['pista'])
+    
+    # Sale del archivo compilado por laboratorio.esperados; la solución no se muestra
+    if st.button("Ver resultado esperado", key=f"esperado_{i}"):
+        with medir('resultado_esperado'):
+            exito, salida = obtener_sesion_sql().esperado(ejercicio['solucion'])
+        mostrar_resultado_esperado(exito, salida)
+    
+    st.markdown("**Tu solución:**")
+    accion = editor_sql(
+        f"editor_ej_{i}",
+        ejercicio['plantilla'],
+        st.session_state.version_ejercicios,
+        [('validar', 'Validar'), ('ejecutar', 'Ver resultado simulado'), ('calificar', 'Calificar')],
+        altura=120
+    )
+    
+    if accion:
+        registrar_errores_sintaxis(accion['codigo'])
+    if accion and accion['modo'] == 'calificar':
+        calificar_ejercicio(i, accion['codigo'], ejercicio['solucion'])
+    elif accion:
+        with medir('consulta_ejercicio'):
+            exito, salida = obtener_sesion_sql().ejecutar(accion['codigo'])
+        mostrar_resultados(exito, salida)
+    
+    with col2:
+        # Lo marca el calificador; el docente puede ajustarlo a mano
+        casilla_progreso(
+            "✓", 'ejercicios', i, f"ej_{i}",
+            disabled=not st.session_state.modo_docente,
+            help="Se marca al calificar una solución correcta"
+        )
+    
+    calificacion = st.session_state.calificaciones.get(i)
+    if calificacion is not None:
+        correcto, mensaje = calificacion
+        if correcto:
+            st.success(mensaje)
+        else:
+            st.warning(mensaje)
+    
+    if st.session_state.modo_docente:
+        if st.button(f"Mostrar solución", key=f"sol_{i}"):
+            st.code(ejercicio['solucion'], language='sql')
+    else:
+        st.info("Activa modo docente para ver solución")
+    
+    st.divider()
+    refrescar_progreso()
+
+def resumen_ejercicios():
+    completados = sum(st.session_state.ejercicios_completados)
+    total = len(contenido.ejercicios())
+    
+    if completados == total:
+        st.success(f"Excelente! Completaste todos los ejercicios ({completados}/{total})")
+    else:
+        st.info(f"Progreso: {completados}/{total} ejercicios completados")
+
+st.markdown("## Ejercicios Guiados")
+
+# El resumen va debajo de las tarjetas, pero su lugar se crea antes
+tarjetas = st.container()
+registrar_marcador_progreso(resumen_ejercicios)
+
+with tarjetas:
+    for i, ejercicio in enumerate(contenido.ejercicios()):
+        tarjeta_ejercicio(i, ejercicio)
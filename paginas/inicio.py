@@ -0,0 +1,68 @@
+import streamlit as st
+
+from laboratorio.interfaz import actualizar_progreso, calcular_progreso_total
+
+st.markdown("""
+<div class="header-principal">
+    <h1>Semana 4 – Consultas SQL Avanzadas</h1>
+    <p style="margin-top: 0.5rem; font-size: 1.1rem;">Base de Datos I | Universidad Digital</p>
+</div>
+""", unsafe_allow_html=True)
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    st.markdown("""
+    ### Objetivos de Aprendizaje
+    
+    Esta semana profundizaremos en las capacidades avanzadas de SQL para:
+    - Combinar datos de múltiples tablas mediante JOIN
+    - Generar reportes complejos con funciones de agregación
+    - Optimizar consultas mediante índices estratégicos
+    - Crear vistas para simplificar consultas recurrentes
+    """)
+    
+    st.markdown("""
+    ### Logros Esperados
+    
+    Al completar esta semana serás capaz de:
+    - Escribir consultas con INNER JOIN, LEFT JOIN y RIGHT JOIN
+    - Usar GROUP BY y HAVING para análisis de datos
+    - Aplicar funciones de agregación (COUNT, SUM, AVG, MAX, MIN)
+    - Crear índices para optimizar el rendimiento
+    - Diseñar vistas para encapsular lógica compleja
+    - Ordenar resultados con ORDER BY múltiple
+    """)
+
+with col2:
+    st.markdown("""
+    <div class="progreso-card">
+    <h4>Tu Progreso</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    actualizar_progreso('teoria', 'revise_teoria', st.checkbox(
+        "✓ Revisé la teoría",
+        value=st.session_state.progreso_teoria['revise_teoria']
+    ))
+    
+    actualizar_progreso('teoria', 'hice_ejercicios', st.checkbox(
+        "✓ Hice los ejercicios",
+        value=st.session_state.progreso_teoria['hice_ejercicios']
+    ))
+    
+    actualizar_progreso('teoria', 'consulte_ejemplos', st.checkbox(
+        "✓ Consulté ejemplos",
+        value=st.session_state.progreso_teoria['consulte_ejemplos']
+    ))
+    
+    progreso = calcular_progreso_total()
+    st.progress(progreso / 100)
+    st.caption(f"Progreso total: {progreso:.0f}%")
+
+if st.session_state.modo_docente:
+    st.markdown("""
+    <div class="modo-docente-activo">
+    MODO DOCENTE ACTIVO - Las soluciones están visibles
+    </div>
+    """, unsafe_allow_html=True)
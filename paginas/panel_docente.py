@@ -0,0 +1,82 @@
+import pandas as pd
+import streamlit as st
+
+from laboratorio import contenido
+from laboratorio.interfaz import SECCIONES_PROGRESO, obtener_almacen_progreso, obtener_registro_tiempos
+
+def mostrar_progreso_clase():
+    # Agregados mantenidos al escribir cada lote: no se recorre a los estudiantes
+    resumen = obtener_almacen_progreso().resumen_clase()
+    estudiantes = resumen['estudiantes']
+    if not estudiantes:
+        st.info("Todavía no hay progreso guardado. Aparece cuando los estudiantes ingresan su código.")
+        return
+    
+    st.caption(f"{estudiantes} estudiantes con progreso guardado")
+    
+    st.markdown("### Ejercicios y retos completados")
+    completados = resumen['completados']
+    actividades = [(ejercicio['titulo'], 'ejercicios', i)
+                   for i, ejercicio in enumerate(contenido.ejercicios())] + \
+                  [(f"Reto: {reto['titulo']}", 'practica', i) for i, reto in enumerate(contenido.retos())]
+    tasas = pd.DataFrame({
+        'Actividad': [titulo for titulo, _, _ in actividades],
+        'Estudiantes': [completados.get((seccion, str(i)), 0) for _, seccion, i in actividades]
+    })
+    tasas['Completado'] = tasas['Estudiantes'] / estudiantes * 100
+    st.dataframe(
+        tasas,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Completado': st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100)
+        }
+    )
+    
+    st.markdown("### Progreso general de la clase")
+    total_items = sum(len(st.session_state[clave]) for clave in SECCIONES_PROGRESO.values())
+    histograma = pd.DataFrame({
+        'Progreso': [f"{n / total_items * 100:.0f}%" for n in range(total_items + 1)],
+        'Estudiantes': [resumen['histograma'].get(n, 0) for n in range(total_items + 1)]
+    })
+    st.bar_chart(histograma, x='Progreso', y='Estudiantes', sort=False)
+    
+    st.markdown("### Errores de sintaxis más frecuentes")
+    if resumen['errores']:
+        st.dataframe(
+            pd.DataFrame(resumen['errores'], columns=['Error', 'Veces']),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("Sin errores registrados")
+
+def mostrar_tiempos_ejecucion():
+    st.markdown("### Tiempos de ejecución")
+    registro = obtener_registro_tiempos()
+    tiempos = registro.resumen()
+    if tiempos:
+        st.dataframe(
+            pd.DataFrame({
+                'Bloque': [fila['bloque'] for fila in tiempos],
+                'Mediciones': [fila['mediciones'] for fila in tiempos],
+                'p50 (ms)': [fila['p50'] * 1000 for fila in tiempos],
+                'p95 (ms)': [fila['p95'] * 1000 for fila in tiempos],
+                'Total (s)': [fila['total'] for fila in tiempos]
+            }),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'p50 (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'p95 (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'Total (s)': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
+        st.caption(f"Percentiles de las últimas {registro.ventana} mediciones de cada bloque, "
+                   "de todas las sesiones de este servidor. Las vistas incluyen a los bloques que contienen.")
+    if registro.ruta_prometheus:
+        st.caption(f"Exportando a {registro.ruta_prometheus} cada {registro.intervalo_s:.0f} s")
+
+st.markdown("## Panel Docente")
+mostrar_progreso_clase()
+mostrar_tiempos_ejecucion()
@@ -0,0 +1,148 @@
+import streamlit as st
+
+from laboratorio import contenido
+from laboratorio.generador import ESCALAS
+from laboratorio.interfaz import (
+    casilla_progreso, describir_problema, editor_sql, medir, mostrar_plan, mostrar_resultado_esperado,
+    mostrar_resultados, obtener_registro_tiempos, obtener_sesion_sql, refrescar_progreso,
+    registrar_errores_sintaxis
+)
+from laboratorio.sintaxis import analizar_sql
+
+# Cada cuánto se refresca el estado de una consulta del sandbox en curso
+INTERVALO_SONDEO_S = 0.25
+
+def enviar_consulta_sandbox(modo):
+    # Un solo trabajo por sesión: uno nuevo reemplaza (y cancela) al anterior
+    anterior = st.session_state.consulta_sandbox
+    if anterior is not None and 'resultado' not in anterior:
+        if anterior['trabajo'].terminado:
+            # Recibirlo actualiza la sesión aunque el resultado ya no se muestre
+            anterior['sesion'].recibir(anterior['trabajo'])
+        else:
+            anterior['trabajo'].cancelar()
+    
+    for key in list(st.session_state.keys()):
+        if key.startswith('pagina_sandbox_'):
+            del st.session_state[key]
+    
+    registrar_errores_sintaxis(st.session_state.codigo_sandbox)
+    sesion = obtener_sesion_sql(ESCALAS[st.session_state.sandbox_escala])
+    st.session_state.consulta_sandbox = {
+        'modo': modo,
+        'codigo': st.session_state.codigo_sandbox,
+        'sesion': sesion,
+        'trabajo': sesion.enviar(st.session_state.codigo_sandbox, modo),
+        'paginas': {}
+    }
+
+def resultado_consulta_sandbox(sondeando):
+    consulta = st.session_state.consulta_sandbox
+    if consulta is None:
+        return
+    
+    trabajo = consulta['trabajo']
+    if 'resultado' not in consulta:
+        if not trabajo.terminado:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                if trabajo.estado == 'preparando datos':
+                    st.info(f"Preparando los datos de esta escala (solo la primera vez)... "
+                            f"{trabajo.transcurrido:.1f} s")
+                else:
+                    st.info(f"Consulta {trabajo.estado}... {trabajo.transcurrido:.1f} s")
+            with col2:
+                st.button("Cancelar", key="cancelar_sandbox", on_click=trabajo.cancelar)
+            return
+        
+        consulta['resultado'] = consulta['sesion'].recibir(trabajo)
+        # Corre en el pool: se registra lo que tardó desde que se envió
+        obtener_registro_tiempos().registrar('consulta_sandbox', trabajo.transcurrido)
+        if sondeando:
+            # Una última ejecución completa vuelve a montar el fragmento sin sondeo
+            st.rerun()
+    
+    exito, salida = consulta['resultado']
+    if consulta['modo'] == 'explicar':
+        mostrar_plan(exito, salida)
+    else:
+        mostrar_resultados(exito, salida, consulta)
+    if trabajo.estado == 'terminado':
+        st.caption(f"Tiempo total: {trabajo.transcurrido:.2f} s")
+
+@st.fragment
+def casilla_reto(i):
+    casilla_progreso("✓ Hecho", 'practica', i, f"prac_{i}")
+    refrescar_progreso()
+
+def cargar_codigo_sandbox(codigo):
+    st.session_state.codigo_sandbox = codigo
+    st.session_state.version_sandbox += 1
+
+st.markdown("## Práctica Autónoma (Sandbox)")
+
+st.markdown("Practica con estos retos avanzados. Haz clic para cargar el código base.")
+
+cols = st.columns(4)
+for i, reto in enumerate(contenido.retos()):
+    with cols[i]:
+        # Cargar un reto cambia el editor: ese botón sí vuelve a ejecutar la página
+        st.button(reto['titulo'], key=f"reto_{i}",
+                  on_click=cargar_codigo_sandbox, args=(reto['codigo'],))
+        casilla_reto(i)
+
+st.selectbox("Datos:", list(ESCALAS), key="sandbox_escala",
+             help="Con más datos se nota el efecto de los índices en el plan")
+
+st.markdown("**Editor SQL:**")
+accion = editor_sql(
+    "editor_sandbox",
+    st.session_state.codigo_sandbox,
+    st.session_state.version_sandbox,
+    [('ejecutar', 'Ejecutar'), ('validar', 'Validar sintaxis'), ('explicar', 'EXPLAIN ANALYZE'),
+     ('limpiar', 'Limpiar'), ('copiar', 'Copiar')],
+    vacio="-- Escribe tu consulta SQL aquí\n"
+)
+
+if accion:
+    st.session_state.codigo_sandbox = accion['codigo']
+    enviar_consulta_sandbox(accion['modo'])
+
+# El navegador ya validó lo básico; el analizador completo del servidor
+# solo revisa el código enviado
+consulta = st.session_state.consulta_sandbox
+if consulta is not None:
+    errores = analizar_sql(consulta['codigo'])['errores']
+    if errores:
+        resto = f" (y {len(errores) - 1} más)" if len(errores) > 1 else ""
+        st.caption(f"Sintaxis: {describir_problema(errores[0])}{resto}")
+
+# Mientras la consulta corre solo este fragmento se vuelve a ejecutar: los
+# retos, las casillas y la barra lateral siguen respondiendo
+sondeando = consulta is not None and not consulta['trabajo'].terminado
+st.fragment(resultado_consulta_sandbox,
+            run_every=INTERVALO_SONDEO_S if sondeando else None)(sondeando)
+
+with st.expander("Ver descripción detallada de los retos"):
+    for i, reto in enumerate(contenido.retos()):
+        st.markdown(f"**{reto['titulo']}**")
+        st.markdown(f"*{reto['descripcion']}*")
+        st.code(reto['codigo'], language='sql')
+        # Con los datos elegidos para el sandbox
+        if st.button("Ver resultado esperado", key=f"esperado_reto_{i}"):
+            with medir('resultado_esperado'):
+                sesion = obtener_sesion_sql(ESCALAS[st.session_state.sandbox_escala])
+                exito, salida = sesion.esperado(reto['codigo'])
+            mostrar_resultado_esperado(exito, salida)
+
+st.markdown("""
+<div class="tip-box">
+<strong>Tips de Buenas Prácticas:</strong>
+<ul>
+<li>Evita SELECT * en producción, especifica las columnas necesarias</li>
+<li>Usa alias descriptivos para mejorar la legibilidad</li>
+<li>Siempre incluye ORDER BY para resultados consistentes</li>
+<li>Considera índices en columnas frecuentemente filtradas o usadas en JOIN</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
@@ -0,0 +1,64 @@
+import streamlit as st
+
+from laboratorio import contenido
+
+st.markdown("## Recursos Adicionales")
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.markdown("### Archivos SQL")
+    
+    st.download_button(
+        label="Descargar joins.sql",
+        data=contenido.cargar('joins.sql'),
+        file_name="joins.sql",
+        mime="text/plain"
+    )
+    
+    st.download_button(
+        label="Descargar groupby.sql",
+        data=contenido.cargar('groupby.sql'),
+        file_name="groupby.sql",
+        mime="text/plain"
+    )
+    
+    st.download_button(
+        label="Descargar views_indexes.sql",
+        data=contenido.cargar('views_indexes.sql'),
+        file_name="views_indexes.sql",
+        mime="text/plain"
+    )
+
+with col2:
+    st.markdown("### Referencias Bibliográficas")
+    
+    st.markdown("""
+    - **Marqués, M. (2009).** *Bases de datos.* 
+      Castelló de la Plana: UJI.
+      
+    - **Pulido Romero, E. et al. (2019).** 
+      *Base de datos.* México: Grupo Patria.
+      
+    - **PostgreSQL Documentation (2025).** 
+      *Official PostgreSQL 17 Documentation.*
+    """)
+
+with col3:
+    st.markdown("### Enlaces Útiles")
+    
+    st.markdown("""
+    - [PostgreSQL JOIN Tutorial](https://www.postgresql.org/docs/current/tutorial-join.html)
+    - [SQL Aggregate Functions](https://www.postgresql.org/docs/current/functions-aggregate.html)
+    - [Index Types in PostgreSQL](https://www.postgresql.org/docs/current/indexes-types.html)
+    - [Views Documentation](https://www.postgresql.org/docs/current/sql-createview.html)
+    """)
+
+st.divider()
+
+st.info("""
+**Recomendación de estudio:** 
+Practica primero con JOINs simples antes de combinar con GROUP BY. 
+Los índices son cruciales para rendimiento en tablas grandes.
+Las vistas simplifican consultas complejas recurrentes.
+""")
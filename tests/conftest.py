@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Los datos que generan las pruebas no tocan la caché del proyecto; los
+# procesos que lanzan (pool, lote) heredan la variable
+os.environ.setdefault('CBD_DATOS_DIR', tempfile.mkdtemp(prefix='cbd_pruebas_'))
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from laboratorio.cache import CacheResultados, clave_cache, es_solo_lectura, normalizar_sql, tamano_resultados
+
+@pytest.mark.parametrize('a, b', [
+    ("SELECT * FROM students", "select *\n  from   students;"),
+    ("SELECT a,b FROM t WHERE x = 1", "SELECT a , b FROM t WHERE x=1"),
+    ("SELECT 1 -- comentario\n", "/* otro */ SELECT 1"),
+])
+def test_normalizar_equivalentes(a, b):
+    assert normalizar_sql(a) == normalizar_sql(b)
+
+def test_normalizar_respeta_literales():
+    assert normalizar_sql("SELECT 'Ana'") != normalizar_sql("SELECT 'ana'")
+    assert normalizar_sql("SELECT 'a  b'") != normalizar_sql("SELECT 'a b'")
+    assert normalizar_sql("select 'x' from t") == "SELECT 'x' FROM T"
+
+@pytest.mark.parametrize('codigo', [
+    "SELECT * FROM students",
+    "WITH c AS (SELECT 1) SELECT * FROM c",
+    "VALUES (1)",
+    "SELECT 'DELETE FROM students'",
+    "-- DROP TABLE students\nSELECT 1",
+])
+def test_lecturas(codigo):
+    assert es_solo_lectura(codigo)
+
+@pytest.mark.parametrize('codigo', [
+    "DELETE FROM students",
+    "WITH viejos AS (SELECT 1) DELETE FROM students",
+    "WITH x AS (DELETE FROM students RETURNING *) SELECT * FROM x",
+    "PRAGMA table_info(students)",
+    "SELECT 1; DROP TABLE students",
+    "CREATE TABLE t AS SELECT 1",
+    "EXPLAIN SELECT 1",
+    "REFRESH MATERIALIZED VIEW mv",
+    "",
+])
+def test_escrituras_nunca_cacheables(codigo):
+    assert not es_solo_lectura(codigo)
+    assert clave_cache(CacheResultados(), 'v1', codigo) is None
+
+def test_clave_cache():
+    cache = CacheResultados()
+    assert clave_cache(cache, 'v1', "select 1;") == clave_cache(cache, 'v1', "SELECT 1")
+    assert clave_cache(cache, 'v1', "SELECT 1") != clave_cache(cache, 'v2', "SELECT 1")
+    # Sin caché o con una sesión modificada no hay clave
+    assert clave_cache(None, 'v1', "SELECT 1") is None
+    assert clave_cache(cache, 'v1', "SELECT 1", admite_cache=False) is None
+
+def test_expulsion_por_bytes():
+    cache = CacheResultados(max_bytes=100)
+    cache.guardar('a', 1, 40)
+    cache.guardar('b', 2, 40)
+    assert cache.obtener('a') == 1
+    # 'b' es la menos usada: sale al superar el límite
+    cache.guardar('c', 3, 40)
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') == 1 and cache.obtener('c') == 3
+
+    estadisticas = cache.estadisticas()
+    assert estadisticas['bytes'] == 80 and estadisticas['entradas'] == 2
+    assert estadisticas['expulsiones'] == 1
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (3, 1)
+
+def test_entrada_mayor_que_la_cache():
+    cache = CacheResultados(max_bytes=100)
+    cache.guardar('a', 1, 40)
+    cache.guardar('grande', 2, 101)
+    assert cache.obtener('grande') is None
+    assert cache.obtener('a') == 1
+
+def test_reemplazar_entrada_descuenta_su_tamano():
+    cache = CacheResultados(max_bytes=100)
+    cache.guardar('a', 1, 60)
+    cache.guardar('a', 2, 30)
+    assert cache.estadisticas()['bytes'] == 30
+    assert cache.obtener('a') == 2
+
+def test_tamano_resultados_cuenta_los_datos():
+    datos = pd.DataFrame({'x': range(1000)})
+    resultados = [{'sentencia': "SELECT x", 'mensaje': "1000 filas", 'datos': datos},
+                  {'sentencia': "DELETE", 'mensaje': "ok", 'datos': None}]
+    assert tamano_resultados(resultados) >= datos.memory_usage(deep=True).sum()
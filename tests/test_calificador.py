@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from laboratorio.calificador import calificar, calificar_contra, comparar_huellas, huella_de_cursor, huella_esperada
+from laboratorio.contenido import ejercicios
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    yield conn
+    conn.close()
+
+def _huella(conn, filas, claves=None):
+    return huella_de_cursor(conn.execute(" UNION ALL ".join(f"SELECT {a!r} AS a, {b!r} AS b" for a, b in filas)),
+                            claves)
+
+def test_sin_orden_compara_multiconjuntos(conn):
+    esperada = _huella(conn, [(1, 'x'), (2, 'y'), (2, 'y')])
+    assert comparar_huellas(esperada, _huella(conn, [(2, 'y'), (1, 'x'), (2, 'y')]))[0]
+
+    correcto, mensaje = comparar_huellas(esperada, _huella(conn, [(1, 'x'), (1, 'x'), (2, 'y')]))
+    assert not correcto
+    assert mensaje == "Las filas no coinciden con el resultado esperado"
+
+    correcto, mensaje = comparar_huellas(esperada, _huella(conn, [(1, 'x'), (2, 'y')]))
+    assert not correcto
+    assert "2 filas y se esperaban 3" in mensaje
+
+def test_con_orden_solo_cuentan_las_claves(conn):
+    esperada = _huella(conn, [(1, 'x'), (1, 'y'), (2, 'z')], claves=(0,))
+    # El orden entre filas con la misma clave no importa
+    assert comparar_huellas(esperada, _huella(conn, [(1, 'y'), (1, 'x'), (2, 'z')], claves=(0,)))[0]
+
+    correcto, mensaje = comparar_huellas(esperada, _huella(conn, [(2, 'z'), (1, 'x'), (1, 'y')], claves=(0,)))
+    assert not correcto
+    assert "no están en el orden" in mensaje
+
+def test_clave_fuera_del_resultado_exige_el_mismo_orden(conn):
+    esperada = _huella(conn, [(1, 'x'), (1, 'y')], claves=(None,))
+    assert esperada.claves == ()
+    assert not comparar_huellas(esperada, _huella(conn, [(1, 'y'), (1, 'x')], claves=(None,)))[0]
+
+def test_enteros_y_reales_equivalentes(conn):
+    assert comparar_huellas(_huella(conn, [(3, 0.1 + 0.2)]), _huella(conn, [(3.0, 0.3)]))[0]
+
+def test_soluciones_aprobadas():
+    for ejercicio in ejercicios():
+        exito, salida = calificar(1, ejercicio['solucion'], ejercicio['solucion'])
+        assert exito
+        assert salida['correcto'], ejercicio['titulo']
+
+def test_orden_incorrecto():
+    solucion = ejercicios()[0]['solucion']
+    exito, salida = calificar(1, solucion.replace("ORDER BY s.nombre, c.nombre", "ORDER BY s.nombre DESC, c.nombre"),
+                              solucion)
+    assert exito
+    assert not salida['correcto']
+    assert "no están en el orden" in salida['mensaje']
+
+def test_sin_orden_en_la_solucion_acepta_cualquier_orden():
+    # La vista del ejercicio 5 se compara como multiconjunto
+    solucion = ejercicios()[4]['solucion']
+    exito, salida = calificar(1, solucion.rstrip(';') + " ORDER BY c.creditos DESC;", solucion)
+    assert exito and salida['correcto']
+
+@pytest.mark.parametrize('entrega', [
+    "DELETE FROM students; COMMIT; SELECT 1;",
+    "DELETE FROM students; END; SELECT 1;",
+    "ATTACH DATABASE ':memory:' AS otra; SELECT 1;",
+    "PRAGMA hard_heap_limit = 0; SELECT 1;",
+])
+def test_entregas_hostiles_no_alteran_la_sesion(entrega):
+    from laboratorio.sesiones import SesionSQL
+
+    sesion = SesionSQL(1)
+    try:
+        solucion = ejercicios()[0]['solucion']
+        exito, esperada = huella_esperada(sesion, solucion)
+        assert exito
+
+        exito, mensaje = calificar_contra(sesion, entrega, solucion, esperada)
+        assert not exito
+        assert "El laboratorio no permite" in mensaje
+
+        exito, salida = calificar_contra(sesion, solucion, solucion, esperada)
+        assert exito and salida['correcto']
+        assert sesion.ejecutar("SELECT COUNT(*) FROM students")[1][0]['datos'].iloc[0, 0] > 0
+    finally:
+        sesion.cerrar()
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from laboratorio.dialecto import SENTENCIA_VACIA, preparar_conexion, traducir
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    preparar_conexion(conn)
+    yield conn
+    conn.close()
+
+def _valor(conn, consulta):
+    return conn.execute(traducir(consulta)).fetchone()[0]
+
+@pytest.mark.parametrize('consulta, esperado', [
+    ("SELECT 7::numeric / 2", 3.5),
+    ("SELECT 7::decimal / 2", 3.5),
+    ("SELECT 7::NUMERIC(10, 2) / 4", 1.75),
+    ("SELECT 2.5::numeric(5)", 3),
+    ("SELECT 3.14159::numeric(6, 2)", 3.14),
+    ("SELECT 2.6::int", 3),
+    ("SELECT '42'::integer + 1", 43),
+    ("SELECT 7::float / 2", 3.5),
+    ("SELECT 12::text || 'a'", '12a'),
+    ("SELECT (1 + 2)::varchar(10)", '3'),
+    ("SELECT ROUND(AVG(x)::numeric, 2) FROM (SELECT 1 AS x UNION ALL SELECT 2)", 1.5),
+])
+def test_conversiones(conn, consulta, esperado):
+    assert _valor(conn, consulta) == esperado
+
+@pytest.mark.parametrize('campo, esperado', [
+    ('YEAR', 2024), ('MONTH', 3), ('DAY', 15), ('QUARTER', 1), ('DOW', 5)
+])
+def test_extract(conn, campo, esperado):
+    assert _valor(conn, f"SELECT EXTRACT({campo} FROM '2024-03-15 10:30:00'::timestamp)") == esperado
+
+def test_funciones_registradas(conn):
+    assert _valor(conn, "SELECT split_part('a@b.com', '@', 2)") == 'b.com'
+    assert _valor(conn, "SELECT date_trunc('month', '2024-03-15'::date)") == '2024-03-01 00:00:00'
+
+def test_vistas_materializadas():
+    assert traducir("CREATE MATERIALIZED VIEW mv AS SELECT 1 WITH DATA;") == "CREATE VIEW mv AS SELECT 1;"
+    assert traducir("DROP MATERIALIZED VIEW IF EXISTS mv") == "DROP VIEW IF EXISTS mv"
+    assert traducir("REFRESH MATERIALIZED VIEW mv") == SENTENCIA_VACIA
+
+def test_catalogo(conn):
+    assert traducir("SELECT * FROM pg_catalog.pg_indexes") == "SELECT * FROM pg_indexes"
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.execute("CREATE INDEX idx_t_a ON t(a)")
+    assert _valor(conn, "SELECT indexname FROM pg_catalog.pg_indexes WHERE tablename = 't'") == 'idx_t_a'
+
+def test_literales_no_se_reescriben():
+    assert traducir("SELECT 'a::numeric', 1::int") == "SELECT 'a::numeric', CAST(ROUND(1) AS INTEGER)"
+    assert traducir("SELECT 'EXTRACT(YEAR FROM x)'") == "SELECT 'EXTRACT(YEAR FROM x)'"
+
+def test_sin_cambios_conserva_la_sentencia():
+    sentencia = "-- comentario\nSELECT a FROM t"
+    assert traducir(sentencia) is sentencia
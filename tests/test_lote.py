@@ -0,0 +1,34 @@
+from laboratorio.contenido import ejercicios
+from laboratorio.lote import calificar_directorio, dividir_entrega
+
+ENTREGA_HOSTIL = """
+-- Ejercicio 1
+DELETE FROM students; COMMIT; SELECT 1;
+-- Ejercicio 2
+DELETE FROM enrollments; END; SELECT 1;
+"""
+
+def _entrega_correcta():
+    return "\n".join(f"-- Ejercicio {numero}\n{ejercicio['solucion']}"
+                     for numero, ejercicio in enumerate(ejercicios(), start=1))
+
+def test_dividir_entrega():
+    secciones = dividir_entrega("-- Ejercicio 1\nSELECT 1;\n-- ejercicio 3 (opcional)\nSELECT 3;")
+    assert set(secciones) == {1, 3}
+    assert secciones[3].strip() == "SELECT 3;"
+
+def test_entrega_hostil_no_afecta_a_las_siguientes(tmp_path):
+    # Un solo proceso: la entrega hostil se califica antes que la correcta y
+    # en la misma sesión
+    (tmp_path / "a_hostil.sql").write_text(ENTREGA_HOSTIL, encoding='utf-8')
+    (tmp_path / "b_correcta.sql").write_text(_entrega_correcta(), encoding='utf-8')
+
+    filas = calificar_directorio(tmp_path, escala=1, procesos=1)
+
+    hostil = {fila['ejercicio']: fila for fila in filas if fila['estudiante'] == 'a_hostil'}
+    assert hostil[1]['resultado'] == 'error'
+    assert hostil[2]['resultado'] == 'error'
+    assert hostil[3]['resultado'] == 'sin respuesta'
+
+    correcta = [fila for fila in filas if fila['estudiante'] == 'b_correcta']
+    assert [fila['resultado'] for fila in correcta] == ['aprobado'] * len(ejercicios())
@@ -0,0 +1,107 @@
+import os
+import signal
+import time
+
+import pytest
+
+from laboratorio.cache import CacheResultados
+from laboratorio.pool import GRACIA_S, PoolSandbox
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = PoolSandbox(procesos=2, timeout_s=2)
+    yield pool
+    pool.detener()
+
+def _filas(resultado):
+    exito, salida = resultado
+    assert exito, salida
+    return salida[0]['datos'].iloc[0, 0]
+
+def test_trabajo_reemplazado_no_comparte_cache(pool):
+    cache = CacheResultados()
+    sesion = pool.sesion(1, cache)
+
+    # El trabajo termina pero se reemplaza sin recibir su respuesta
+    trabajo = sesion.enviar("DELETE FROM students")
+    trabajo.esperar()
+    trabajo.cancelar()
+
+    assert _filas(sesion.ejecutar("SELECT COUNT(*) FROM students")) == 0
+    assert _filas(pool.sesion(1, cache).ejecutar("SELECT COUNT(*) FROM students")) > 0
+
+def test_sesiones_aisladas_y_reinicio(pool):
+    cache = CacheResultados()
+    a = pool.sesion(1, cache)
+    b = pool.sesion(1, cache)
+    estudiantes = _filas(b.ejecutar("SELECT COUNT(*) FROM students"))
+
+    assert a.ejecutar("DELETE FROM students; CREATE TABLE notas (nota INTEGER)")[0]
+    assert a.modificada
+    assert _filas(a.ejecutar("SELECT COUNT(*) FROM students")) == 0
+    assert _filas(b.ejecutar("SELECT COUNT(*) FROM students")) == estudiantes
+    assert not b.ejecutar("SELECT * FROM notas")[0]
+
+    a.reiniciar()
+    assert not a.modificada
+    assert _filas(a.ejecutar("SELECT COUNT(*) FROM students")) == estudiantes
+    assert not a.ejecutar("SELECT * FROM notas")[0]
+
+CONSULTA_INFINITA = "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r) SELECT COUNT(*) FROM r"
+
+@pytest.fixture
+def pool_propio():
+    pool = PoolSandbox(procesos=1, timeout_s=1, memoria_mb=64)
+    yield pool
+    pool.detener()
+
+def _esperar_estado(trabajo, estado):
+    while trabajo.estado != estado:
+        time.sleep(0.01)
+
+def test_consulta_infinita_se_corta_en_el_limite(pool_propio):
+    sesion = pool_propio.sesion(1)
+    inicio = time.monotonic()
+    exito, mensaje = sesion.ejecutar(CONSULTA_INFINITA)
+    assert not exito
+    assert "tiempo límite de 1 s" in mensaje
+    assert time.monotonic() - inicio < 1 + GRACIA_S
+    assert sesion.ejecutar("SELECT 1")[0]
+
+def test_cancelar_reemplaza_al_trabajador(pool_propio):
+    sesion = pool_propio.sesion(1)
+    proceso = pool_propio._trabajadores[0].proceso
+    trabajo = sesion.enviar(CONSULTA_INFINITA)
+    _esperar_estado(trabajo, 'ejecutando')
+
+    trabajo.cancelar()
+    assert trabajo.esperar(5)['salida'] == "Consulta cancelada"
+    assert trabajo.estado == 'cancelado'
+    assert not proceso.is_alive()
+    assert pool_propio._trabajadores[0].proceso is not proceso
+    assert sesion.ejecutar("SELECT 1")[0]
+
+def test_consulta_que_agota_la_memoria(pool_propio):
+    sesion = pool_propio.sesion(1)
+    exito, mensaje = sesion.ejecutar(
+        "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r LIMIT 400) "
+        "SELECT n, randomblob(1000000) FROM r"
+    )
+    assert not exito
+    assert "límite de memoria del sandbox (64 MB)" in mensaje
+    assert sesion.ejecutar("SELECT 1")[0]
+
+def test_trabajador_que_muere(pool_propio):
+    # Lo que ve el pool cuando el sistema mata al proceso (por ejemplo, al
+    # superar RLIMIT_AS fuera de SQLite)
+    sesion = pool_propio.sesion(1)
+    trabajo = sesion.enviar(CONSULTA_INFINITA)
+    _esperar_estado(trabajo, 'ejecutando')
+    time.sleep(0.2)
+    os.kill(pool_propio._trabajadores[0].proceso.pid, signal.SIGKILL)
+
+    exito, mensaje = sesion.recibir(trabajo)
+    assert not exito
+    assert "terminó inesperadamente" in mensaje
+    assert sesion.modificada
+    assert sesion.ejecutar("SELECT 1")[0]
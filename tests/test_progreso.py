@@ -0,0 +1,104 @@
+import random
+import sqlite3
+import time
+from collections import Counter
+
+import pytest
+
+from laboratorio.progreso import MAX_PENDIENTES, VERSION_ESQUEMA, AlmacenProgreso
+
+@pytest.fixture
+def almacen(tmp_path):
+    # Sin escrituras periódicas: cada prueba decide cuándo se vacía el lote
+    almacen = AlmacenProgreso(tmp_path / 'progreso.sqlite', intervalo_s=3600)
+    yield almacen
+    almacen.detener()
+
+def _recuento(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        items = {(seccion, item): total for seccion, item, total in conn.execute(
+            "SELECT seccion, item, SUM(valor) FROM progreso GROUP BY seccion, item")}
+        por_estudiante = dict(conn.execute("SELECT estudiante, SUM(valor) FROM progreso GROUP BY estudiante"))
+    finally:
+        conn.close()
+    return items, dict(Counter(por_estudiante.values()))
+
+def _comprobar_agregados(almacen):
+    items, histograma = _recuento(almacen.ruta)
+    resumen = almacen.resumen_clase()
+    assert resumen['completados'] == items
+    assert resumen['histograma'] == histograma
+    assert resumen['estudiantes'] == sum(histograma.values())
+
+def test_lote_se_escribe_en_una_transaccion(almacen):
+    almacen.registrar('ana', 'teoria', 'joins', True)
+    almacen.registrar('ana', 'ejercicios', '1', True)
+    almacen.registrar('ana', 'ejercicios', '1', False)
+    almacen.registrar('luis', 'teoria', 'joins', True)
+
+    # Antes de escribirse, las lecturas ya ven los cambios pendientes
+    assert almacen.leer('ana') == {'teoria': {'joins': True}, 'ejercicios': {'1': False}}
+    assert almacen.resumen_clase()['estudiantes'] == 0
+    assert almacen.estadisticas() == {'cambios': 4, 'escrituras': 0, 'pendientes': 3}
+
+    almacen.vaciar()
+    assert almacen.estadisticas()['escrituras'] == 1
+    assert almacen.estadisticas()['pendientes'] == 0
+    assert almacen.leer('ana') == {'teoria': {'joins': True}, 'ejercicios': {'1': False}}
+    assert almacen.resumen_clase()['completados'][('teoria', 'joins')] == 2
+    _comprobar_agregados(almacen)
+
+def test_agregados_coinciden_con_un_recuento(almacen):
+    rng = random.Random(0)
+    for _ in range(20):
+        for _ in range(50):
+            almacen.registrar(f"e{rng.randrange(30)}", rng.choice(['teoria', 'ejercicios']),
+                              str(rng.randrange(5)), rng.random() < 0.6)
+        almacen.vaciar()
+    _comprobar_agregados(almacen)
+
+def test_muchos_pendientes_se_escriben_sin_esperar_el_intervalo(almacen):
+    for i in range(MAX_PENDIENTES):
+        almacen.registrar(f"e{i}", 'teoria', 'joins', True)
+
+    limite = time.monotonic() + 5
+    while almacen.estadisticas()['escrituras'] == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert almacen.estadisticas()['escrituras'] == 1
+    assert almacen.resumen_clase()['estudiantes'] == MAX_PENDIENTES
+
+def test_errores_generalizados(almacen):
+    almacen.registrar_error("se esperaba FROM y se encontró 'FORM'")
+    almacen.registrar_error("se esperaba FROM y se encontró 'x'")
+    almacen.vaciar()
+    assert almacen.resumen_clase()['errores'] == [("se esperaba FROM y se encontró '…'", 2)]
+
+def test_version_anterior_reconstruye_agregados(tmp_path):
+    ruta = tmp_path / 'progreso.sqlite'
+    # Una base de antes de los agregados: solo la tabla progreso, sin triggers
+    conn = sqlite3.connect(ruta)
+    conn.execute("CREATE TABLE progreso (estudiante TEXT NOT NULL, seccion TEXT NOT NULL, item TEXT NOT NULL, "
+                 "valor INTEGER NOT NULL, actualizado REAL NOT NULL, "
+                 "PRIMARY KEY (estudiante, seccion, item)) WITHOUT ROWID")
+    conn.executemany("INSERT INTO progreso VALUES (?, ?, ?, ?, 0)", [
+        ('ana', 'teoria', 'joins', 1), ('ana', 'teoria', 'vistas', 1),
+        ('luis', 'teoria', 'joins', 0), ('eva', 'teoria', 'joins', 1)
+    ])
+    conn.commit()
+    conn.close()
+
+    almacen = AlmacenProgreso(ruta, intervalo_s=3600)
+    try:
+        _comprobar_agregados(almacen)
+        assert almacen.resumen_clase()['histograma'] == {0: 1, 1: 1, 2: 1}
+
+        almacen.registrar('luis', 'teoria', 'joins', True)
+        almacen.vaciar()
+        _comprobar_agregados(almacen)
+    finally:
+        almacen.detener()
+
+    conn = sqlite3.connect(ruta)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == VERSION_ESQUEMA
+    conn.close()
@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from laboratorio.sesiones import SesionSQL
+
+@pytest.fixture
+def sesion():
+    sesion = SesionSQL(1)
+    sesion.establecer_limites(10, filas_por_pagina=2)
+    yield sesion
+    sesion.cerrar()
+
+def _valores(datos):
+    return datos.values.tolist()
+
+def test_pagina_coincide_con_el_resultado_completo(sesion):
+    consulta = "SELECT student_id, nombre FROM students ORDER BY student_id DESC;"
+    exito, resultados = sesion.ejecutar(consulta)
+    assert exito
+    total = resultados[0]['total_filas']
+
+    completo = sesion._conn.execute(consulta).fetchall()
+    paginas = []
+    for desde in range(0, total, 2):
+        exito, datos = sesion.pagina(consulta, desde, 2)
+        assert exito
+        paginas.extend(map(tuple, _valores(datos)))
+    assert paginas == completo
+
+@pytest.mark.parametrize('consulta', [
+    "WITH c AS (SELECT ciudad FROM students) SELECT ciudad, ciudad FROM c ORDER BY 1 -- fin",
+    "VALUES (1, 'a'), (2, 'b'), (3, 'c')",
+])
+def test_pagina_conserva_las_columnas(sesion, consulta):
+    exito, resultados = sesion.ejecutar(consulta)
+    assert exito
+    exito, datos = sesion.pagina(consulta, 2, 2)
+    assert exito
+    assert list(datos.columns) == list(resultados[0]['datos'].columns)
+    assert len(datos) == min(2, resultados[0]['total_filas'] - 2)
+
+def _contar(sesion, tabla):
+    exito, resultados = sesion.ejecutar(f"SELECT COUNT(*) FROM {tabla}")
+    assert exito, resultados
+    return resultados[0]['datos'].iloc[0, 0]
+
+@pytest.fixture
+def otra():
+    sesion = SesionSQL(1)
+    yield sesion
+    sesion.cerrar()
+
+def test_cambios_no_visibles_en_otra_sesion(sesion, otra):
+    estudiantes = _contar(otra, 'students')
+    exito, salida = sesion.ejecutar(
+        "DELETE FROM students WHERE student_id > 2;"
+        "CREATE TABLE notas (nota INTEGER); INSERT INTO notas VALUES (5);"
+        "CREATE VIEW v_ciudades AS SELECT DISTINCT ciudad FROM students;"
+        "CREATE INDEX idx_notas ON notas(nota);"
+    )
+    assert exito, salida
+
+    assert _contar(sesion, 'students') == 2
+    assert _contar(sesion, 'notas') == 1
+    assert sesion.modificada and 'students' in sesion.promovidas
+
+    assert _contar(otra, 'students') == estudiantes
+    for tabla in ('notas', 'v_ciudades'):
+        exito, mensaje = otra.ejecutar(f"SELECT * FROM {tabla}")
+        assert not exito and "no such table" in mensaje
+    assert not otra.modificada
+
+def test_tabla_base_no_se_puede_eliminar(sesion):
+    exito, mensaje = sesion.ejecutar("DROP TABLE students")
+    assert not exito and "solo lectura" in mensaje
+    # Una vez promovida, la copia de la sesión sí
+    assert sesion.ejecutar("DELETE FROM students WHERE student_id = 1")[0]
+    assert sesion.ejecutar("DROP TABLE students")[0]
+    assert _contar(sesion, 'base.students') > 0
+
+def test_capa_en_archivo_conserva_vistas(tmp_path):
+    ruta = str(tmp_path / 'capa.sqlite')
+    sesion = SesionSQL(1, ruta_capa=ruta)
+    assert sesion.ejecutar("CREATE VIEW v_activos AS SELECT * FROM students WHERE activo;"
+                           "UPDATE students SET ciudad = 'X'")[0]
+    sesion.cerrar()
+
+    reabierta = SesionSQL(1, ruta_capa=ruta)
+    try:
+        assert reabierta.modificada
+        assert reabierta.promovidas == {'students'}
+        exito, resultados = reabierta.ejecutar("SELECT DISTINCT ciudad FROM v_activos")
+        assert exito and resultados[0]['datos'].values.tolist() == [['X']]
+    finally:
+        reabierta.cerrar()
+
+@pytest.mark.parametrize('ruta_capa', [False, True])
+def test_reiniciar_descarta_la_capa(tmp_path, ruta_capa):
+    sesion = SesionSQL(1, ruta_capa=str(tmp_path / 'capa.sqlite') if ruta_capa else None)
+    try:
+        estudiantes = _contar(sesion, 'students')
+        assert sesion.ejecutar("DELETE FROM students; CREATE TABLE notas (nota INTEGER);"
+                               "CREATE VIEW v_todos AS SELECT * FROM students")[0]
+        sesion.reiniciar()
+
+        assert not sesion.modificada and not sesion.promovidas
+        assert _contar(sesion, 'students') == estudiantes
+        for tabla in ('notas', 'v_todos'):
+            assert not sesion.ejecutar(f"SELECT * FROM {tabla}")[0]
+    finally:
+        sesion.cerrar()
+
+@pytest.mark.parametrize('codigo', [
+    "ATTACH DATABASE ':memory:' AS otra",
+    "DETACH DATABASE base",
+    "BEGIN",
+    "COMMIT",
+    "SAVEPOINT s",
+    "VACUUM INTO '/tmp/copia_cbd.sqlite'",
+    "PRAGMA hard_heap_limit = 0",
+])
+def test_sentencias_prohibidas(sesion, codigo):
+    exito, mensaje = sesion.ejecutar(codigo)
+    assert not exito
+    assert mensaje.startswith("El laboratorio no permite")
+    # Dentro de la transacción de explicar, VACUUM falla antes de llegar al autorizador
+    assert not sesion.explicar(codigo)[0]
+    assert _contar(sesion, 'base.students') > 0
+    assert not os.path.exists('/tmp/copia_cbd.sqlite')
@@ -0,0 +1,63 @@
+import pytest
+
+from laboratorio.contenido import ejercicios, retos
+from laboratorio.sintaxis import analizar_sql, claves_de_orden
+
+def _errores(codigo):
+    return [(error['linea'], error['columna'], error['mensaje']) for error in analizar_sql(codigo)['errores']]
+
+def test_material_del_curso_sin_errores():
+    for codigo in [ejercicio['solucion'] for ejercicio in ejercicios()] + [reto['codigo'] for reto in retos()]:
+        assert analizar_sql(codigo)['errores'] == ()
+
+@pytest.mark.parametrize('codigo, posicion, mensaje', [
+    ("SELECT nombre FROM students WHERE", (1, 34), "se esperaba una expresión"),
+    ("SELEC * FROM students", (1, 1), "no es una sentencia SQL"),
+    ("SELECT 'abc", (1, 8), "cadena sin comilla de cierre"),
+    ("/* abierto", (1, 1), "comentario /* sin cerrar"),
+    ("SELECT ciudad, nombre, COUNT(*) FROM students GROUP BY ciudad", (1, 16), "la columna nombre debe aparecer en GROUP BY"),
+    ("SELECT * FROM students GROUP BY ciudad", (1, 8), "SELECT * no se puede combinar con GROUP BY"),
+])
+def test_errores(codigo, posicion, mensaje):
+    (linea, columna, texto), = _errores(codigo)
+    assert (linea, columna) == posicion
+    assert mensaje in texto
+
+@pytest.mark.parametrize('codigo', [
+    "SELECT nombre FROM students WHERE email LIKE '%\\_%' ESCAPE '\\'",
+    "SELECT nombre FROM students WHERE nombre NOT ILIKE 'a!%%' ESCAPE '!'",
+    "SELECT nombre FROM students WHERE ciudad = ANY(ARRAY['Lima', 'Quito'])",
+    "SELECT nombre FROM students WHERE student_id <> ALL(SELECT student_id FROM enrollments)",
+    "SELECT nombre FROM students WHERE student_id = SOME(ARRAY[1, 2]) AND ciudad = ANY(ARRAY[]::text[])",
+    "SELECT public.students.nombre FROM public.students",
+    "SELECT public.s.ciudad, COUNT(*) FROM students s GROUP BY s.ciudad",
+    "SELECT main.students.* FROM main.students",
+    "PRAGMA table_info(students)",
+    "PRAGMA main.index_list('students'); PRAGMA foreign_keys = ON",
+])
+def test_formas_validas_sin_errores(codigo):
+    resultado = analizar_sql(codigo)
+    assert resultado['errores'] == ()
+    assert resultado['sentencias']
+
+def test_un_error_no_detiene_las_sentencias_siguientes():
+    resultado = analizar_sql("SELECT 1;\nSELECT FROM students;\nSELECT 2")
+    assert resultado['sentencias'] == ('SELECT', 'SELECT')
+    assert [(error['linea'], error['columna']) for error in resultado['errores']] == [(2, 8)]
+
+def test_agrupacion_valida():
+    # Agrupar por la clave primaria permite usar las demás columnas de la tabla
+    assert _errores("SELECT s.student_id, s.nombre, COUNT(*) FROM students s "
+                    "JOIN enrollments e ON e.student_id = s.student_id GROUP BY s.student_id") == []
+    assert _errores("SELECT ciudad AS c, COUNT(*) FROM students GROUP BY ciudad ORDER BY c") == []
+
+def test_having_sin_group_by_es_advertencia():
+    resultado = analizar_sql("SELECT COUNT(*) FROM students HAVING COUNT(*) > 1")
+    assert resultado['errores'] == ()
+    assert "HAVING sin GROUP BY" in resultado['advertencias'][0]['mensaje']
+
+def test_claves_de_orden():
+    assert claves_de_orden("SELECT nombre, ciudad FROM students ORDER BY 2 DESC, nombre") == (1, 0)
+    assert claves_de_orden("SELECT * FROM students ORDER BY ciudad") == ('ciudad',)
+    assert claves_de_orden("SELECT nombre FROM students ORDER BY LENGTH(email)") == (None,)
+    assert claves_de_orden("SELECT nombre FROM students") is None